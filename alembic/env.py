@@ -2,9 +2,12 @@ import os
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from alembic.autogenerate import rewriter
+from alembic.operations import ops
+from sqlalchemy import engine_from_config, pool, text
 from dotenv import load_dotenv
 
+from app.core.migration_ops import LOCK_TIMEOUT
 from app.models import Base
 
 # Interpret the config file for Python logging.
@@ -21,6 +24,54 @@ if database_url:
 # Set target metadata for 'autogenerate' support.
 target_metadata = Base.metadata
 
+# Replicas that start together all run `alembic upgrade head`; a session-level
+# advisory lock makes them take turns instead of queueing on table locks.
+MIGRATION_LOCK_KEY = 0xA1B2C3D4
+# LOCK_TIMEOUT (MIGRATION_LOCK_TIMEOUT, default 2s) is set for the whole
+# session so transactional DDL fails fast instead of queueing an ACCESS
+# EXCLUSIVE request that blocks every later reader of the table. Concurrent
+# index builds/drops go through app.core.migration_ops, which lifts it for
+# that one statement.
+
+
+# Autogenerate must not emit COMMENT ON statements: each is a separate DDL
+# round-trip after its ADD COLUMN. Column/table docs, if wanted, go into a
+# hand-written migration as one op.execute("COMMENT ON ...; COMMENT ON ...").
+strip_comments = rewriter.Rewriter()
+
+
+@strip_comments.rewrites(ops.AlterColumnOp)
+def _skip_comment_change(context, revision, op):
+    op.modify_comment = False
+    only_comment_changed = (
+        op.modify_type is None
+        and op.modify_nullable is None
+        and op.modify_server_default is False
+        and op.modify_name is None
+    )
+    return [] if only_comment_changed else op
+
+
+@strip_comments.rewrites(ops.CreateTableCommentOp)
+@strip_comments.rewrites(ops.DropTableCommentOp)
+def _skip_table_comment(context, revision, op):
+    return []
+
+
+@strip_comments.rewrites(ops.AddColumnOp)
+def _add_column_without_comment(context, revision, op):
+    op.column.comment = None
+    return op
+
+
+@strip_comments.rewrites(ops.CreateTableOp)
+def _create_table_without_comments(context, revision, op):
+    op.comment = None
+    for column in op.columns:
+        if hasattr(column, "comment"):
+            column.comment = None
+    return op
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -30,6 +81,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         compare_type=True,
+        process_revision_directives=strip_comments,
     )
 
     with context.begin_transaction():
@@ -43,17 +95,31 @@ def run_migrations_online() -> None:
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
         future=True,
+        # Tag migration sessions in pg_stat_activity / server logs
+        connect_args={"application_name": "alembic"},
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            compare_type=True,
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        connection.execute(text("SELECT pg_advisory_lock(:k)"), {"k": MIGRATION_LOCK_KEY})
+        connection.execute(text("SELECT set_config('lock_timeout', :t, false)"), {"t": LOCK_TIMEOUT})
+        # Session-level lock/setting survive the commit; Alembic needs a
+        # connection with no open transaction to manage its own.
+        connection.commit()
+
+        try:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                compare_type=True,
+                process_revision_directives=strip_comments,
+            )
+
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            connection.rollback()
+            connection.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": MIGRATION_LOCK_KEY})
+            connection.commit()
 
 
 if context.is_offline_mode():
@@ -1,11 +1,14 @@
 """Initial schema for preschool website."""
 
+import os
 from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from app.core.migration_ops import create_index_concurrently, drop_index_concurrently
+
 
 # revision identifiers, used by Alembic.
 revision: str = "0001_init"
@@ -14,51 +17,98 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# Secondary (non-unique) indexes, built with CONCURRENTLY after the tables exist
+# so that a re-run or a restore into a populated database does not hold
+# SHARE locks that block writes for the whole build.
+CONCURRENT_INDEXES = [
+    ("login_attempts_email_time_idx", "login_attempts (email, created_at DESC)"),
+    ("login_attempts_ip_time_idx", "login_attempts (ip, created_at DESC)"),
+    ("assets_created_at_idx", "assets (created_at DESC)"),
+    (
+        "posts_list_news_idx",
+        "posts (type, status, published_at DESC) "
+        "WHERE type='news' AND deleted_at IS NULL",
+    ),
+    (
+        "posts_list_announcement_idx",
+        "posts (type, block_id, status, published_at DESC) "
+        "WHERE type='announcement' AND deleted_at IS NULL",
+    ),
+    ("posts_search_tsv_gin", "posts USING gin (search_tsv)"),
+    ("post_revisions_post_time_idx", "post_revisions (post_id, created_at DESC)"),
+    (
+        "albums_list_idx",
+        "albums (status, created_at DESC) WHERE deleted_at IS NULL",
+    ),
+    ("album_items_album_pos_idx", "album_items (album_id, position)"),
+    ("album_videos_album_pos_idx", "album_videos (album_id, position)"),
+    (
+        "jobs_outbox_pick_idx",
+        "jobs_outbox (status, run_after, id) "
+        "WHERE status IN ('queued','failed')",
+    ),
+    ("facebook_post_log_status_idx", "facebook_post_log (status, updated_at DESC)"),
+    (
+        "contact_messages_status_time_idx",
+        "contact_messages (status, created_at DESC)",
+    ),
+    (
+        "audit_log_entity_idx",
+        "audit_log (entity_type, entity_id, created_at DESC)",
+    ),
+]
+
+# (table, column, referred table, ON DELETE action). Constraint names follow
+# PostgreSQL's default <table>_<column>_fkey so they match databases created
+# back when the FKs were declared inline.
+FOREIGN_KEYS = [
+    ("login_attempts", "user_id", "users", "SET NULL"),
+    ("assets", "uploaded_by", "users", "SET NULL"),
+    ("posts", "cover_asset_id", "assets", "SET NULL"),
+    ("posts", "og_image_asset_id", "assets", "SET NULL"),
+    ("posts", "block_id", "blocks", "RESTRICT"),
+    ("posts", "author_id", "users", "SET NULL"),
+    ("post_revisions", "post_id", "posts", "CASCADE"),
+    ("post_revisions", "editor_id", "users", "SET NULL"),
+    ("post_revisions", "cover_asset_id", "assets", "SET NULL"),
+    ("albums", "cover_asset_id", "assets", "SET NULL"),
+    ("albums", "created_by", "users", "SET NULL"),
+    ("album_items", "album_id", "albums", "CASCADE"),
+    ("album_items", "asset_id", "assets", "RESTRICT"),
+    ("video_embeds", "created_by", "users", "SET NULL"),
+    ("album_videos", "album_id", "albums", "CASCADE"),
+    ("album_videos", "video_id", "video_embeds", "RESTRICT"),
+    ("facebook_post_log", "post_id", "posts", "CASCADE"),
+    ("audit_log", "actor_id", "users", "SET NULL"),
+]
+
+
 def upgrade() -> None:
     op.execute("CREATE EXTENSION IF NOT EXISTS citext")
     op.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
 
-    # Create enums using DO block to check existence first
-    op.execute("""
-        DO $$ BEGIN
-            CREATE TYPE user_role AS ENUM ('admin', 'editor');
-        EXCEPTION WHEN duplicate_object THEN null;
-        END $$;
-    """)
-    op.execute("""
-        DO $$ BEGIN
-            CREATE TYPE post_type AS ENUM ('news', 'announcement');
-        EXCEPTION WHEN duplicate_object THEN null;
-        END $$;
-    """)
-    op.execute("""
-        DO $$ BEGIN
-            CREATE TYPE content_status AS ENUM ('draft', 'published', 'archived');
-        EXCEPTION WHEN duplicate_object THEN null;
-        END $$;
-    """)
-    op.execute("""
-        DO $$ BEGIN
-            CREATE TYPE job_type AS ENUM ('post_to_facebook');
-        EXCEPTION WHEN duplicate_object THEN null;
-        END $$;
-    """)
-    op.execute("""
-        DO $$ BEGIN
-            CREATE TYPE job_status AS ENUM ('queued', 'processing', 'succeeded', 'failed', 'dead');
-        EXCEPTION WHEN duplicate_object THEN null;
-        END $$;
-    """)
+    # Create all enums in one DO block, skipping types that already exist
     op.execute("""
-        DO $$ BEGIN
-            CREATE TYPE embed_provider AS ENUM ('youtube', 'facebook');
-        EXCEPTION WHEN duplicate_object THEN null;
-        END $$;
-    """)
-    op.execute("""
-        DO $$ BEGIN
-            CREATE TYPE contact_status AS ENUM ('new', 'handled', 'spam');
-        EXCEPTION WHEN duplicate_object THEN null;
+        DO $$
+        DECLARE r record;
+        BEGIN
+            FOR r IN SELECT * FROM (VALUES
+                ('user_role', ARRAY['admin', 'editor']),
+                ('post_type', ARRAY['news', 'announcement']),
+                ('content_status', ARRAY['draft', 'published', 'archived']),
+                ('job_type', ARRAY['post_to_facebook']),
+                ('job_status', ARRAY['queued', 'processing', 'succeeded', 'failed', 'dead']),
+                ('embed_provider', ARRAY['youtube', 'facebook']),
+                ('contact_status', ARRAY['new', 'handled', 'spam'])
+            ) AS t(name, labels) LOOP
+                IF to_regtype(r.name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TYPE %I AS ENUM (%s)',
+                        r.name,
+                        (SELECT string_agg(quote_literal(l), ', ') FROM unnest(r.labels) AS l)
+                    );
+                END IF;
+            END LOOP;
         END $$;
     """)
 
@@ -112,17 +162,14 @@ def upgrade() -> None:
         ),
         sa.UniqueConstraint("email", name="uq_users_email"),
         sa.UniqueConstraint("public_id", name="uq_users_public_id"),
+        if_not_exists=True,
     )
 
     op.create_table(
         "login_attempts",
         sa.Column("id", sa.BigInteger(), primary_key=True),
         sa.Column("email", postgresql.CITEXT()),
-        sa.Column(
-            "user_id",
-            sa.BigInteger(),
-            sa.ForeignKey("users.id", ondelete="SET NULL"),
-        ),
+        sa.Column("user_id", sa.BigInteger()),
         sa.Column("ip", postgresql.INET()),
         sa.Column("user_agent", sa.Text()),
         sa.Column(
@@ -137,16 +184,7 @@ def upgrade() -> None:
             nullable=False,
             server_default=sa.text("now()"),
         ),
-    )
-    op.create_index(
-        "login_attempts_email_time_idx",
-        "login_attempts",
-        ["email", sa.text("created_at DESC")],
-    )
-    op.create_index(
-        "login_attempts_ip_time_idx",
-        "login_attempts",
-        ["ip", sa.text("created_at DESC")],
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -167,11 +205,7 @@ def upgrade() -> None:
         sa.Column("width", sa.Integer()),
         sa.Column("height", sa.Integer()),
         sa.Column("checksum", sa.Text()),
-        sa.Column(
-            "uploaded_by",
-            sa.BigInteger(),
-            sa.ForeignKey("users.id", ondelete="SET NULL"),
-        ),
+        sa.Column("uploaded_by", sa.BigInteger()),
         sa.Column(
             "created_at",
             sa.TIMESTAMP(timezone=True),
@@ -180,9 +214,7 @@ def upgrade() -> None:
         ),
         sa.Column("deleted_at", sa.TIMESTAMP(timezone=True)),
         sa.UniqueConstraint("public_id", name="uq_assets_public_id"),
-    )
-    op.create_index(
-        "assets_created_at_idx", "assets", [sa.text("created_at DESC")]
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -203,6 +235,7 @@ def upgrade() -> None:
             server_default=sa.text("TRUE"),
         ),
         sa.UniqueConstraint("code", name="uq_blocks_code"),
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -225,28 +258,12 @@ def upgrade() -> None:
         sa.Column("slug", sa.Text(), nullable=False),
         sa.Column("excerpt", sa.Text()),
         sa.Column("content_html", sa.Text(), nullable=False),
-        sa.Column(
-            "cover_asset_id",
-            sa.BigInteger(),
-            sa.ForeignKey("assets.id", ondelete="SET NULL"),
-        ),
-        sa.Column(
-            "og_image_asset_id",
-            sa.BigInteger(),
-            sa.ForeignKey("assets.id", ondelete="SET NULL"),
-        ),
-        sa.Column(
-            "block_id",
-            sa.BigInteger(),
-            sa.ForeignKey("blocks.id", ondelete="RESTRICT"),
-        ),
+        sa.Column("cover_asset_id", sa.BigInteger()),
+        sa.Column("og_image_asset_id", sa.BigInteger()),
+        sa.Column("block_id", sa.BigInteger()),
         sa.Column("meta_title", sa.Text()),
         sa.Column("meta_description", sa.Text()),
-        sa.Column(
-            "author_id",
-            sa.BigInteger(),
-            sa.ForeignKey("users.id", ondelete="SET NULL"),
-        ),
+        sa.Column("author_id", sa.BigInteger()),
         sa.Column("published_at", sa.TIMESTAMP(timezone=True)),
         sa.Column(
             "created_at",
@@ -268,6 +285,7 @@ def upgrade() -> None:
             name="ck_posts_block_id_by_type",
         ),
         sa.UniqueConstraint("public_id", name="uq_posts_public_id"),
+        if_not_exists=True,
     )
     op.create_index(
         "uq_posts_type_slug_active",
@@ -275,24 +293,7 @@ def upgrade() -> None:
         ["type", "slug"],
         unique=True,
         postgresql_where=sa.text("deleted_at IS NULL"),
-    )
-    op.create_index(
-        "posts_list_news_idx",
-        "posts",
-        ["type", "status", sa.text("published_at DESC")],
-        postgresql_where=sa.text("type='news' AND deleted_at IS NULL"),
-    )
-    op.create_index(
-        "posts_list_announcement_idx",
-        "posts",
-        ["type", "block_id", "status", sa.text("published_at DESC")],
-        postgresql_where=sa.text("type='announcement' AND deleted_at IS NULL"),
-    )
-    op.create_index(
-        "posts_search_tsv_gin",
-        "posts",
-        ["search_tsv"],
-        postgresql_using="gin",
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -301,33 +302,20 @@ def upgrade() -> None:
         sa.Column(
             "post_id",
             sa.BigInteger(),
-            sa.ForeignKey("posts.id", ondelete="CASCADE"),
             nullable=False,
         ),
-        sa.Column(
-            "editor_id",
-            sa.BigInteger(),
-            sa.ForeignKey("users.id", ondelete="SET NULL"),
-        ),
+        sa.Column("editor_id", sa.BigInteger()),
         sa.Column("title", sa.Text(), nullable=False),
         sa.Column("excerpt", sa.Text()),
         sa.Column("content_html", sa.Text(), nullable=False),
-        sa.Column(
-            "cover_asset_id",
-            sa.BigInteger(),
-            sa.ForeignKey("assets.id", ondelete="SET NULL"),
-        ),
+        sa.Column("cover_asset_id", sa.BigInteger()),
         sa.Column(
             "created_at",
             sa.TIMESTAMP(timezone=True),
             nullable=False,
             server_default=sa.text("now()"),
         ),
-    )
-    op.create_index(
-        "post_revisions_post_time_idx",
-        "post_revisions",
-        ["post_id", sa.text("created_at DESC")],
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -342,22 +330,14 @@ def upgrade() -> None:
         sa.Column("title", sa.Text(), nullable=False),
         sa.Column("slug", sa.Text(), nullable=False),
         sa.Column("description", sa.Text()),
-        sa.Column(
-            "cover_asset_id",
-            sa.BigInteger(),
-            sa.ForeignKey("assets.id", ondelete="SET NULL"),
-        ),
+        sa.Column("cover_asset_id", sa.BigInteger()),
         sa.Column(
             "status",
             content_status,
             nullable=False,
             server_default=sa.text("'published'::content_status"),
         ),
-        sa.Column(
-            "created_by",
-            sa.BigInteger(),
-            sa.ForeignKey("users.id", ondelete="SET NULL"),
-        ),
+        sa.Column("created_by", sa.BigInteger()),
         sa.Column(
             "created_at",
             sa.TIMESTAMP(timezone=True),
@@ -372,6 +352,7 @@ def upgrade() -> None:
         ),
         sa.Column("deleted_at", sa.TIMESTAMP(timezone=True)),
         sa.UniqueConstraint("public_id", name="uq_albums_public_id"),
+        if_not_exists=True,
     )
     op.create_index(
         "uq_albums_slug_active",
@@ -379,12 +360,7 @@ def upgrade() -> None:
         ["slug"],
         unique=True,
         postgresql_where=sa.text("deleted_at IS NULL"),
-    )
-    op.create_index(
-        "albums_list_idx",
-        "albums",
-        ["status", sa.text("created_at DESC")],
-        postgresql_where=sa.text("deleted_at IS NULL"),
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -393,13 +369,11 @@ def upgrade() -> None:
         sa.Column(
             "album_id",
             sa.BigInteger(),
-            sa.ForeignKey("albums.id", ondelete="CASCADE"),
             nullable=False,
         ),
         sa.Column(
             "asset_id",
             sa.BigInteger(),
-            sa.ForeignKey("assets.id", ondelete="RESTRICT"),
             nullable=False,
         ),
         sa.Column(
@@ -421,9 +395,7 @@ def upgrade() -> None:
         sa.UniqueConstraint(
             "album_id", "asset_id", name="uq_album_items_album_asset"
         ),
-    )
-    op.create_index(
-        "album_items_album_pos_idx", "album_items", ["album_id", "position"]
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -439,11 +411,7 @@ def upgrade() -> None:
         sa.Column("url", sa.Text(), nullable=False),
         sa.Column("title", sa.Text()),
         sa.Column("thumbnail_url", sa.Text()),
-        sa.Column(
-            "created_by",
-            sa.BigInteger(),
-            sa.ForeignKey("users.id", ondelete="SET NULL"),
-        ),
+        sa.Column("created_by", sa.BigInteger()),
         sa.Column(
             "created_at",
             sa.TIMESTAMP(timezone=True),
@@ -451,6 +419,7 @@ def upgrade() -> None:
             server_default=sa.text("now()"),
         ),
         sa.UniqueConstraint("public_id", name="uq_video_embeds_public_id"),
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -459,13 +428,11 @@ def upgrade() -> None:
         sa.Column(
             "album_id",
             sa.BigInteger(),
-            sa.ForeignKey("albums.id", ondelete="CASCADE"),
             nullable=False,
         ),
         sa.Column(
             "video_id",
             sa.BigInteger(),
-            sa.ForeignKey("video_embeds.id", ondelete="RESTRICT"),
             nullable=False,
         ),
         sa.Column(
@@ -480,9 +447,7 @@ def upgrade() -> None:
         sa.UniqueConstraint(
             "album_id", "video_id", name="uq_album_videos_album_vid"
         ),
-    )
-    op.create_index(
-        "album_videos_album_pos_idx", "album_videos", ["album_id", "position"]
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -533,12 +498,7 @@ def upgrade() -> None:
             nullable=False,
             server_default=sa.text("now()"),
         ),
-    )
-    op.create_index(
-        "jobs_outbox_pick_idx",
-        "jobs_outbox",
-        ["status", "run_after", "id"],
-        postgresql_where=sa.text("status IN ('queued','failed')"),
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -547,7 +507,6 @@ def upgrade() -> None:
         sa.Column(
             "post_id",
             sa.BigInteger(),
-            sa.ForeignKey("posts.id", ondelete="CASCADE"),
             nullable=False,
         ),
         sa.Column(
@@ -580,11 +539,7 @@ def upgrade() -> None:
             server_default=sa.text("now()"),
         ),
         sa.UniqueConstraint("post_id", name="uq_facebook_post_log_post_id"),
-    )
-    op.create_index(
-        "facebook_post_log_status_idx",
-        "facebook_post_log",
-        ["status", sa.text("updated_at DESC")],
+        if_not_exists=True,
     )
 
     op.create_table(
@@ -609,21 +564,13 @@ def upgrade() -> None:
             nullable=False,
             server_default=sa.text("now()"),
         ),
-    )
-    op.create_index(
-        "contact_messages_status_time_idx",
-        "contact_messages",
-        ["status", sa.text("created_at DESC")],
+        if_not_exists=True,
     )
 
     op.create_table(
         "audit_log",
         sa.Column("id", sa.BigInteger(), primary_key=True),
-        sa.Column(
-            "actor_id",
-            sa.BigInteger(),
-            sa.ForeignKey("users.id", ondelete="SET NULL"),
-        ),
+        sa.Column("actor_id", sa.BigInteger()),
         sa.Column("action", sa.Text(), nullable=False),
         sa.Column("entity_type", sa.Text(), nullable=False),
         sa.Column("entity_id", sa.BigInteger()),
@@ -635,60 +582,53 @@ def upgrade() -> None:
             nullable=False,
             server_default=sa.text("now()"),
         ),
-    )
-    op.create_index(
-        "audit_log_entity_idx",
-        "audit_log",
-        ["entity_type", "entity_id", sa.text("created_at DESC")],
-    )
+        if_not_exists=True,
+    )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    # ALEMBIC_DEFER_INDEXES=1 skips them for a bulk load; build them afterwards
+    # with `python -m app.core.deferred_indexes`.
+    if not os.getenv("ALEMBIC_DEFER_INDEXES"):
+        with op.get_context().autocommit_block():
+            for name, definition in CONCURRENT_INDEXES:
+                create_index_concurrently(name, definition)
+
+    # Foreign keys go last: added NOT VALID (catalog-only), then validated
+    # outside the transaction so the check only takes SHARE UPDATE EXCLUSIVE
+    # and can use the indexes built above.
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        op.execute(f"""
+            DO $$ BEGIN
+                ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey
+                    FOREIGN KEY ({column}) REFERENCES {referred} (id)
+                    ON DELETE {ondelete} NOT VALID;
+            EXCEPTION WHEN duplicate_object THEN null;
+            END $$;
+        """)
+    with op.get_context().autocommit_block():
+        for table, column, _, _ in FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_fkey")
 
 
 def downgrade() -> None:
-    op.drop_index("audit_log_entity_idx", table_name="audit_log")
-    op.drop_table("audit_log")
-
-    op.drop_index(
-        "contact_messages_status_time_idx", table_name="contact_messages"
-    )
-    op.drop_table("contact_messages")
-
-    op.drop_index("facebook_post_log_status_idx", table_name="facebook_post_log")
-    op.drop_table("facebook_post_log")
-
-    op.drop_index("jobs_outbox_pick_idx", table_name="jobs_outbox")
-    op.drop_table("jobs_outbox")
-
-    op.drop_index("album_videos_album_pos_idx", table_name="album_videos")
-    op.drop_table("album_videos")
-
-    op.drop_table("video_embeds")
-
-    op.drop_index("album_items_album_pos_idx", table_name="album_items")
-    op.drop_table("album_items")
-
-    op.drop_index("albums_list_idx", table_name="albums")
-    op.drop_table("albums")
-
-    op.drop_index(
-        "post_revisions_post_time_idx", table_name="post_revisions"
-    )
-    op.drop_table("post_revisions")
-
-    op.drop_index("posts_search_tsv_gin", table_name="posts")
-    op.drop_index("posts_list_announcement_idx", table_name="posts")
-    op.drop_index("posts_list_news_idx", table_name="posts")
-    op.drop_table("posts")
-
-    op.drop_table("blocks")
-
-    op.drop_index("assets_created_at_idx", table_name="assets")
-    op.drop_table("assets")
-
-    op.drop_index("login_attempts_ip_time_idx", table_name="login_attempts")
-    op.drop_index("login_attempts_email_time_idx", table_name="login_attempts")
-    op.drop_table("login_attempts")
-
-    op.drop_table("users")
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(CONCURRENT_INDEXES):
+            drop_index_concurrently(name)
+
+    op.drop_table("audit_log", if_exists=True)
+    op.drop_table("contact_messages", if_exists=True)
+    op.drop_table("facebook_post_log", if_exists=True)
+    op.drop_table("jobs_outbox", if_exists=True)
+    op.drop_table("album_videos", if_exists=True)
+    op.drop_table("video_embeds", if_exists=True)
+    op.drop_table("album_items", if_exists=True)
+    op.drop_table("albums", if_exists=True)
+    op.drop_table("post_revisions", if_exists=True)
+    op.drop_table("posts", if_exists=True)
+    op.drop_table("blocks", if_exists=True)
+    op.drop_table("assets", if_exists=True)
+    op.drop_table("login_attempts", if_exists=True)
+    op.drop_table("users", if_exists=True)
 
     contact_status = sa.Enum("new", "handled", "spam", name="contact_status")
     embed_provider = sa.Enum("youtube", "facebook", name="embed_provider")
@@ -1,8 +1,9 @@
 """Remove editor role from user_role enum (only admin remains)."""
 
+import logging
 from typing import Sequence, Union
 
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -12,22 +13,65 @@ down_revision: Union[str, None] = "0003_drop_login_attempts"
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+logger = logging.getLogger("alembic.runtime.migration")
 
-def upgrade() -> None:
-    # Ensure no editor role remains
-    op.execute("UPDATE users SET role = 'admin' WHERE role = 'editor'")
+BATCH_SIZE = 5000
 
-    # Recreate enum without editor
-    op.execute("ALTER TYPE user_role RENAME TO user_role_old")
-    op.execute("CREATE TYPE user_role AS ENUM ('admin')")
 
-    op.execute("ALTER TABLE users ALTER COLUMN role DROP DEFAULT")
-    op.execute(
-        "ALTER TABLE users ALTER COLUMN role TYPE user_role USING role::text::user_role"
+def _promote_editors() -> None:
+    """Move editors to admin in committed batches to bound lock and WAL size."""
+    if context.is_offline_mode():
+        op.execute("UPDATE users SET role = 'admin' WHERE role = 'editor'")
+        return
+
+    stmt = sa.text(
+        """
+        WITH batch AS (
+            SELECT id FROM users WHERE role = 'editor'
+            ORDER BY id LIMIT :limit FOR UPDATE
+        )
+        UPDATE users SET role = 'admin' FROM batch WHERE users.id = batch.id
+        """
     )
-    op.execute("ALTER TABLE users ALTER COLUMN role SET DEFAULT 'admin'::user_role")
+    bind = op.get_bind()
+    total = 0
+    with op.get_context().autocommit_block():
+        while True:
+            updated = bind.execute(stmt, {"limit": BATCH_SIZE}).rowcount
+            if not updated:
+                break
+            total += updated
+            logger.info("users.role editor -> admin: %s rows (%s total)", updated, total)
 
-    op.execute("DROP TYPE user_role_old")
+
+def upgrade() -> None:
+    # Ensure no editor role remains
+    _promote_editors()
+
+    # Drop the label straight from pg_enum when we can: the type keeps its OID,
+    # so users is not rewritten and the lock is only held for a catalog update.
+    # That needs superuser and is only safe once no row references 'editor'
+    # (users.role is not indexed, so no index page can still hold it).
+    # Otherwise fall back to recreating the enum, which rewrites users under
+    # ACCESS EXCLUSIVE.
+    op.execute("""
+        DO $$ BEGIN
+            IF (SELECT rolsuper FROM pg_roles WHERE rolname = current_user)
+               AND NOT EXISTS (SELECT 1 FROM users WHERE role = 'editor') THEN
+                ALTER TABLE users ALTER COLUMN role SET DEFAULT 'admin'::user_role;
+                DELETE FROM pg_enum
+                WHERE enumtypid = 'user_role'::regtype AND enumlabel = 'editor';
+            ELSE
+                ALTER TYPE user_role RENAME TO user_role_old;
+                CREATE TYPE user_role AS ENUM ('admin');
+                ALTER TABLE users ALTER COLUMN role DROP DEFAULT;
+                ALTER TABLE users
+                    ALTER COLUMN role TYPE user_role USING role::text::user_role;
+                ALTER TABLE users ALTER COLUMN role SET DEFAULT 'admin'::user_role;
+                DROP TYPE user_role_old;
+            END IF;
+        END $$;
+    """)
 
 
 def downgrade() -> None:
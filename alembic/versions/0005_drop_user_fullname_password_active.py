@@ -1,8 +1,9 @@
 """Drop full_name, password_hash, is_active from users."""
 
+import logging
 from typing import Sequence, Union
 
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -12,6 +13,17 @@ down_revision: Union[str, None] = "0004_remove_editor_role"
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+logger = logging.getLogger("alembic.runtime.migration")
+
+BATCH_SIZE = 5000
+
+# column -> default used to backfill existing rows on downgrade
+RESTORED_COLUMNS = [
+    ("full_name", sa.Text(), "''"),
+    ("password_hash", sa.Text(), "''"),
+    ("is_active", sa.Boolean(), "TRUE"),
+]
+
 
 def upgrade() -> None:
     op.drop_column("users", "is_active")
@@ -19,32 +31,44 @@ def upgrade() -> None:
     op.drop_column("users", "full_name")
 
 
-def downgrade() -> None:
-    # Recreate columns with sensible defaults to backfill existing rows
-    op.add_column(
-        "users",
-        sa.Column(
-            "full_name",
-            sa.Text(),
-            nullable=False,
-            server_default=sa.text("''"),
-        ),
-    )
-    op.add_column(
-        "users",
-        sa.Column(
-            "password_hash",
-            sa.Text(),
-            nullable=False,
-            server_default=sa.text("''"),
-        ),
+def _backfill_restored_columns() -> None:
+    """Fill the re-added columns in committed batches to bound lock and WAL size."""
+    assignments = ", ".join(f"{name} = {default}" for name, _, default in RESTORED_COLUMNS)
+    if context.is_offline_mode():
+        op.execute(f"UPDATE users SET {assignments} WHERE full_name IS NULL")
+        return
+
+    stmt = sa.text(
+        f"""
+        UPDATE users SET {assignments}
+        WHERE id IN (
+            SELECT id FROM users WHERE full_name IS NULL ORDER BY id LIMIT :limit
+        )
+        """
     )
-    op.add_column(
-        "users",
-        sa.Column(
-            "is_active",
-            sa.Boolean(),
+    bind = op.get_bind()
+    total = 0
+    with op.get_context().autocommit_block():
+        while True:
+            updated = bind.execute(stmt, {"limit": BATCH_SIZE}).rowcount
+            if not updated:
+                break
+            total += updated
+            logger.info("users backfill: %s rows (%s total)", updated, total)
+
+
+def downgrade() -> None:
+    # Expand: add the columns as nullable so ADD COLUMN is catalog-only
+    for name, type_, _ in RESTORED_COLUMNS:
+        op.add_column("users", sa.Column(name, type_, nullable=True))
+
+    _backfill_restored_columns()
+
+    # Contract: enforce NOT NULL and keep the defaults for new rows
+    for name, _, default in RESTORED_COLUMNS:
+        op.alter_column(
+            "users",
+            name,
             nullable=False,
-            server_default=sa.text("TRUE"),
-        ),
-    )
+            server_default=sa.text(default),
+        )
@@ -2,9 +2,7 @@
 
 from typing import Sequence, Union
 
-from alembic import op
-import sqlalchemy as sa
-from sqlalchemy.dialects import postgresql
+from alembic import context, op
 
 
 # revision identifiers, used by Alembic.
@@ -15,8 +13,15 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    op.drop_column("users", "role")
-    op.drop_column("users", "last_login_at")
+    if context.config.attributes.get("users_squashed"):
+        return  # Applied by 0006 (SQUASH_FRESH)
+    op.execute(
+        """
+        ALTER TABLE users
+            DROP COLUMN role,
+            DROP COLUMN last_login_at
+        """
+    )
     # Drop enum type no longer used
     op.execute("DROP TYPE IF EXISTS user_role")
 
@@ -24,17 +29,10 @@ def upgrade() -> None:
 def downgrade() -> None:
     # Recreate enum and columns
     op.execute("CREATE TYPE user_role AS ENUM ('admin')")
-
-    op.add_column(
-        "users",
-        sa.Column(
-            "role",
-            postgresql.ENUM("admin", name="user_role", create_type=False),
-            nullable=False,
-            server_default=sa.text("'admin'::user_role"),
-        ),
-    )
-    op.add_column(
-        "users",
-        sa.Column("last_login_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    op.execute(
+        """
+        ALTER TABLE users
+            ADD COLUMN role user_role NOT NULL DEFAULT 'admin'::user_role,
+            ADD COLUMN last_login_at TIMESTAMPTZ
+        """
     )
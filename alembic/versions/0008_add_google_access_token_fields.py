@@ -2,8 +2,7 @@
 
 from typing import Sequence, Union
 
-from alembic import op
-import sqlalchemy as sa
+from alembic import context, op
 
 
 # revision identifiers, used by Alembic.
@@ -14,13 +13,22 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    op.add_column("users", sa.Column("google_access_token", sa.Text(), nullable=True))
-    op.add_column(
-        "users",
-        sa.Column("google_access_token_expires_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    if context.config.attributes.get("users_squashed"):
+        return  # Applied by 0006 (SQUASH_FRESH)
+    op.execute(
+        """
+        ALTER TABLE users
+            ADD COLUMN google_access_token TEXT,
+            ADD COLUMN google_access_token_expires_at TIMESTAMPTZ
+        """
     )
 
 
 def downgrade() -> None:
-    op.drop_column("users", "google_access_token_expires_at")
-    op.drop_column("users", "google_access_token")
+    op.execute(
+        """
+        ALTER TABLE users
+            DROP COLUMN google_access_token_expires_at,
+            DROP COLUMN google_access_token
+        """
+    )
@@ -2,7 +2,7 @@
 
 from typing import Sequence, Union
 
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -14,10 +14,28 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    op.add_column("users", sa.Column("google_refresh_token", sa.Text(), nullable=True))
-    op.add_column("users", sa.Column("google_token_scope", sa.Text(), nullable=True))
+    # 0010 drops both columns again, so on a fresh install (no users yet) the
+    # add/drop pair is just two ACCESS EXCLUSIVE cycles for nothing. 0010 and
+    # the downgrade below use IF EXISTS to cope with the skipped columns.
+    if not context.is_offline_mode():
+        has_users = op.get_bind().execute(sa.text("SELECT EXISTS (SELECT 1 FROM users)")).scalar()
+        if not has_users:
+            return
+
+    op.execute(
+        """
+        ALTER TABLE users
+            ADD COLUMN google_refresh_token TEXT,
+            ADD COLUMN google_token_scope TEXT
+        """
+    )
 
 
 def downgrade() -> None:
-    op.drop_column("users", "google_token_scope")
-    op.drop_column("users", "google_refresh_token")
+    op.execute(
+        """
+        ALTER TABLE users
+            DROP COLUMN IF EXISTS google_token_scope,
+            DROP COLUMN IF EXISTS google_refresh_token
+        """
+    )
@@ -2,8 +2,7 @@
 
 from typing import Sequence, Union
 
-from alembic import op
-import sqlalchemy as sa
+from alembic import context, op
 
 
 # revision identifiers, used by Alembic.
@@ -14,14 +13,27 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    op.drop_column("users", "google_refresh_token")
-    op.drop_column("users", "google_token_scope")
-    op.add_column("users", sa.Column("access_token", sa.Text(), nullable=True))
-    op.add_column("users", sa.Column("refresh_token", sa.Text(), nullable=True))
+    if context.config.attributes.get("users_squashed"):
+        return  # Applied by 0006 (SQUASH_FRESH)
+    # IF EXISTS: skipped by 0009 on fresh installs
+    op.execute(
+        """
+        ALTER TABLE users
+            DROP COLUMN IF EXISTS google_refresh_token,
+            DROP COLUMN IF EXISTS google_token_scope,
+            ADD COLUMN access_token TEXT,
+            ADD COLUMN refresh_token TEXT
+        """
+    )
 
 
 def downgrade() -> None:
-    op.drop_column("users", "refresh_token")
-    op.drop_column("users", "access_token")
-    op.add_column("users", sa.Column("google_token_scope", sa.Text(), nullable=True))
-    op.add_column("users", sa.Column("google_refresh_token", sa.Text(), nullable=True))
+    op.execute(
+        """
+        ALTER TABLE users
+            DROP COLUMN refresh_token,
+            DROP COLUMN access_token,
+            ADD COLUMN google_token_scope TEXT,
+            ADD COLUMN google_refresh_token TEXT
+        """
+    )
@@ -2,8 +2,7 @@
 
 from typing import Sequence, Union
 
-from alembic import op
-import sqlalchemy as sa
+from alembic import context, op
 
 
 # revision identifiers, used by Alembic.
@@ -14,36 +13,32 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # Facebook User Token (Long-lived, 60 days)
-    op.add_column("users", sa.Column("facebook_user_access_token", sa.Text(), nullable=True))
-    op.add_column(
-        "users",
-        sa.Column(
-            "facebook_user_token_expires_at",
-            sa.TIMESTAMP(timezone=True),
-            nullable=True,
-        ),
+    if context.config.attributes.get("users_squashed"):
+        return  # Applied by 0006 (SQUASH_FRESH)
+    op.execute(
+        """
+        ALTER TABLE users
+            -- Facebook User Token (Long-lived, 60 days)
+            ADD COLUMN facebook_user_access_token TEXT,
+            ADD COLUMN facebook_user_token_expires_at TIMESTAMPTZ,
+            -- Facebook Page Token
+            ADD COLUMN facebook_page_id TEXT,
+            ADD COLUMN facebook_access_token TEXT,
+            ADD COLUMN facebook_token_expires_at TIMESTAMPTZ,
+            ADD COLUMN facebook_page_name TEXT
+        """
     )
-    
-    # Facebook Page Token
-    op.add_column("users", sa.Column("facebook_page_id", sa.Text(), nullable=True))
-    op.add_column("users", sa.Column("facebook_access_token", sa.Text(), nullable=True))
-    op.add_column(
-        "users",
-        sa.Column(
-            "facebook_token_expires_at",
-            sa.TIMESTAMP(timezone=True),
-            nullable=True,
-        ),
-    )
-    op.add_column("users", sa.Column("facebook_page_name", sa.Text(), nullable=True))
 
 
 def downgrade() -> None:
-    op.drop_column("users", "facebook_page_name")
-    op.drop_column("users", "facebook_token_expires_at")
-    op.drop_column("users", "facebook_access_token")
-    op.drop_column("users", "facebook_page_id")
-    op.drop_column("users", "facebook_user_token_expires_at")
-    op.drop_column("users", "facebook_user_access_token")
-
+    op.execute(
+        """
+        ALTER TABLE users
+            DROP COLUMN facebook_page_name,
+            DROP COLUMN facebook_token_expires_at,
+            DROP COLUMN facebook_access_token,
+            DROP COLUMN facebook_page_id,
+            DROP COLUMN facebook_user_token_expires_at,
+            DROP COLUMN facebook_user_access_token
+        """
+    )
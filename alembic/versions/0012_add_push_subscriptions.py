@@ -49,8 +49,21 @@ def upgrade() -> None:
         "push_subscriptions",
         [sa.text("created_at DESC")],
     )
+    # Index the ON DELETE SET NULL foreign key while the table is still empty,
+    # under the same lock as the CREATE TABLE. Same definition as 0026, which
+    # builds it CONCURRENTLY on databases that ran this revision without it.
+    op.create_index(
+        "ix_push_subscriptions_user_id",
+        "push_subscriptions",
+        ["user_id"],
+        postgresql_where=sa.text("user_id IS NOT NULL"),
+        if_not_exists=True,
+    )
 
 
 def downgrade() -> None:
+    op.drop_index(
+        "ix_push_subscriptions_user_id", table_name="push_subscriptions", if_exists=True
+    )
     op.drop_index("push_subscriptions_created_at_idx", table_name="push_subscriptions")
     op.drop_table("push_subscriptions")
@@ -6,7 +6,6 @@ Create Date: 2026-01-XX XX:XX:XX.XXXXXX
 
 """
 from alembic import op
-import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
@@ -18,7 +17,19 @@ depends_on = None
 
 def upgrade() -> None:
     # Add 'local' value to embed_provider enum
-    op.execute("ALTER TYPE embed_provider ADD VALUE IF NOT EXISTS 'local'")
+    statement = "ALTER TYPE embed_provider ADD VALUE IF NOT EXISTS 'local'"
+
+    # PG12+ allows ADD VALUE inside a transaction (the value just cannot be
+    # used before commit, and nothing here uses it), so keep it in the
+    # migration transaction. Older servers reject that; for them this is the
+    # chain's single non-transactional step. Offline (--sql) has no server
+    # version and emits the plain statement.
+    version = op.get_bind().dialect.server_version_info
+    if version is None or version >= (12,):
+        op.execute(statement)
+    else:
+        with op.get_context().autocommit_block():
+            op.execute(statement)
 
 
 def downgrade() -> None:
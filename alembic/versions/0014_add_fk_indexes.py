@@ -0,0 +1,54 @@
+"""Add indexes on foreign-key columns that had none."""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migration_ops import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014_add_fk_indexes"
+down_revision: Union[str, None] = "0013_add_local_to_embed_provider"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Without these, every delete/update of a parent row seq-scans the child table
+# to enforce ON DELETE SET NULL/CASCADE/RESTRICT. post_revisions.post_id,
+# album_items.album_id, album_videos.album_id and post_assets.post_id are
+# already the leading column of an existing index.
+FK_INDEXES = [
+    ("ix_posts_cover_asset_id", "posts (cover_asset_id)"),
+    ("ix_posts_og_image_asset_id", "posts (og_image_asset_id)"),
+    ("ix_posts_author_id", "posts (author_id)"),
+    ("ix_posts_block_id_status", "posts (block_id, status, published_at DESC)"),
+    ("ix_post_revisions_editor_id", "post_revisions (editor_id)"),
+    ("ix_post_revisions_cover_asset_id", "post_revisions (cover_asset_id)"),
+    ("ix_post_assets_asset_id", "post_assets (asset_id)"),
+    ("ix_assets_uploaded_by", "assets (uploaded_by)"),
+    ("ix_albums_cover_asset_id", "albums (cover_asset_id)"),
+    ("ix_albums_created_by", "albums (created_by)"),
+    ("ix_album_items_asset_id", "album_items (asset_id)"),
+    ("ix_video_embeds_created_by", "video_embeds (created_by)"),
+    ("ix_album_videos_video_id", "album_videos (video_id)"),
+    ("ix_audit_log_actor_id", "audit_log (actor_id)"),
+]
+
+
+def upgrade() -> None:
+    # Built later by `python -m app.core.deferred_indexes` (see 0001)
+    if os.getenv("ALEMBIC_DEFER_INDEXES"):
+        return
+
+    # 0001 has shipped, so build the indexes without blocking writes
+    with op.get_context().autocommit_block():
+        for name, definition in FK_INDEXES:
+            create_index_concurrently(name, definition)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(FK_INDEXES):
+            drop_index_concurrently(name)
@@ -0,0 +1,71 @@
+"""Make the posts list indexes covering and drop their redundant type key."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migration_ops import (
+    create_index_concurrently,
+    defer_index_rebuild,
+    drop_index_concurrently,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0015_post_list_covering"
+down_revision: Union[str, None] = "0014_add_fk_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The partial WHERE already pins type, so it is not part of the key; the
+# announcement index leads with block_id since that list filters by block.
+# ck_posts_block_id_by_type makes block_id IS NOT NULL equivalent to
+# type='announcement', and unlike the type test the planner can prove it from
+# any block_id = ... condition, so lookups by block need no type filter.
+# INCLUDE id so the list COUNT(posts.id) queries can run as index-only scans.
+# title/excerpt are left out: they are unbounded text and would push index
+# tuples toward the btree row-size limit.
+LIST_INDEXES = [
+    (
+        "posts_list_news_idx",
+        "posts (status, published_at DESC) "
+        "INCLUDE (id, slug, cover_asset_id) "
+        "WHERE type='news' AND deleted_at IS NULL",
+        "posts (type, status, published_at DESC) "
+        "WHERE type='news' AND deleted_at IS NULL",
+    ),
+    (
+        "posts_list_announcement_idx",
+        "posts (block_id, status, published_at DESC) "
+        "INCLUDE (id, slug, cover_asset_id) "
+        "WHERE block_id IS NOT NULL AND deleted_at IS NULL",
+        "posts (type, block_id, status, published_at DESC) "
+        "WHERE type='announcement' AND deleted_at IS NULL",
+    ),
+]
+
+
+def _rebuild(name: str, definition: str) -> None:
+    # Build the replacement under a temporary name first so the list queries
+    # always have an index to use, then swap it in.
+    create_index_concurrently(f"{name}_new", definition)
+    drop_index_concurrently(name)
+    op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+
+
+def upgrade() -> None:
+    # Built later by `python -m app.core.deferred_indexes` (see 0001), but only
+    # on a fresh install: an existing old index must be rebuilt here
+    if defer_index_rebuild(*(name for name, _, _ in LIST_INDEXES)):
+        return
+
+    with op.get_context().autocommit_block():
+        for name, definition, _ in LIST_INDEXES:
+            _rebuild(name, definition)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, definition in LIST_INDEXES:
+            _rebuild(name, definition)
@@ -0,0 +1,53 @@
+"""Generate posts.search_tsv from title/excerpt/content_html."""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.migration_ops import create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0016_generated_search_tsv"
+down_revision: Union[str, None] = "0015_post_list_covering"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_TSV_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(excerpt, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(content_html, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # A column cannot be switched to GENERATED in place; dropping it also
+    # drops posts_search_tsv_gin, which is rebuilt below.
+    op.drop_column("posts", "search_tsv")
+    op.add_column(
+        "posts",
+        sa.Column(
+            "search_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_TSV_EXPRESSION, persisted=True),
+        ),
+    )
+
+    # Built later by `python -m app.core.deferred_indexes` (see 0001)
+    if os.getenv("ALEMBIC_DEFER_INDEXES"):
+        return
+
+    with op.get_context().autocommit_block():
+        create_index_concurrently("posts_search_tsv_gin", "posts USING gin (search_tsv)")
+
+
+def downgrade() -> None:
+    op.drop_column("posts", "search_tsv")
+    op.add_column("posts", sa.Column("search_tsv", postgresql.TSVECTOR()))
+
+    with op.get_context().autocommit_block():
+        create_index_concurrently("posts_search_tsv_gin", "posts USING gin (search_tsv)")
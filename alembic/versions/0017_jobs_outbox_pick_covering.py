@@ -0,0 +1,52 @@
+"""Reshape jobs_outbox_pick_idx for the worker polling query."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migration_ops import (
+    create_index_concurrently,
+    defer_index_rebuild,
+    drop_index_concurrently,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0017_jobs_outbox_pick_covering"
+down_revision: Union[str, None] = "0016_generated_search_tsv"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Workers poll with ORDER BY run_after, id; status only takes the two values
+# pinned by the partial WHERE, so it does not need to be a key column.
+# payload is not included: JSONB of arbitrary size could exceed the btree
+# row-size limit and make enqueueing fail.
+NEW_DEFINITION = (
+    "jobs_outbox (run_after, id) INCLUDE (type, attempt_count) "
+    "WHERE status IN ('queued','failed')"
+)
+OLD_DEFINITION = (
+    "jobs_outbox (status, run_after, id) WHERE status IN ('queued','failed')"
+)
+
+
+def _rebuild(definition: str) -> None:
+    create_index_concurrently("jobs_outbox_pick_idx_new", definition)
+    drop_index_concurrently("jobs_outbox_pick_idx")
+    op.execute("ALTER INDEX jobs_outbox_pick_idx_new RENAME TO jobs_outbox_pick_idx")
+
+
+def upgrade() -> None:
+    # Built later by `python -m app.core.deferred_indexes` (see 0001), but only
+    # on a fresh install: an existing old index must be rebuilt here
+    if defer_index_rebuild("jobs_outbox_pick_idx"):
+        return
+
+    with op.get_context().autocommit_block():
+        _rebuild(NEW_DEFINITION)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _rebuild(OLD_DEFINITION)
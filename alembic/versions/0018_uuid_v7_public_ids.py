@@ -0,0 +1,66 @@
+"""Generate time-ordered (UUIDv7) public_id values."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0018_uuid_v7_public_ids"
+down_revision: Union[str, None] = "0017_jobs_outbox_pick_covering"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PUBLIC_ID_TABLES = ["users", "assets", "posts", "albums", "video_embeds"]
+
+
+def upgrade() -> None:
+    # Prefer the pg_uuidv7 extension; where it is not installed (e.g. the stock
+    # postgres image) fall back to an equivalent SQL function: 48-bit unix ms
+    # timestamp over a random v4 UUID, with the version nibble set to 7.
+    op.execute("""
+        DO $$ BEGIN
+            BEGIN
+                CREATE EXTENSION IF NOT EXISTS pg_uuidv7;
+            EXCEPTION WHEN OTHERS THEN null;
+            END;
+            IF to_regprocedure('uuid_generate_v7()') IS NULL THEN
+                CREATE FUNCTION uuid_generate_v7() RETURNS uuid
+                LANGUAGE sql VOLATILE PARALLEL SAFE AS $f$
+                    SELECT encode(
+                        set_bit(set_bit(overlay(uuid_send(gen_random_uuid())
+                            placing substring(int8send(
+                                floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint
+                            ) FROM 3)
+                            FROM 1 FOR 6), 52, 1), 53, 1),
+                        'hex')::uuid
+                $f$;
+            END IF;
+        END $$;
+    """)
+
+    # Only new rows are affected; existing public_id values stay as they are
+    for table in PUBLIC_ID_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN public_id SET DEFAULT uuid_generate_v7()"
+        )
+
+
+def downgrade() -> None:
+    for table in PUBLIC_ID_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN public_id SET DEFAULT gen_random_uuid()"
+        )
+
+    # Drop the fallback function, but leave one owned by the pg_uuidv7 extension
+    op.execute("""
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_depend
+                WHERE objid = to_regprocedure('uuid_generate_v7()') AND deptype = 'e'
+            ) THEN
+                DROP FUNCTION IF EXISTS uuid_generate_v7();
+            END IF;
+        END $$;
+    """)
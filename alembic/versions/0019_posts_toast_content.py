@@ -0,0 +1,33 @@
+"""Move content_html out of the posts/post_revisions main heap via TOAST."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0019_posts_toast_content"
+down_revision: Union[str, None] = "0018_uuid_v7_public_ids"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# By default a row is only TOASTed once it exceeds ~2 KB, so medium-sized
+# content_html stays inline and widens every heap tuple that list/count scans
+# touch. Lowering toast_tuple_target makes PostgreSQL compress and move it to
+# the table's TOAST relation (the side table) much earlier. Applies to rows as
+# they are inserted/updated; existing rows move on their next write.
+TOAST_TUPLE_TARGET = 256
+TABLES = ["posts", "post_revisions"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(
+            f"ALTER TABLE {table} SET (toast_tuple_target = {TOAST_TUPLE_TARGET})"
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} RESET (toast_tuple_target)")
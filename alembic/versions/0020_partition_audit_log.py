@@ -0,0 +1,103 @@
+"""Recreate audit_log as a table partitioned by month on created_at."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0020_partition_audit_log"
+down_revision: Union[str, None] = "0019_posts_toast_content"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+AUDIT_LOG_COLUMNS = """
+    id BIGINT NOT NULL DEFAULT nextval('audit_log_id_seq'),
+    actor_id BIGINT REFERENCES users (id) ON DELETE SET NULL,
+    action TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    entity_id BIGINT,
+    diff JSONB,
+    ip INET,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+"""
+
+
+def _set_aside_current_table(suffix: str) -> None:
+    # Free the relation names so the replacement can take them over
+    op.execute(f"ALTER TABLE audit_log RENAME TO audit_log_{suffix}")
+    op.execute(
+        f"ALTER TABLE audit_log_{suffix} RENAME CONSTRAINT audit_log_pkey "
+        f"TO audit_log_{suffix}_pkey"
+    )
+    op.execute(
+        f"ALTER INDEX IF EXISTS audit_log_entity_idx RENAME TO audit_log_{suffix}_entity_idx"
+    )
+    op.execute(
+        f"ALTER INDEX IF EXISTS ix_audit_log_actor_id RENAME TO audit_log_{suffix}_actor_id_idx"
+    )
+
+
+def _create_indexes() -> None:
+    op.execute(
+        "CREATE INDEX audit_log_entity_idx "
+        "ON audit_log (entity_type, entity_id, created_at DESC)"
+    )
+    op.execute("CREATE INDEX ix_audit_log_actor_id ON audit_log (actor_id)")
+
+
+def upgrade() -> None:
+    # audit_log is append-only; monthly partitions keep each index small and
+    # make retention a DROP TABLE audit_log_YYYYMM instead of a bulk DELETE.
+    _set_aside_current_table("old")
+    op.execute(f"""
+        CREATE TABLE audit_log ({AUDIT_LOG_COLUMNS},
+            CONSTRAINT audit_log_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE audit_log_id_seq OWNED BY audit_log.id")
+    # Defined on the parent so every partition gets them
+    _create_indexes()
+
+    # Pre-creates this month's and the next N months' partitions. The app runs
+    # it at startup and daily (app.core.partitions; `python -m
+    # app.core.partitions` from cron otherwise). Rows outside them land in
+    # audit_log_default.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION audit_log_ensure_partitions(months_ahead integer DEFAULT 2)
+        RETURNS void LANGUAGE plpgsql AS $$
+        DECLARE
+            month_start date;
+        BEGIN
+            FOR i IN 0..months_ahead LOOP
+                month_start := (date_trunc('month', now()) + make_interval(months => i))::date;
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+                    'audit_log_' || to_char(month_start, 'YYYYMM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+            END LOOP;
+        END $$;
+    """)
+    op.execute("SELECT audit_log_ensure_partitions()")
+    op.execute("CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT")
+
+    op.execute("INSERT INTO audit_log SELECT * FROM audit_log_old")
+    op.execute("DROP TABLE audit_log_old")
+
+
+def downgrade() -> None:
+    _set_aside_current_table("partitioned")
+    op.execute(f"""
+        CREATE TABLE audit_log ({AUDIT_LOG_COLUMNS},
+            CONSTRAINT audit_log_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE audit_log_id_seq OWNED BY audit_log.id")
+    _create_indexes()
+
+    op.execute("INSERT INTO audit_log SELECT * FROM audit_log_partitioned")
+    op.execute("DROP TABLE audit_log_partitioned")
+    op.execute("DROP FUNCTION IF EXISTS audit_log_ensure_partitions(integer)")
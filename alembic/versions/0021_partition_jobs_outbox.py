@@ -0,0 +1,83 @@
+"""Split jobs_outbox into a hot (queued/failed) and a cold LIST partition."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0021_partition_jobs_outbox"
+down_revision: Union[str, None] = "0020_partition_audit_log"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JOBS_OUTBOX_COLUMNS = """
+    id BIGINT NOT NULL DEFAULT nextval('jobs_outbox_id_seq'),
+    type job_type NOT NULL DEFAULT 'post_to_facebook'::job_type,
+    status job_status NOT NULL DEFAULT 'queued'::job_status,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_at TIMESTAMPTZ,
+    locked_by TEXT,
+    attempt_count INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+"""
+
+
+def _set_aside_current_table(suffix: str) -> None:
+    # Free the relation names so the replacement can take them over
+    op.execute(f"ALTER TABLE jobs_outbox RENAME TO jobs_outbox_{suffix}")
+    op.execute(
+        f"ALTER TABLE jobs_outbox_{suffix} RENAME CONSTRAINT jobs_outbox_pkey "
+        f"TO jobs_outbox_{suffix}_pkey"
+    )
+    op.execute(
+        f"ALTER INDEX IF EXISTS jobs_outbox_pick_idx RENAME TO jobs_outbox_{suffix}_pick_idx"
+    )
+
+
+def upgrade() -> None:
+    # Workers only ever poll queued/failed jobs; succeeded/dead rows move to the
+    # cold partition (UPDATE of status moves the row), so the hot partition and
+    # its index stay small no matter how much history accumulates.
+    _set_aside_current_table("old")
+    op.execute(f"""
+        CREATE TABLE jobs_outbox ({JOBS_OUTBOX_COLUMNS},
+            CONSTRAINT jobs_outbox_pkey PRIMARY KEY (id, status)
+        ) PARTITION BY LIST (status)
+    """)
+    op.execute("ALTER SEQUENCE jobs_outbox_id_seq OWNED BY jobs_outbox.id")
+    op.execute(
+        "CREATE TABLE jobs_outbox_hot PARTITION OF jobs_outbox "
+        "FOR VALUES IN ('queued', 'failed')"
+    )
+    op.execute("CREATE TABLE jobs_outbox_cold PARTITION OF jobs_outbox DEFAULT")
+    # The whole hot partition is the pick set, so its index needs no predicate
+    op.execute(
+        "CREATE INDEX jobs_outbox_pick_idx "
+        "ON jobs_outbox_hot (run_after, id) INCLUDE (type, attempt_count)"
+    )
+
+    op.execute("INSERT INTO jobs_outbox SELECT * FROM jobs_outbox_old")
+    op.execute("DROP TABLE jobs_outbox_old")
+
+
+def downgrade() -> None:
+    _set_aside_current_table("partitioned")
+    op.execute(f"""
+        CREATE TABLE jobs_outbox ({JOBS_OUTBOX_COLUMNS},
+            CONSTRAINT jobs_outbox_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE jobs_outbox_id_seq OWNED BY jobs_outbox.id")
+    op.execute(
+        "CREATE INDEX jobs_outbox_pick_idx "
+        "ON jobs_outbox (run_after, id) INCLUDE (type, attempt_count) "
+        "WHERE status IN ('queued','failed')"
+    )
+
+    op.execute("INSERT INTO jobs_outbox SELECT * FROM jobs_outbox_partitioned")
+    op.execute("DROP TABLE jobs_outbox_partitioned")
@@ -0,0 +1,59 @@
+"""Tune TOAST storage/compression of the JSONB payload columns."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0022_jsonb_storage"
+down_revision: Union[str, None] = "0021_partition_jobs_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Read on every worker poll / Facebook retry: lz4 decompresses much faster
+# than the default pglz.
+LZ4_COLUMNS = [
+    ("jobs_outbox", "payload"),
+    ("facebook_post_log", "request_payload"),
+    ("facebook_post_log", "response_payload"),
+]
+
+
+def upgrade() -> None:
+    # Column compression needs PG14+ built with lz4; otherwise keep pglz.
+    # Applies to values written from now on.
+    statements = "\n".join(
+        f"EXECUTE 'ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION lz4';"
+        for table, column in LZ4_COLUMNS
+    )
+    op.execute(f"""
+        DO $$ BEGIN
+            IF current_setting('server_version_num')::int >= 140000 THEN
+                {statements}
+            END IF;
+        EXCEPTION WHEN feature_not_supported THEN
+            RAISE NOTICE 'lz4 compression not available, keeping pglz';
+        END $$;
+    """)
+
+    # audit_log.diff is written once and rarely read: store it out of line
+    # uncompressed so the occasional read does not pay for decompression.
+    op.execute("ALTER TABLE audit_log ALTER COLUMN diff SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_log ALTER COLUMN diff SET STORAGE EXTENDED")
+
+    statements = "\n".join(
+        f"EXECUTE 'ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION default';"
+        for table, column in LZ4_COLUMNS
+    )
+    op.execute(f"""
+        DO $$ BEGIN
+            IF current_setting('server_version_num')::int >= 140000 THEN
+                {statements}
+            END IF;
+        END $$;
+    """)
@@ -0,0 +1,62 @@
+"""Store emails as TEXT; enforce case-insensitive uniqueness via lower(email)."""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.migration_ops import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0023_email_text_lower_unique"
+down_revision: Union[str, None] = "0022_jsonb_storage"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # citext -> text is a binary-coercible cast, so the heap is not rewritten
+    op.alter_column(
+        "users",
+        "email",
+        type_=sa.Text(),
+        existing_type=postgresql.CITEXT(),
+        existing_nullable=False,
+    )
+    op.alter_column(
+        "contact_messages",
+        "email",
+        type_=sa.Text(),
+        existing_type=postgresql.CITEXT(),
+    )
+
+    # Build the case-insensitive replacement before dropping the old
+    # constraint so uniqueness is enforced throughout
+    with op.get_context().autocommit_block():
+        create_index_concurrently("uq_users_email_ci", "users (lower(email))", unique=True)
+    op.drop_constraint("uq_users_email", "users", type_="unique")
+    # The citext extension stays: 0003's downgrade still recreates a citext table
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "contact_messages",
+        "email",
+        type_=postgresql.CITEXT(),
+        existing_type=sa.Text(),
+        postgresql_using="email::citext",
+    )
+    op.alter_column(
+        "users",
+        "email",
+        type_=postgresql.CITEXT(),
+        existing_type=sa.Text(),
+        existing_nullable=False,
+        postgresql_using="email::citext",
+    )
+    op.create_unique_constraint("uq_users_email", "users", ["email"])
+
+    with op.get_context().autocommit_block():
+        drop_index_concurrently("uq_users_email_ci")
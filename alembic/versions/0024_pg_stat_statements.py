@@ -0,0 +1,81 @@
+"""Enable pg_stat_statements/auto_explain and add a slow-statement view."""
+
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0024_pg_stat_statements"
+down_revision: Union[str, None] = "0023_email_text_lower_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+PRELOAD_LIBRARIES = ["pg_stat_statements", "auto_explain"]
+
+
+def _preload_libraries() -> None:
+    """Add the libraries to shared_preload_libraries (takes effect on restart).
+
+    ALTER SYSTEM needs superuser and cannot run in a transaction; on managed
+    databases where we are not superuser this is left to the provider's
+    settings. Offline (--sql) runs cannot see the current value, so they skip it.
+    """
+    if context.is_offline_mode():
+        return
+
+    bind = op.get_bind()
+    if not bind.scalar(sa.text("SELECT rolsuper FROM pg_roles WHERE rolname = current_user")):
+        logger.info("Not superuser: leaving shared_preload_libraries unchanged")
+        return
+
+    current = bind.scalar(sa.text("SELECT current_setting('shared_preload_libraries')"))
+    libraries = [lib.strip().strip('"') for lib in current.split(",") if lib.strip()]
+    missing = [lib for lib in PRELOAD_LIBRARIES if lib not in libraries]
+    if not missing:
+        return
+
+    # A list setting takes one literal per library: a single 'a, b' literal
+    # would be stored as one library named "a, b" and the server would not start
+    value = ", ".join(f"'{lib}'" for lib in libraries + missing)
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER SYSTEM SET shared_preload_libraries = {value}")
+        op.execute("ALTER SYSTEM SET auto_explain.log_min_duration = '500ms'")
+    logger.warning("Restart PostgreSQL to load %s", ", ".join(missing))
+
+
+def upgrade() -> None:
+    _preload_libraries()
+
+    # auto_explain is a loadable module only (no CREATE EXTENSION). The
+    # extension may be unavailable or need privileges we lack; migrations must
+    # not fail because of observability, so only raise a notice then.
+    op.execute("""
+        DO $$ BEGIN
+            CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
+            CREATE OR REPLACE VIEW v_slow_statements AS
+                SELECT
+                    s.query,
+                    s.calls,
+                    round(s.total_exec_time::numeric, 2) AS total_ms,
+                    round(s.mean_exec_time::numeric, 2) AS mean_ms,
+                    s.rows,
+                    s.shared_blks_hit,
+                    s.shared_blks_read
+                FROM pg_stat_statements AS s
+                WHERE s.dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+                ORDER BY s.mean_exec_time DESC
+                LIMIT 50;
+        EXCEPTION WHEN OTHERS THEN
+            RAISE NOTICE 'pg_stat_statements not available: %', SQLERRM;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    # The extension and server settings may predate this revision; keep them
+    op.execute("DROP VIEW IF EXISTS v_slow_statements")
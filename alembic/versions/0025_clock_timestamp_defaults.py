@@ -0,0 +1,27 @@
+"""Default created_at to clock_timestamp() on append-only tables."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0025_clock_timestamp_defaults"
+down_revision: Union[str, None] = "0024_pg_stat_statements"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# now() is the transaction start time, so every row of a batched insert gets
+# the same created_at; clock_timestamp() keeps them in insertion order.
+APPEND_ONLY_TABLES = ["audit_log", "jobs_outbox", "facebook_post_log"]
+
+
+def upgrade() -> None:
+    for table in APPEND_ONLY_TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET DEFAULT clock_timestamp()")
+
+
+def downgrade() -> None:
+    for table in APPEND_ONLY_TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET DEFAULT now()")
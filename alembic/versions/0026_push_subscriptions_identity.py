@@ -0,0 +1,79 @@
+"""Switch push_subscriptions.id to IDENTITY and index subscriptions by user."""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migration_ops import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0026_push_subscriptions_identity"
+down_revision: Union[str, None] = "0025_clock_timestamp_defaults"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Replace the BIGSERIAL default/sequence with an identity column, carrying
+    # the counter over so existing ids are never reissued.
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            next_id bigint;
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_attribute
+                WHERE attrelid = 'push_subscriptions'::regclass
+                  AND attname = 'id' AND attidentity = ''
+            ) THEN
+                SELECT COALESCE(max(id), 0) + 1 INTO next_id FROM push_subscriptions;
+                ALTER TABLE push_subscriptions ALTER COLUMN id DROP DEFAULT;
+                DROP SEQUENCE IF EXISTS push_subscriptions_id_seq;
+                ALTER TABLE push_subscriptions
+                    ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+                PERFORM setval(pg_get_serial_sequence('push_subscriptions', 'id'), next_id, false);
+            END IF;
+        END $$;
+        """
+    )
+
+    # Built later by `python -m app.core.deferred_indexes` (see 0001)
+    if os.getenv("ALEMBIC_DEFER_INDEXES"):
+        return
+
+    # Anonymous subscriptions (user_id NULL) are never looked up by user
+    with op.get_context().autocommit_block():
+        create_index_concurrently(
+            "ix_push_subscriptions_user_id",
+            "push_subscriptions (user_id) WHERE user_id IS NOT NULL",
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_index_concurrently("ix_push_subscriptions_user_id")
+
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            next_id bigint;
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_attribute
+                WHERE attrelid = 'push_subscriptions'::regclass
+                  AND attname = 'id' AND attidentity <> ''
+            ) THEN
+                SELECT COALESCE(max(id), 0) + 1 INTO next_id FROM push_subscriptions;
+                ALTER TABLE push_subscriptions ALTER COLUMN id DROP IDENTITY;
+                CREATE SEQUENCE push_subscriptions_id_seq OWNED BY push_subscriptions.id;
+                PERFORM setval('push_subscriptions_id_seq', next_id, false);
+                ALTER TABLE push_subscriptions
+                    ALTER COLUMN id SET DEFAULT nextval('push_subscriptions_id_seq');
+            END IF;
+        END $$;
+        """
+    )
@@ -0,0 +1,40 @@
+"""Enforce unique push_subscriptions.endpoint with a hash index."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0027_push_endpoint_hash_unique"
+down_revision: Union[str, None] = "0026_push_subscriptions_identity"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Endpoints are long WebPush URLs that are only ever matched by equality, so a
+# hash index (which stores a 4-byte hash instead of the URL) is much smaller
+# than the btree behind the UNIQUE constraint. Hash indexes cannot be UNIQUE;
+# an EXCLUDE ... WITH = constraint gives the same guarantee on top of one.
+# upsert_subscription looks the row up before inserting, it does not rely on
+# ON CONFLICT (which exclusion constraints do not support for DO UPDATE).
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE push_subscriptions
+            ADD CONSTRAINT uq_push_subscriptions_endpoint EXCLUDE USING hash (endpoint WITH =),
+            DROP CONSTRAINT IF EXISTS push_subscriptions_endpoint_key
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE push_subscriptions
+            ADD CONSTRAINT push_subscriptions_endpoint_key UNIQUE (endpoint),
+            DROP CONSTRAINT IF EXISTS uq_push_subscriptions_endpoint
+        """
+    )
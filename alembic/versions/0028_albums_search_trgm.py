@@ -0,0 +1,42 @@
+"""Add a trigram index for the admin album search."""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migration_ops import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0028_albums_search_trgm"
+down_revision: Union[str, None] = "0027_push_endpoint_hash_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# list_albums matches q with ILIKE '%q%' against this exact expression, so a
+# single trigram index serves the title/slug/description search. The status
+# filter and created_at ordering are already covered by albums_list_idx (0001).
+SEARCH_EXPRESSION = "(title || ' ' || slug || ' ' || coalesce(description, ''))"
+
+
+def upgrade() -> None:
+    # pg_trgm is a trusted extension (PG13+), so the database owner can create it
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Built later by `python -m app.core.deferred_indexes` (see 0001)
+    if os.getenv("ALEMBIC_DEFER_INDEXES"):
+        return
+
+    with op.get_context().autocommit_block():
+        create_index_concurrently(
+            "albums_search_trgm_idx",
+            f"albums USING gin ({SEARCH_EXPRESSION} gin_trgm_ops) WHERE deleted_at IS NULL",
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_index_concurrently("albums_search_trgm_idx")
+    # pg_trgm stays: other objects may have come to depend on it
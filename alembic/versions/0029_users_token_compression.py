@@ -0,0 +1,52 @@
+"""Compress the users token columns with lz4."""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0029_users_token_compression"
+down_revision: Union[str, None] = "0028_albums_search_trgm"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# These hold JWTs and OAuth tokens as issued (ASCII text, not encrypted
+# binary), so BYTEA would save nothing. Together they push users rows past
+# the TOAST threshold, where lz4 decompresses far cheaper than pglz on each
+# user fetch.
+TOKEN_COLUMNS = [
+    "google_id_token",
+    "google_access_token",
+    "access_token",
+    "refresh_token",
+    "facebook_user_access_token",
+    "facebook_access_token",
+]
+
+
+def _set_compression(method: str) -> None:
+    statements = "\n".join(
+        f"EXECUTE 'ALTER TABLE users ALTER COLUMN {column} SET COMPRESSION {method}';"
+        for column in TOKEN_COLUMNS
+    )
+    # Column compression needs PG14+ built with lz4 (see 0022); applies to
+    # values written from now on.
+    op.execute(f"""
+        DO $$ BEGIN
+            IF current_setting('server_version_num')::int >= 140000 THEN
+                {statements}
+            END IF;
+        EXCEPTION WHEN feature_not_supported THEN
+            RAISE NOTICE 'lz4 compression not available, keeping pglz';
+        END $$;
+    """)
+
+
+def upgrade() -> None:
+    _set_compression("lz4")
+
+
+def downgrade() -> None:
+    _set_compression("default")
@@ -0,0 +1,46 @@
+"""Add indexes matching the keyset order of the admin news/contact lists."""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migration_ops import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0030_keyset_list_indexes"
+down_revision: Union[str, None] = "0029_users_token_compression"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Cursor pages seek with a single row comparison on the full key, so each key
+# matches its list's ORDER BY exactly. News sorts unpublished posts last by
+# ordering on coalesce(published_at, '-infinity'), which keeps the key NOT NULL
+# and the row comparison usable as an index condition. The status-leading list
+# indexes from 0001/0015 only serve requests that filter by status.
+KEYSET_INDEXES = [
+    (
+        "posts_news_keyset_idx",
+        "posts (coalesce(published_at, '-infinity'::timestamptz) DESC, created_at DESC, id DESC) "
+        "WHERE type='news' AND deleted_at IS NULL",
+    ),
+    ("contact_messages_keyset_idx", "contact_messages (created_at DESC, id DESC)"),
+]
+
+
+def upgrade() -> None:
+    # Built later by `python -m app.core.deferred_indexes` (see 0001)
+    if os.getenv("ALEMBIC_DEFER_INDEXES"):
+        return
+
+    with op.get_context().autocommit_block():
+        for name, definition in KEYSET_INDEXES:
+            create_index_concurrently(name, definition)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(KEYSET_INDEXES):
+            drop_index_concurrently(name)
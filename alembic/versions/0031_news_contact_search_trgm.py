@@ -0,0 +1,50 @@
+"""Add trigram indexes for the admin news and contact message searches."""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migration_ops import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0031_news_contact_search_trgm"
+down_revision: Union[str, None] = "0030_keyset_list_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same approach as albums_search_trgm_idx (0028): list_news and
+# list_contact_messages match q with ILIKE '%q%' against these exact
+# expressions, so one trigram index per table serves the whole search.
+SEARCH_INDEXES = [
+    (
+        "posts_news_search_trgm_idx",
+        "posts USING gin ((title || ' ' || slug) gin_trgm_ops) "
+        "WHERE type='news' AND deleted_at IS NULL",
+    ),
+    (
+        "contact_messages_search_trgm_idx",
+        "contact_messages USING gin ("
+        "(full_name || ' ' || coalesce(email, '') || ' ' || coalesce(phone, '') || ' ' || message) "
+        "gin_trgm_ops)",
+    ),
+]
+
+
+def upgrade() -> None:
+    # pg_trgm itself is created by 0028
+    # Built later by `python -m app.core.deferred_indexes` (see 0001)
+    if os.getenv("ALEMBIC_DEFER_INDEXES"):
+        return
+
+    with op.get_context().autocommit_block():
+        for name, definition in SEARCH_INDEXES:
+            create_index_concurrently(name, definition)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(SEARCH_INDEXES):
+            drop_index_concurrently(name)
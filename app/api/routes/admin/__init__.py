@@ -4,8 +4,14 @@ Admin API routes package.
 Tất cả admin/CMS endpoints được tổ chức trong package này.
 """
 
-# Re-export routers for easy import in main
-from . import news, assets, push, albums, contact_messages
+import importlib
 
-__all__ = ["news", "assets", "push", "albums", "contact_messages"]
+# Submodule chỉ được import khi dùng tới (PEP 562): import một router không
+# kéo theo việc dựng router/schema của mọi module admin khác.
+__all__ = ["news", "announcements", "assets", "push", "albums", "contact_messages"]
 
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,18 +4,22 @@ API endpoints để quản lý albums (admin).
 from __future__ import annotations
 
 import logging
+from itertools import chain
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, File, Form, Query, Response, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user_claims
 from app.models.enums import ContentStatus
-from app.models.tables import User
 from app.schemas.album import (
     AlbumCreate,
+    AlbumCreateMetadata,
     AlbumItemCreate,
     AlbumListOut,
     AlbumOut,
@@ -23,7 +27,7 @@ from app.schemas.album import (
     AlbumVideoCreate,
     SlugCheckOut,
 )
-from app.services import asset_service
+from app.schemas.auth import CurrentUser
 from app.services.admin import album_service
 
 logger = logging.getLogger(__name__)
@@ -31,8 +35,70 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/admin/albums", tags=["Admin - Albums"])
 
 
+def _parse_album_metadata(metadata: str) -> AlbumCreateMetadata:
+    """Parse + validate metadata JSON một lần (pydantic-core, không qua json.loads)."""
+    try:
+        return AlbumCreateMetadata.model_validate_json(metadata)
+    except ValidationError as exc:
+        # Trả về cùng format 422 như lỗi validate form field
+        raise RequestValidationError(
+            [
+                {**error, "loc": ("body", "metadata", *error["loc"])}
+                for error in exc.errors(include_url=False)
+            ]
+        ) from exc
+
+
+async def _create_album_from_metadata(
+    db: Session,
+    metadata: AlbumCreateMetadata,
+    files: Optional[List[UploadFile]],
+    current_user: CurrentUser,
+) -> AlbumOut:
+    """Tạo album từ metadata JSON; file_index trỏ vào files."""
+    files = files or []
+    for entry in metadata.entries:
+        if entry.file_index is not None and entry.file_index >= len(files):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "code": "invalid_file_index",
+                    "message": f"file_index {entry.file_index} không có trong files.",
+                },
+            )
+
+    uploaded = await album_service.upload_album_files(db, files, current_user.id) if files else []
+
+    items: list[AlbumItemCreate] = []
+    videos: list[AlbumVideoCreate] = []
+    for position, entry in enumerate(metadata.entries):
+        if entry.file_index is not None:
+            is_video, public_id = uploaded[entry.file_index]
+        elif entry.asset_public_id is not None:
+            is_video, public_id = False, entry.asset_public_id
+        else:
+            is_video, public_id = True, entry.video_public_id
+
+        # Dữ liệu đã được validate (metadata/upload) → dựng model không validate lại
+        if is_video:
+            videos.append(AlbumVideoCreate.model_construct(video_public_id=public_id, position=position))
+        else:
+            items.append(
+                AlbumItemCreate.model_construct(
+                    asset_public_id=public_id, position=position, caption=entry.caption
+                )
+            )
+
+    payload = AlbumCreate(
+        **metadata.model_dump(exclude={"entries"}),
+        items=items or None,
+        videos=videos or None,
+    )
+    return album_service.create_album(db, payload, user=current_user)
+
+
 @router.get("", response_model=AlbumListOut)
-def list_albums(
+async def list_albums(
     *,
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1, description="Số trang"),
@@ -43,12 +109,15 @@ def list_albums(
     q: Optional[str] = Query(
         None, description="Từ khoá tìm kiếm theo tiêu đề/slug/description (ILIKE)."
     ),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> AlbumListOut:
     """
     Lấy danh sách albums với pagination và filter.
     """
-    return album_service.list_albums(
+    # Route async + threadpool cho service: FastAPI kiểm tra response ngay trên
+    # event loop thay vì thêm một lần nhảy threadpool như với route sync
+    return await run_in_threadpool(
+        album_service.list_albums,
         db,
         page=page,
         page_size=page_size,
@@ -58,21 +127,31 @@ def list_albums(
 
 
 @router.get("/{album_id}", response_model=AlbumOut)
-def get_album_detail(
+async def get_album_detail(
     album_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> AlbumOut:
     """
     Lấy chi tiết album.
     """
-    return album_service.get_album_detail(db, album_id)
+    return await run_in_threadpool(album_service.get_album_detail, db, album_id)
 
 
 @router.post("", response_model=AlbumOut, status_code=status.HTTP_201_CREATED)
 async def create_album(
+    # Metadata JSON (cách mới): thay cho các field text/list bên dưới
+    metadata: Optional[str] = Form(
+        None,
+        description=(
+            "JSON theo AlbumCreateMetadata: title/slug/description/status/"
+            "cover_asset_public_id + entries (file_index trỏ vào new_files, "
+            "hoặc asset_public_id / video_public_id). Nếu có, các field còn lại "
+            "(trừ new_files) bị bỏ qua."
+        ),
+    ),
     # Text fields
-    title: str = Form(..., description="Tên album"),
+    title: Optional[str] = Form(None, description="Tên album (bắt buộc nếu không gửi metadata)"),
     description: Optional[str] = Form(None, description="Mô tả album"),
     status: ContentStatus = Form(
         ContentStatus.PUBLISHED, description="Trạng thái: draft/published/archived"
@@ -103,7 +182,7 @@ async def create_album(
         None, description="Danh sách public_id của videos"
     ),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> AlbumOut:
     """
     Tạo album mới.
@@ -120,92 +199,46 @@ async def create_album(
     - new_files trước (theo thứ tự upload)
     - existing_asset_public_ids sau (theo thứ tự trong list)
     - videos cuối cùng (theo thứ tự trong list)
+    
+    Nếu gửi `metadata` (JSON), thứ tự và caption lấy từ `entries`; new_files chỉ
+    chứa nội dung file.
     """
+    if metadata is not None:
+        return await _create_album_from_metadata(
+            db, _parse_album_metadata(metadata), new_files, current_user
+        )
+    if title is None:
+        raise RequestValidationError(
+            [{"type": "missing", "loc": ("body", "title"), "msg": "Field required", "input": None}]
+        )
+    
     user_id = current_user.id
     
     # Upload new files và phân biệt ảnh/video
-    new_image_asset_public_ids = []
-    new_video_public_ids = []
-    if new_files:
-        new_captions_list = new_captions or []
-        for idx, file in enumerate(new_files):
-            asset = await asset_service.upload_asset(db, file, user_id)
-            caption = new_captions_list[idx] if idx < len(new_captions_list) else None
-            
-            # Phân biệt ảnh và video
-            if asset.mime_type.startswith("video/"):
-                # Video → tạo VideoEmbed
-                from app.models.enums import EmbedProvider
-                from app.models.tables import VideoEmbed
-                
-                video_embed = VideoEmbed(
-                    provider=EmbedProvider.LOCAL,
-                    url=asset.url or "",
-                    title=file.filename or None,
-                    created_by=user_id,
-                )
-                db.add(video_embed)
-                db.flush()  # Flush để lấy public_id
-                new_video_public_ids.append(video_embed.public_id)
-            else:
-                # Ảnh → thêm vào items
-                new_image_asset_public_ids.append((asset.public_id, caption))
-    
-    # Build items list (chỉ ảnh)
-    items = []
-    position = 0
-    
-    # Add new image files
-    for asset_public_id, caption in new_image_asset_public_ids:
-        items.append(
-            AlbumItemCreate(
-                asset_public_id=asset_public_id,
-                position=position,
-                caption=caption,
-            )
-        )
-        position += 1
+    new_image_asset_public_ids, new_video_public_ids = await album_service.upload_new_files(
+        db, new_files, new_captions, user_id
+    )
     
-    # Add existing assets
-    if existing_asset_public_ids:
-        existing_captions_list = existing_captions or []
-        for idx, asset_public_id in enumerate(existing_asset_public_ids):
-            caption = (
-                existing_captions_list[idx]
-                if idx < len(existing_captions_list)
-                else None
-            )
-            items.append(
-                AlbumItemCreate(
-                    asset_public_id=asset_public_id,
-                    position=position,
-                    caption=caption,
-                )
-            )
-            position += 1
+    # Position tăng liên tục: ảnh mới → ảnh có sẵn → video mới → video có sẵn
+    # Build items list (chỉ ảnh): new image files trước, existing assets sau.
+    # UUID/caption đã được FastAPI validate khi parse form → model_construct;
+    # AlbumCreate bên dưới vẫn validate title/slug/description như bình thường.
+    image_entries = chain(
+        new_image_asset_public_ids,
+        album_service.with_captions(existing_asset_public_ids or [], existing_captions),
+    )
+    items = [
+        AlbumItemCreate.model_construct(asset_public_id=asset_public_id, position=position, caption=caption)
+        for position, (asset_public_id, caption) in enumerate(image_entries)
+    ]
     
-    # Build videos list (từ new videos + existing videos)
-    videos = []
-    # Add new videos (từ upload)
-    for video_public_id in new_video_public_ids:
-        videos.append(
-            AlbumVideoCreate(
-                video_public_id=video_public_id,
-                position=position,
-            )
+    # Build videos list (từ new videos + existing videos), nối tiếp sau items
+    videos = [
+        AlbumVideoCreate.model_construct(video_public_id=video_public_id, position=position)
+        for position, video_public_id in enumerate(
+            chain(new_video_public_ids, video_public_ids or []), start=len(items)
         )
-        position += 1
-    
-    # Add existing videos
-    if video_public_ids:
-        for video_public_id in video_public_ids:
-            videos.append(
-                AlbumVideoCreate(
-                    video_public_id=video_public_id,
-                    position=position,
-                )
-            )
-            position += 1
+    ]
     
     # Create payload
     payload = AlbumCreate(
@@ -253,7 +286,7 @@ async def update_album(
         None, description="Danh sách public_id của videos"
     ),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> AlbumOut:
     """
     Cập nhật album.
@@ -273,100 +306,36 @@ async def update_album(
     user_id = current_user.id
     
     # Upload new files và phân biệt ảnh/video
-    new_image_asset_public_ids = []
-    new_video_public_ids = []
-    if new_files:
-        new_captions_list = new_captions or []
-        for idx, file in enumerate(new_files):
-            asset = await asset_service.upload_asset(db, file, user_id)
-            caption = new_captions_list[idx] if idx < len(new_captions_list) else None
-            
-            # Phân biệt ảnh và video
-            if asset.mime_type.startswith("video/"):
-                # Video → tạo VideoEmbed
-                from app.models.enums import EmbedProvider
-                from app.models.tables import VideoEmbed
-                
-                video_embed = VideoEmbed(
-                    provider=EmbedProvider.LOCAL,
-                    url=asset.url or "",
-                    title=file.filename or None,
-                    created_by=user_id,
-                )
-                db.add(video_embed)
-                db.flush()  # Flush để lấy public_id
-                new_video_public_ids.append(video_embed.public_id)
-            else:
-                # Ảnh → thêm vào items
-                new_image_asset_public_ids.append((asset.public_id, caption))
+    new_image_asset_public_ids, new_video_public_ids = await album_service.upload_new_files(
+        db, new_files, new_captions, user_id
+    )
     
     # Build items list nếu có new image files hoặc existing_asset_public_ids
     # Logic: nếu có bất kỳ field nào → thay thế toàn bộ items
     items = None
     has_items_update = (new_image_asset_public_ids and len(new_image_asset_public_ids) > 0) or existing_asset_public_ids is not None
     if has_items_update:
-        items = []
-        position = 0
-        
-        # Add new image files trước
-        for asset_public_id, caption in new_image_asset_public_ids:
-            items.append(
-                AlbumItemCreate(
-                    asset_public_id=asset_public_id,
-                    position=position,
-                    caption=caption,
-                )
-            )
-            position += 1
-        
-        # Add existing assets sau
-        if existing_asset_public_ids:
-            existing_captions_list = existing_captions or []
-            for idx, asset_public_id in enumerate(existing_asset_public_ids):
-                caption = (
-                    existing_captions_list[idx]
-                    if idx < len(existing_captions_list)
-                    else None
-                )
-                items.append(
-                    AlbumItemCreate(
-                        asset_public_id=asset_public_id,
-                        position=position,
-                        caption=caption,
-                    )
-                )
-                position += 1
+        # Add new image files trước, existing assets sau
+        image_entries = chain(
+            new_image_asset_public_ids,
+            album_service.with_captions(existing_asset_public_ids or [], existing_captions),
+        )
+        items = [
+            AlbumItemCreate.model_construct(asset_public_id=asset_public_id, position=position, caption=caption)
+            for position, (asset_public_id, caption) in enumerate(image_entries)
+        ]
     
     # Build videos list nếu có new videos hoặc video_public_ids
     videos = None
     has_videos_update = (new_video_public_ids and len(new_video_public_ids) > 0) or video_public_ids is not None
     if has_videos_update:
-        videos = []
-        position = 0
-        # Nếu có items, position bắt đầu từ cuối items
-        if items:
-            position = len(items)
-        
-        # Add new videos trước
-        for video_public_id in new_video_public_ids:
-            videos.append(
-                AlbumVideoCreate(
-                    video_public_id=video_public_id,
-                    position=position,
-                )
+        # Nếu có items, position bắt đầu từ cuối items; new videos trước, existing sau
+        videos = [
+            AlbumVideoCreate.model_construct(video_public_id=video_public_id, position=position)
+            for position, video_public_id in enumerate(
+                chain(new_video_public_ids, video_public_ids or []), start=len(items or [])
             )
-            position += 1
-        
-        # Add existing videos sau
-        if video_public_ids:
-            for video_public_id in video_public_ids:
-                videos.append(
-                    AlbumVideoCreate(
-                        video_public_id=video_public_id,
-                        position=position,
-                    )
-                )
-                position += 1
+        ]
     
     # Create payload
     payload = AlbumUpdate(
@@ -390,12 +359,12 @@ async def update_album(
 def delete_album(
     album_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> Response:
     """
     Xóa album (soft delete).
     """
-    album_service.delete_album(db, album_id)
+    album_service.delete_album(db, album_id, user=current_user)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -403,7 +372,7 @@ def delete_album(
 def check_slug(
     slug: str = Query(..., description="Slug cần kiểm tra"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> SlugCheckOut:
     """
     Kiểm tra slug có unique không.
@@ -5,7 +5,8 @@ from enum import Enum
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, Query, Request, Response, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from starlette.datastructures import UploadFile as StarletteUploadFile
 from sqlalchemy.orm import Session
 
@@ -48,6 +49,9 @@ async def parse_files_from_request(request: Request) -> tuple[Optional[List[Uplo
     """
     Parse files từ request thủ công để xử lý trường hợp client gửi string rỗng.
 
+    Không parse lại body: FastAPI đã gọi `request.form()` cho các Form(...) param
+    và Starlette cache FormData trên request, nên ở đây chỉ đọc lại form đó.
+
     Returns:
         (files_list, has_files_field)
         - files_list: List UploadFile nếu có, None nếu không có files hợp lệ
@@ -60,23 +64,9 @@ async def parse_files_from_request(request: Request) -> tuple[Optional[List[Uplo
 
         form = await request.form()
 
-        has_files_field = "files" in form
-
-        files_list = form.getlist("files")
-        if not files_list:
-            return None, has_files_field
-
-        valid_files: list[UploadFile] = []
-        for item in files_list:
-            if isinstance(item, (UploadFile, StarletteUploadFile)):
-                valid_files.append(item)
-            elif isinstance(item, str):
-                # String rỗng → bỏ qua nhưng vẫn coi là có field
-                continue
-            else:
-                continue
-
-        return (valid_files if valid_files else None), has_files_field
+        # String rỗng → bỏ qua nhưng vẫn coi là có field
+        valid_files = [item for item in form.getlist("files") if isinstance(item, StarletteUploadFile)]
+        return (valid_files or None), "files" in form
     except Exception as e:
         logger.warning(
             "Error parsing files from request (announcements)",
@@ -86,7 +76,7 @@ async def parse_files_from_request(request: Request) -> tuple[Optional[List[Uplo
 
 
 @router.get("", response_model=AdminAnnouncementListOut)
-def list_announcements(
+async def list_announcements(
     *,
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1),
@@ -113,7 +103,8 @@ def list_announcements(
         description="Thứ tự sort: asc (tăng dần) hoặc desc (giảm dần).",
     ),
 ) -> AdminAnnouncementListOut:
-    return announcement_service.list_announcements(
+    return await run_in_threadpool(
+        announcement_service.list_announcements,
         db,
         page=page,
         page_size=page_size,
@@ -126,11 +117,11 @@ def list_announcements(
 
 
 @router.get("/{announcement_id}", response_model=AdminAnnouncementOut)
-def get_announcement_detail(
+async def get_announcement_detail(
     announcement_id: int,
     db: Session = Depends(get_db),
 ) -> AdminAnnouncementOut:
-    return announcement_service.get_announcement_detail(db, announcement_id)
+    return await run_in_threadpool(announcement_service.get_announcement_detail, db, announcement_id)
 
 
 @router.post("", response_model=AdminAnnouncementOut, status_code=status.HTTP_201_CREATED)
@@ -166,11 +157,11 @@ async def create_announcement(
     """
     user_id = current_user.id
 
+    # Lưu các file song song; Asset được commit cùng thông báo trong service
     content_asset_ids: list[UUID] = []
     if files:
-        for file in files:
-            asset = await asset_service.upload_asset(db, file, user_id)
-            content_asset_ids.append(asset.public_id)
+        assets = await asset_service.upload_assets(db, files, user_id)
+        content_asset_ids = [asset.public_id for asset in assets]
 
     payload = AnnouncementCreate(
         title=title,
@@ -227,10 +218,9 @@ async def update_announcement(
 
     content_asset_ids: Optional[list[UUID]] = None
     if files:
-        content_asset_ids = []
-        for file in files:
-            asset = await asset_service.upload_asset(db, file, user_id)
-            content_asset_ids.append(asset.public_id)
+        # Lưu song song; thứ tự content_assets giữ đúng thứ tự files gửi lên
+        assets = await asset_service.upload_assets(db, files, user_id)
+        content_asset_ids = [asset.public_id for asset in assets]
     elif has_files_field:
         # Có field "files" nhưng rỗng → xoá hết content_assets
         content_asset_ids = []
@@ -258,11 +248,16 @@ async def update_announcement(
 )
 def delete_announcement(
     announcement_id: int,
+    background_tasks: BackgroundTasks,
     delete_on_facebook: bool = Query(False, description="Có xóa trên Facebook hay không"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Response:
-    announcement_service.delete_announcement(db, announcement_id, user=current_user, delete_on_facebook=delete_on_facebook)
+    # Xoá mềm ngay; gọi Graph API xoá bài Facebook sau khi đã trả 204
+    if announcement_service.delete_announcement(db, announcement_id, delete_on_facebook=delete_on_facebook):
+        background_tasks.add_task(
+            announcement_service.delete_announcement_from_facebook, announcement_id, current_user.id
+        )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
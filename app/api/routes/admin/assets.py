@@ -8,20 +8,21 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, Body, Depends, File, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
-from app.models.tables import User
+from app.core.dependencies import get_current_user_claims
 from app.schemas.asset import AssetListOut, AssetOut
+from app.schemas.auth import CurrentUser
 from app.services import asset_service
 
 router = APIRouter(prefix="/admin/assets", tags=["Admin - Assets"])
 
 
 @router.get("", response_model=AssetListOut)
-def list_assets(
+async def list_assets(
     *,
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1, description="Số trang"),
@@ -34,7 +35,7 @@ def list_assets(
         None,
         description="Từ khoá tìm kiếm (search trong url và object_key).",
     ),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> AssetListOut:
     """
     Lấy danh sách assets trong thư viện.
@@ -42,7 +43,8 @@ def list_assets(
     Dùng để hiển thị thư viện assets cho admin chọn khi tạo album hoặc bài viết.
     Hỗ trợ filter theo mime_type (ảnh/video) và search.
     """
-    return asset_service.list_assets(
+    return await run_in_threadpool(
+        asset_service.list_assets,
         db,
         page=page,
         page_size=page_size,
@@ -55,7 +57,7 @@ def list_assets(
 async def upload_asset(
     file: UploadFile = File(..., description="File ảnh hoặc video để upload"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> AssetOut:
     """
     Upload asset (ảnh hoặc video).
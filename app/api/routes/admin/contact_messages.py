@@ -3,12 +3,13 @@ from __future__ import annotations
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.database import get_async_db, get_db
+from app.core.dependencies import get_current_user_claims
 from app.models.enums import ContactStatus
-from app.models.tables import User
+from app.schemas.auth import CurrentUser
 from app.schemas.contact import (
     ContactMessageAdminOut,
     ContactMessageListOut,
@@ -20,28 +21,38 @@ router = APIRouter(prefix="/admin/contact-messages", tags=["Admin - Contact Mess
 
 
 @router.get("", response_model=ContactMessageListOut)
-def list_contact_messages(
+async def list_contact_messages(
     *,
-    db: Session = Depends(get_db),
-    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    _current_user: CurrentUser = Depends(get_current_user_claims),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status_filter: Optional[ContactStatus] = Query(
         None,
         alias="status",
-        description="Filter by status: new/handled/spam.",
+        description="Lọc theo trạng thái: new/handled/spam.",
     ),
     q: Optional[str] = Query(
         None,
-        description="Search by name/email/phone/message (ILIKE).",
+        description="Tìm theo tên/email/số điện thoại/nội dung (ILIKE).",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="next_cursor của trang trước (keyset); có cursor thì bỏ qua page.",
+    ),
+    include_total: bool = Query(
+        False,
+        description="Đếm thêm total_items/total_pages (thêm một câu COUNT, chỉ bật khi cần).",
     ),
 ) -> ContactMessageListOut:
-    return contact_message_service.list_contact_messages(
+    return await contact_message_service.list_contact_messages(
         db,
         page=page,
         page_size=page_size,
         status_filter=status_filter,
         q=q,
+        cursor=cursor,
+        include_total=include_total,
     )
 
 
@@ -50,7 +61,7 @@ def update_contact_message_status(
     message_id: int,
     payload: ContactMessageStatusUpdate,
     db: Session = Depends(get_db),
-    _current_user: User = Depends(get_current_user),
+    _current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> ContactMessageAdminOut:
     return contact_message_service.update_contact_message_status(
         db,
@@ -63,7 +74,7 @@ def update_contact_message_status(
 def delete_contact_message(
     message_id: int,
     db: Session = Depends(get_db),
-    _current_user: User = Depends(get_current_user),
+    _current_user: CurrentUser = Depends(get_current_user_claims),
 ) -> Response:
     contact_message_service.delete_contact_message(db, message_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -4,11 +4,12 @@ import logging
 from typing import List, Optional
 
 from enum import Enum
-from fastapi import APIRouter, Depends, File, Form, Query, Request, Response, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, Query, Request, Response, UploadFile, status
 from starlette.datastructures import UploadFile as StarletteUploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.dependencies import get_current_user
 from app.models.enums import ContentStatus
 from app.models.tables import User
@@ -47,54 +48,29 @@ router = APIRouter(prefix="/admin/news", tags=["Admin - News"])
 async def parse_files_from_request(request: Request) -> tuple[Optional[List[UploadFile]], bool]:
     """
     Parse files từ request thủ công để xử lý trường hợp client gửi string rỗng.
-    
+
+    Không parse lại body: FastAPI đã gọi `request.form()` cho các Form(...) param
+    và Starlette cache FormData trên request, nên ở đây chỉ đọc lại form đó.
+
     Returns:
         (files_list, has_files_field)
         - files_list: List UploadFile nếu có, None nếu không có files hợp lệ
         - has_files_field: True nếu client có gửi field "files" (kể cả rỗng), False nếu không gửi
     """
     try:
-        # Chỉ parse nếu là multipart/form-data
         content_type = request.headers.get("content-type", "")
         if "multipart/form-data" not in content_type:
             return None, False
-        
-        # Parse form data
+
         form = await request.form()
-        
-        # Kiểm tra xem có field "files" không
-        has_files_field = "files" in form
-        
-        # Lấy tất cả files với key "files"
-        files_list = form.getlist("files")
-        
-        if not files_list:
-            # Nếu có field nhưng rỗng → trả về (None, True) để xóa hết
-            # Nếu không có field → trả về (None, False) để giữ nguyên
-            return None, has_files_field
-        
-        # Filter chỉ lấy UploadFile objects, bỏ qua strings
-        valid_files = []
-        for item in files_list:
-            # Nếu là UploadFile object → thêm vào
-            if isinstance(item, (UploadFile, StarletteUploadFile)):
-                valid_files.append(item)
-            # Nếu là string (rỗng hoặc không) → bỏ qua nhưng vẫn đánh dấu là có field
-            elif isinstance(item, str):
-                # Có field nhưng là string rỗng → vẫn đánh dấu has_files_field = True
-                continue
-            else:
-                # Trường hợp khác → bỏ qua
-                continue
-        
-        # Nếu có valid files → trả về files
-        # Nếu không có valid files nhưng có field "files" → trả về (None, True) để xóa hết
-        return (valid_files if valid_files else None), has_files_field
+
+        # String rỗng → bỏ qua nhưng vẫn coi là có field (xoá hết content_assets)
+        valid_files = [item for item in form.getlist("files") if isinstance(item, StarletteUploadFile)]
+        return (valid_files or None), "files" in form
     except Exception as e:
-        # Nếu có lỗi khi parse → log và trả về None, False (giữ nguyên)
         logger.warning(
             "Error parsing files from request",
-            extra={"error": str(e), "error_type": type(e).__name__}
+            extra={"error": str(e), "error_type": type(e).__name__},
         )
         return None, False
 
@@ -102,9 +78,9 @@ async def parse_files_from_request(request: Request) -> tuple[Optional[List[Uplo
 
 
 @router.get("", response_model=NewsListOut)
-def list_news(
+async def list_news(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status_filter: Optional[ContentStatus] = Query(
@@ -124,8 +100,16 @@ def list_news(
         SortOrder.DESC,
         description="Thứ tự sort: asc (tăng dần) hoặc desc (giảm dần).",
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="next_cursor của trang trước (keyset, chỉ với sort mặc định); có cursor thì bỏ qua page.",
+    ),
+    include_total: bool = Query(
+        False,
+        description="Đếm thêm total_items/total_pages (thêm một câu COUNT, chỉ bật khi cần).",
+    ),
 ) -> NewsListOut:
-    return news_service.list_news(
+    return await news_service.list_news(
         db,
         page=page,
         page_size=page_size,
@@ -133,6 +117,8 @@ def list_news(
         q=q,
         sort_by=sort_by.value,
         sort_order=sort_order.value,
+        cursor=cursor,
+        include_total=include_total,
     )
 
 
@@ -146,6 +132,7 @@ def get_news_detail(
 
 @router.post("", response_model=NewsOut, status_code=status.HTTP_201_CREATED)
 async def create_news(
+    background_tasks: BackgroundTasks,
     # Text fields
     title: str = Form(..., description="Tiêu đề bài viết"),
     excerpt: Optional[str] = Form(None, description="Mô tả ngắn"),
@@ -173,7 +160,7 @@ async def create_news(
     1. Upload tất cả files → tạo Assets
     2. Tất cả files đều được lưu vào content_assets theo thứ tự upload
     3. Tạo Post (slug tự động sinh từ title)
-    4. Tự động đăng Facebook nếu publish (ảnh hoặc video)
+    4. Tự động đăng Facebook nếu publish (ảnh hoặc video) - chạy nền sau khi trả response
     
     **Slug:**
     - Slug tự động sinh từ title, không cần truyền vào
@@ -187,13 +174,12 @@ async def create_news(
     """
     user_id = current_user.id
     
-    # Upload tất cả files theo thứ tự
+    # Lưu các file song song; Asset được commit cùng bài viết trong service
     content_asset_ids = []
     
     if files:
-        for file in files:
-            asset = await asset_service.upload_asset(db, file, user_id)
-            content_asset_ids.append(asset.public_id)
+        assets = await asset_service.upload_assets(db, files, user_id)
+        content_asset_ids = [asset.public_id for asset in assets]
     
     # Tạo payload - slug sẽ tự động sinh từ title trong service
     payload = NewsCreate(
@@ -208,8 +194,11 @@ async def create_news(
         meta_description=meta_description,
     )
     
-    # Tạo bài viết
-    return news_service.create_news(db, payload, user=current_user)
+    # Tạo bài viết; đăng Facebook (Graph API) chạy sau khi đã trả response
+    news, facebook_sync = news_service.create_news(db, payload, user=current_user)
+    if facebook_sync:
+        background_tasks.add_task(news_service.sync_news_to_facebook, news.id, user_id, facebook_sync)
+    return news
 
 
 @router.put("/{news_id}", response_model=NewsOut)
@@ -226,6 +215,7 @@ async def update_news(
     # Meta
     meta_title: Optional[str] = Form(None, description="SEO title"),
     meta_description: Optional[str] = Form(None, description="SEO description"),
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> NewsOut:
@@ -240,7 +230,7 @@ async def update_news(
     1. Nếu có files → upload tất cả files → tạo Assets mới
     2. Nếu có files → thay thế toàn bộ content_assets cũ bằng files mới
     3. Cập nhật các field khác (title, content_html, status, etc.)
-    4. Tự động đăng/xóa Facebook dựa trên status và publish_to_facebook
+    4. Tự động đăng/xóa Facebook dựa trên status và publish_to_facebook (chạy nền sau khi trả response)
     
     **Lưu ý:**
     - Tất cả fields đều Optional → chỉ update những field được truyền vào
@@ -273,11 +263,9 @@ async def update_news(
     # - Nếu không có field "files" → set content_asset_ids = None (giữ nguyên)
     content_asset_ids = None
     if files:
-        # Có files hợp lệ → upload
-        content_asset_ids = []
-        for file in files:
-            asset = await asset_service.upload_asset(db, file, user_id)
-            content_asset_ids.append(asset.public_id)
+        # Có files hợp lệ → lưu song song, giữ đúng thứ tự files gửi lên
+        assets = await asset_service.upload_assets(db, files, user_id)
+        content_asset_ids = [asset.public_id for asset in assets]
     elif has_files_field:
         # Có field "files" nhưng rỗng → xóa hết content_assets
         content_asset_ids = []
@@ -296,8 +284,11 @@ async def update_news(
         meta_description=meta_description,
     )
     
-    # Cập nhật bài viết
-    return news_service.update_news(db, news_id, payload, user=current_user)
+    # Cập nhật bài viết; xoá/đăng lại Facebook chạy sau khi đã trả response
+    news, facebook_sync = news_service.update_news(db, news_id, payload, user=current_user)
+    if facebook_sync:
+        background_tasks.add_task(news_service.sync_news_to_facebook, news_id, user_id, facebook_sync)
+    return news
 
 
 @router.delete(
@@ -1,24 +1,33 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.services.push_service import PushError, send_push_for_announcement
+from app.services import push_service
+from app.services.push_service import PushError
 
 router = APIRouter(prefix="/admin/push", tags=["Admin - Push"])
 
 
-@router.post("/announcement/{slug}")
-def push_announcement(slug: str, db: Session = Depends(get_db)) -> dict:
+@router.post("/announcement/{slug}", status_code=status.HTTP_202_ACCEPTED)
+def push_announcement(
+    slug: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+) -> dict:
     """
     Gửi Web Push dựa trên thông báo (announcement) slug cho tất cả subscription đã lưu.
+
+    Chỉ kiểm tra và xếp hàng; việc gửi chạy nền sau khi trả response
+    (count = số subscription hiện có).
     """
     try:
-        result = send_push_for_announcement(db, slug=slug)
-        return {"status": "ok", **result}
+        payload = push_service.get_announcement_push_payload(db, slug=slug)
     except PushError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"code": "push_error", "message": str(e)},
         )
+    background_tasks.add_task(push_service.send_push_to_all, payload)
+    return {"status": "queued", "count": push_service.count_subscriptions(db)}
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import logging
+
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
@@ -20,6 +22,8 @@ from app.schemas.auth import (
 )
 from app.services import auth_service, facebook_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
@@ -51,12 +55,7 @@ def google_login(
     )
 
     return GoogleLoginResponse(
-        user=GoogleUserOut(
-            id=user.id,
-            public_id=str(user.public_id),
-            email=user.email,
-            google_sub=user.google_sub,
-        ),
+        user=GoogleUserOut.model_validate(user),
         token_expires_at=exp_dt,
         token_is_valid=is_valid,
         access_token_expires_at=user.google_access_token_expires_at,
@@ -114,12 +113,7 @@ def refresh_tokens(
         refresh_token=tokens["refresh_token"],
         access_token_expires_at=tokens["access_expires_at"],
         refresh_token_expires_at=tokens["refresh_expires_at"],
-        user=GoogleUserOut(
-            id=user.id,
-            public_id=str(user.public_id),
-            email=user.email,
-            google_sub=user.google_sub,
-        ),
+        user=GoogleUserOut.model_validate(user),
     )
 
 
@@ -134,9 +128,7 @@ def logout(
     user_email = None
     if refresh_token:
         try:
-            user = auth_service.get_user_from_refresh(db, refresh_token)
-            user_email = user.email
-            auth_service.clear_app_tokens(db, user)
+            user_email = auth_service.logout_refresh_token(db, refresh_token)
         except HTTPException:
             # Ignore invalid token on logout
             pass
@@ -167,9 +159,6 @@ def link_facebook_page(
     - Cần đăng nhập lại Facebook OAuth để lấy token mới
     - Đảm bảo tài khoản Facebook có quyền quản lý Page
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
     log_context = {
         "action": "link_facebook_page",
         "user_id": current_user.id,
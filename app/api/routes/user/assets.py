@@ -37,28 +37,12 @@ def list_assets(
     Chỉ lấy những ảnh và video được upload trong album (không lấy tất cả assets).
     Hỗ trợ filter theo mime_type (ảnh/video) và search.
     """
-    if mime_type == "image/":
-        return media_service.list_images_from_albums(
-            db,
-            page=page,
-            page_size=page_size,
-            q=q,
-        )
-    elif mime_type == "video/":
-        return media_service.list_videos_from_albums(
-            db,
-            page=page,
-            page_size=page_size,
-            q=q,
-        )
-    else:
-        # Nếu không có mime_type, trả về cả images và videos
-        # Hoặc có thể trả về lỗi yêu cầu chỉ định mime_type
-        # Tạm thời trả về images
-        return media_service.list_images_from_albums(
-            db,
-            page=page,
-            page_size=page_size,
-            q=q,
-        )
-
+    # 'image/' / 'video/' → chỉ loại đó; bỏ trống (hoặc giá trị khác) → cả hai
+    mime_prefix = mime_type if mime_type in media_service.MEDIA_MIME_PREFIXES else None
+    return media_service.list_assets_from_albums(
+        db,
+        page=page,
+        page_size=page_size,
+        q=q,
+        mime_prefix=mime_prefix,
+    )
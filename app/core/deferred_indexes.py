@@ -0,0 +1,41 @@
+"""Tạo các index phụ bị hoãn khi chạy migration với ALEMBIC_DEFER_INDEXES=1.
+
+Dùng khi nạp dữ liệu lớn vào database mới (restore/COPY): index được build một
+lần trên dữ liệu đã nạp nhanh hơn nhiều so với cập nhật từng dòng trong lúc nạp.
+
+    ALEMBIC_DEFER_INDEXES=1 alembic upgrade head
+    # COPY / restore dữ liệu
+    python -m app.core.deferred_indexes
+
+Danh sách index lấy từ `__table_args__` của models (luôn khớp với head của
+migrations). Index unique không bị hoãn vì chúng đảm bảo ràng buộc dữ liệu.
+"""
+
+from sqlalchemy.schema import CreateIndex
+
+from app.core.database import engine
+from app.core.migration_ops import index_is_invalid
+from app.models import Base
+
+
+def build_deferred_indexes() -> None:
+    """Build CONCURRENTLY mọi index phụ còn thiếu (IF NOT EXISTS), build lại index INVALID."""
+    # CREATE INDEX CONCURRENTLY không chạy được trong transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # Build index trên bảng lớn vượt xa DB_STATEMENT_TIMEOUT_MS của app
+        conn.exec_driver_sql("SET statement_timeout = 0")
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda idx: idx.name):
+                if index.unique:
+                    continue
+                index.dialect_kwargs["postgresql_concurrently"] = True
+                if index_is_invalid(conn, index.name):
+                    print(f"🧹 Dropping invalid index {index.name} (previous build failed)")
+                    conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}")
+                print(f"⏳ Building index {index.name} on {table.name}")
+                conn.execute(CreateIndex(index, if_not_exists=True))
+    print("✅ Deferred indexes built")
+
+
+if __name__ == "__main__":
+    build_deferred_indexes()
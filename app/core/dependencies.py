@@ -2,37 +2,57 @@
 
 from __future__ import annotations
 
+import base64
+import json
+import time
+from threading import Lock
+from typing import Optional
+
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import JWT_SECRET, JWT_ALGORITHM
+from app.core.security import JWT_ALGORITHMS, JWT_KEY
 from app.models.tables import User
+from app.schemas.auth import CurrentUser
 from jose import JWTError, jwt
 from app.services import auth_service
 
 security = HTTPBearer(auto_error=False)
 
+# Client dùng lại cùng access token suốt thời hạn của nó → cache claims đã verify
+# theo chuỗi token tới đúng `exp` (in-memory, theo process). Chỉ cache token hợp
+# lệ; token lỗi luôn được verify lại. Query User vẫn chạy mỗi request.
+_ACCESS_TOKEN_CACHE_MAX_ENTRIES = 10_000
+_access_token_cache: dict[str, tuple[float, dict]] = {}
+_access_token_lock = Lock()
 
-def get_current_user(
-    request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+
+def _peek_unverified_claims(token: str) -> Optional[dict]:
     """
-    Dependency để lấy current user từ JWT token.
-    
-    Args:
-        credentials: HTTP Bearer token từ header
-        db: Database session
-        
+    Đọc claims của JWT mà không verify chữ ký (chỉ base64 + JSON).
+
     Returns:
-        User object
-        
+        Claims, hoặc None nếu token sai định dạng
+    """
+    try:
+        _, payload_b64, _ = token.split(".")
+        claims = json.loads(base64.urlsafe_b64decode(payload_b64 + "=" * (-len(payload_b64) % 4)))
+    except ValueError:
+        return None
+    return claims if isinstance(claims, dict) else None
+
+
+def _decode_access_token(
+    request: Request, credentials: Optional[HTTPAuthorizationCredentials]
+) -> dict:
+    """
+    Lấy access token (Bearer header hoặc cookie), verify chữ ký/hạn và trả về claims.
+    
     Raises:
-        HTTPException: Nếu token không hợp lệ hoặc user không tồn tại
+        HTTPException: Nếu thiếu token, token không hợp lệ hoặc thiếu uid
     """
     token = None
     if credentials and credentials.scheme.lower() == "bearer":
@@ -48,9 +68,43 @@ def get_current_user(
                 "message": "Không tìm thấy access token.",
             },
         )
-    
+
+    with _access_token_lock:
+        cached = _access_token_cache.get(token)
+    if cached is not None and cached[0] > time.time():
+        return cached[1]
+
+    # Loại token rác/hết hạn/sai loại (scanner, cookie cũ) trước khi tốn HMAC;
+    # chỉ để từ chối sớm — claims chỉ được tin sau jwt.decode bên dưới
+    unverified = _peek_unverified_claims(token)
+    if unverified is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "code": "invalid_token",
+                "message": "Token không hợp lệ: sai định dạng JWT.",
+            },
+        )
+    exp = unverified.get("exp")
+    if isinstance(exp, (int, float)) and exp < time.time():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "code": "invalid_token",
+                "message": "Token không hợp lệ: token đã hết hạn.",
+            },
+        )
+    if unverified.get("type") != "access":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "code": "invalid_token_type",
+                "message": "Token không phải access token.",
+            },
+        )
+
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, JWT_KEY, algorithms=JWT_ALGORITHMS)
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -71,8 +125,7 @@ def get_current_user(
         )
     
     # Lấy user_id từ payload
-    user_id = payload.get("uid")
-    if not user_id:
+    if not payload.get("uid"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={
@@ -80,9 +133,57 @@ def get_current_user(
                 "message": "Thiếu uid trong token.",
             },
         )
+
+    # Access token luôn có exp (create_token); jwt.decode đã kiểm tra còn hạn
+    with _access_token_lock:
+        if len(_access_token_cache) >= _ACCESS_TOKEN_CACHE_MAX_ENTRIES:
+            _access_token_cache.clear()
+        _access_token_cache[token] = (float(payload["exp"]), payload)
+    return payload
+
+
+async def get_current_user_claims(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> CurrentUser:
+    """
+    Dependency nhẹ: user hiện tại dựng từ claims của JWT, không query DB.
+    
+    Dùng cho route chỉ cần biết request đã đăng nhập (và user id); route cần
+    ORM User (đọc token/field khác, gán quan hệ) dùng get_current_user.
+    Chỉ tốn CPU (verify/cache JWT) nên chạy thẳng trên event loop, không qua
+    threadpool.
+    """
+    payload = _decode_access_token(request, credentials)
+    return CurrentUser(
+        id=payload["uid"],
+        public_id=payload.get("sub"),
+        email=payload.get("email"),
+    )
+
+
+def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    Dependency để lấy current user từ JWT token.
+    
+    Args:
+        credentials: HTTP Bearer token từ header
+        db: Database session
+        
+    Returns:
+        User object
+        
+    Raises:
+        HTTPException: Nếu token không hợp lệ hoặc user không tồn tại
+    """
+    payload = _decode_access_token(request, credentials)
     
     # Tìm user trong DB
-    user = db.scalar(select(User).where(User.id == user_id))
+    user = db.scalar(select(User).where(User.id == payload["uid"]))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,4 +191,3 @@ def get_current_user(
         )
     
     return user
-
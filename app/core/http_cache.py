@@ -0,0 +1,77 @@
+"""ETag + Cache-Control cho các GET công khai (/public/*)."""
+
+from __future__ import annotations
+
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PUBLIC_PATH_PREFIX = "/public/"
+# Nội dung public chỉ đổi khi admin sửa bài → browser/CDN dùng lại 60s, sau đó
+# vẫn được trả bản cũ trong lúc revalidate (If-None-Match → 304 nếu không đổi)
+PUBLIC_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match có thể là danh sách, `*` hoặc weak (W/"...") — so sánh weak."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class PublicCacheMiddleware:
+    """
+    Gắn ETag (blake2b của body) và Cache-Control cho response 200 của GET/HEAD
+    /public/*, trả 304 không body khi If-None-Match khớp.
+
+    Response JSON của public API nhỏ (page_size ≤ 100) nên được buffer lại để
+    tính ETag trước khi gửi header.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not scope["path"].startswith(PUBLIC_PATH_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        body = bytearray()
+
+        async def buffered_send(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                if message["status"] != 200:
+                    await send(message)
+                return
+            if start is None or start["status"] != 200:
+                await send(message)
+                return
+
+            body.extend(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers = MutableHeaders(scope=start)
+            headers["ETag"] = etag
+            headers["Cache-Control"] = PUBLIC_CACHE_CONTROL
+
+            if_none_match = Headers(scope=scope).get("if-none-match")
+            if if_none_match and _etag_matches(if_none_match, etag):
+                del headers["Content-Length"]
+                await send({**start, "status": 304})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(start)
+            await send({"type": "http.response.body", "body": bytes(body)})
+
+        await self.app(scope, receive, buffered_send)
@@ -0,0 +1,69 @@
+"""Helper dùng chung cho migration Alembic: build/drop index CONCURRENTLY.
+
+Gọi bên trong `op.get_context().autocommit_block()` (CONCURRENTLY không chạy
+được trong transaction).
+"""
+
+import os
+
+from alembic import context, op
+from sqlalchemy import Connection, text
+
+# Migration dừng sớm nếu DDL trong transaction phải chờ lock quá lâu: một request
+# ACCESS EXCLUSIVE đang xếp hàng chặn mọi reader sau nó (alembic/env.py đặt cho
+# cả session)
+LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "2s")
+
+
+def _execute_without_lock_timeout(sql: str) -> None:
+    # CONCURRENTLY chờ mọi transaction cũ hơn kết thúc (virtualxid lock) và thời
+    # gian chờ đó tính vào lock_timeout → trên DB đang chạy, build sẽ fail và để
+    # lại index INVALID. Lệnh này không chặn reader/writer nên được chờ không giới
+    # hạn; các lệnh sau nó lại dùng LOCK_TIMEOUT.
+    op.execute("SET lock_timeout = 0")
+    op.execute(sql)
+    op.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+
+
+_INDEX_IS_INVALID = text(
+    "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+)
+
+
+def defer_index_rebuild(*names: str) -> bool:
+    """
+    Migration rebuild/đổi định nghĩa index có được hoãn cho deferred_indexes không.
+
+    Chỉ hoãn khi ALEMBIC_DEFER_INDEXES và chưa index nào trong `names` tồn tại
+    (database mới): deferred_indexes dùng IF NOT EXISTS nên sẽ bỏ qua index cũ
+    cùng tên và không bao giờ build định nghĩa mới. Offline (--sql) không đọc
+    được catalog → không hoãn.
+    """
+    if not os.getenv("ALEMBIC_DEFER_INDEXES") or context.is_offline_mode():
+        return False
+    bind = op.get_bind()
+    return not any(bind.scalar(text("SELECT to_regclass(:name)"), {"name": name}) for name in names)
+
+
+def index_is_invalid(conn: Connection, name: str) -> bool:
+    """
+    Index {name} có đang INVALID không (build CONCURRENTLY trước đó fail giữa chừng).
+
+    `IF NOT EXISTS` coi index INVALID là đã có nên lần chạy lại sẽ bỏ qua nó;
+    caller xoá index đó trước để lần chạy lại build lại thật.
+    """
+    return bool(conn.scalar(_INDEX_IS_INVALID, {"name": name}))
+
+
+def create_index_concurrently(name: str, definition: str, *, unique: bool = False) -> None:
+    """CREATE [UNIQUE] INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}."""
+    # --sql (offline) không đọc được catalog: script sinh ra không tự dọn index INVALID
+    if not context.is_offline_mode() and index_is_invalid(op.get_bind(), name):
+        drop_index_concurrently(name)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    _execute_without_lock_timeout(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def drop_index_concurrently(name: str) -> None:
+    """DROP INDEX CONCURRENTLY IF EXISTS {name}."""
+    _execute_without_lock_timeout(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
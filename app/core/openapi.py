@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+
+from fastapi import FastAPI, Request, Response, status
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html,
+)
+from fastapi.responses import HTMLResponse
+
+OPENAPI_URL = "/openapi.json"
+DOCS_URL = "/docs"
+DOCS_OAUTH2_REDIRECT_URL = "/docs/oauth2-redirect"
+REDOC_URL = "/redoc"
+
+
+def register_openapi_routes(app: FastAPI) -> None:
+    """
+    Đăng ký /openapi.json, /docs, /redoc (app tạo với openapi_url=None).
+
+    FastAPI chỉ cache schema dạng dict và json.dumps lại ~75KB mỗi lần tải
+    /openapi.json; ở đây schema được serialize một lần (kèm bản gzip và ETag)
+    ở request đầu tiên, khi mọi router đã được include.
+    """
+    cached: dict[str, bytes | str] = {}
+
+    def _openapi_bodies() -> dict[str, bytes | str]:
+        if not cached:
+            body = json.dumps(app.openapi(), ensure_ascii=False, separators=(",", ":")).encode()
+            cached["identity"] = body
+            cached["gzip"] = gzip.compress(body)
+            cached["etag"] = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        return cached
+
+    @app.get(OPENAPI_URL, include_in_schema=False)
+    async def openapi(request: Request) -> Response:
+        bodies = _openapi_bodies()
+        # no-cache: client luôn hỏi lại (If-None-Match) nên deploy mới thấy ngay schema mới
+        headers = {"ETag": bodies["etag"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == bodies["etag"]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(bodies["gzip"], media_type="application/json", headers=headers)
+        return Response(bodies["identity"], media_type="application/json", headers=headers)
+
+    @app.get(DOCS_URL, include_in_schema=False)
+    async def swagger_ui_html() -> HTMLResponse:
+        return get_swagger_ui_html(
+            openapi_url=OPENAPI_URL,
+            title=f"{app.title} - Swagger UI",
+            oauth2_redirect_url=DOCS_OAUTH2_REDIRECT_URL,
+        )
+
+    @app.get(DOCS_OAUTH2_REDIRECT_URL, include_in_schema=False)
+    async def swagger_ui_redirect() -> HTMLResponse:
+        return get_swagger_ui_oauth2_redirect_html()
+
+    @app.get(REDOC_URL, include_in_schema=False)
+    async def redoc_html() -> HTMLResponse:
+        return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{app.title} - ReDoc")
@@ -0,0 +1,46 @@
+"""Tạo trước partition theo tháng của audit_log (xem migration 0020).
+
+audit_log partition theo created_at từng tháng; tháng chưa có partition sẽ rơi
+vào audit_log_default và sau đó không tạo được partition tháng đó nữa (default
+đã chứa dòng thuộc khoảng giá trị). App gọi audit_log_ensure_partitions() khi
+khởi động và mỗi ngày một lần trong lúc chạy.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import async_engine
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+# Nhiều worker/replica cùng khởi động: chỉ một session tạo partition, số còn lại bỏ qua
+_PARTITION_LOCK_KEY = 0xA1D17106
+
+_ENSURE_PARTITIONS = text(
+    "SELECT audit_log_ensure_partitions() WHERE pg_try_advisory_xact_lock(:key)"
+)
+
+
+async def ensure_audit_log_partitions() -> None:
+    """Tạo partition tháng này và các tháng tới nếu chưa có; lỗi chỉ được log."""
+    try:
+        async with async_engine.begin() as conn:
+            await conn.execute(_ENSURE_PARTITIONS, {"key": _PARTITION_LOCK_KEY})
+    except Exception:
+        logger.warning("Could not ensure audit_log partitions", exc_info=True)
+
+
+async def run_partition_maintenance() -> None:
+    """Chạy ensure_audit_log_partitions ngay rồi lặp lại mỗi ngày (task nền của app)."""
+    while True:
+        await ensure_audit_log_partitions()
+        await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    asyncio.run(ensure_audit_log_partitions())
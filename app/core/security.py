@@ -5,7 +5,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Tuple
 
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 
 
 def _now() -> datetime:
@@ -17,6 +17,11 @@ JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
+# Dựng key một lần: truyền chuỗi secret thì mỗi lần encode/decode python-jose
+# lại thử json.loads secret rồi jwk.construct key mới
+JWT_KEY = jwk.construct(JWT_SECRET, JWT_ALGORITHM)
+JWT_ALGORITHMS = [JWT_ALGORITHM]
+
 
 def create_token(
     payload: Dict[str, Any], expires_delta: timedelta, token_type: str
@@ -24,7 +29,7 @@ def create_token(
     exp = _now() + expires_delta
     to_encode = payload.copy()
     to_encode.update({"exp": exp, "type": token_type})
-    encoded = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    encoded = jwt.encode(to_encode, JWT_KEY, algorithm=JWT_ALGORITHM)
     return encoded, exp
 
 
@@ -50,7 +55,7 @@ def create_app_tokens(user_id: int, public_id: str, email: str) -> Dict[str, Any
 
 def decode_refresh_token(token: str) -> Dict[str, Any]:
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, JWT_KEY, algorithms=JWT_ALGORITHMS)
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,3 +1,4 @@
+import asyncio
 import os
 
 from alembic import command
@@ -30,22 +31,34 @@ from app.api.routes.user import (
     contact as user_contact,
     assets as user_assets,
 )
-from app.core.database import get_db
+from app.core.database import async_engine, get_db
 from app.core.errors import register_exception_handlers
+from app.core.http_cache import PublicCacheMiddleware
+from app.core.openapi import register_openapi_routes
+from app.core.partitions import run_partition_maintenance
 from app.core.seed import seed_data
 
 # Load environment variables từ .env file
 load_dotenv()
 
-app = FastAPI(title="Preschool Site API", version="0.1.0")
+# Không đặt default_response_class (ORJSONResponse...): từ FastAPI 0.130, route có
+# response_model được Pydantic serialize thẳng ra JSON bytes (Rust), nhanh hơn
+# jsonable_encoder + orjson; custom response class sẽ tắt đường nhanh này.
+# openapi/docs do register_openapi_routes đăng ký (schema serialize sẵn một lần)
+app = FastAPI(title="Preschool Site API", version="0.1.0", openapi_url=None)
 register_exception_handlers(app)
+register_openapi_routes(app)
 rate_limiter = RateLimiter(RATE_LIMIT_RULES)
+# Task nền chạy suốt vòng đời app (giữ reference để không bị GC, huỷ khi shutdown)
+background_tasks: set[asyncio.Task] = set()
 
 frontend_origins = os.getenv("FRONTEND_ORIGINS", "*")
 allow_origins = ["*"]
 if frontend_origins and frontend_origins.strip() != "*":
     allow_origins = [o.strip() for o in frontend_origins.split(",") if o.strip()]
 
+# Thêm trước CORS (nằm trong CORS) để response 304 vẫn có header CORS
+app.add_middleware(PublicCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allow_origins,
@@ -98,6 +111,18 @@ async def startup_event():
             f"{os.getenv('DATABASE_URL', 'Not set (using default)')}"
         )
 
+    # Partition audit_log theo tháng phải được tạo trước khi tới tháng đó
+    background_tasks.add(asyncio.create_task(run_partition_maintenance()))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Huỷ task nền và đóng các connection asyncpg trong pool trước khi event loop dừng."""
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await async_engine.dispose()
+
 
 @app.get("/health")
 def health(db: Session = Depends(get_db)) -> dict:
@@ -3,7 +3,7 @@ from typing import Optional
 
 import sqlalchemy as sa
 from sqlalchemy import text
-from sqlalchemy.dialects.postgresql import CITEXT, INET, JSONB, TSVECTOR, UUID
+from sqlalchemy.dialects.postgresql import INET, JSONB, TSVECTOR, UUID, ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -50,15 +50,19 @@ contact_status_enum = sa.Enum(
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Case-insensitive email uniqueness; query with func.lower(User.email)
+        sa.Index("uq_users_email_ci", sa.text("lower(email)"), unique=True),
+    )
 
     id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
     public_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         unique=True,
         nullable=False,
-        server_default=text("gen_random_uuid()"),
+        server_default=text("uuid_generate_v7()"),
     )
-    email: Mapped[str] = mapped_column(CITEXT(), unique=True, nullable=False)
+    email: Mapped[str] = mapped_column(sa.Text, nullable=False)
     google_sub: Mapped[Optional[str]] = mapped_column(
         sa.Text, unique=True, nullable=True
     )
@@ -102,7 +106,7 @@ class Asset(Base):
         UUID(as_uuid=True),
         unique=True,
         nullable=False,
-        server_default=text("gen_random_uuid()"),
+        server_default=text("uuid_generate_v7()"),
     )
     storage: Mapped[str] = mapped_column(sa.Text, nullable=False)
     bucket: Mapped[Optional[str]] = mapped_column(sa.Text)
@@ -114,7 +118,7 @@ class Asset(Base):
     height: Mapped[Optional[int]] = mapped_column(sa.Integer)
     checksum: Mapped[Optional[str]] = mapped_column(sa.Text)
     uploaded_by: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL"), index=True
     )
     created_at: Mapped[sa.DateTime] = mapped_column(
         sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
@@ -155,24 +159,44 @@ class Post(Base):
         ),
         sa.Index(
             "posts_list_news_idx",
-            "type",
             "status",
             sa.text("published_at DESC"),
+            postgresql_include=["id", "slug", "cover_asset_id"],
+            postgresql_where=text("type='news' AND deleted_at IS NULL"),
+        ),
+        sa.Index(
+            "posts_news_keyset_idx",
+            sa.text("coalesce(published_at, '-infinity'::timestamptz) DESC"),
+            sa.text("created_at DESC"),
+            sa.text("id DESC"),
+            postgresql_where=text("type='news' AND deleted_at IS NULL"),
+        ),
+        # Tìm kiếm ILIKE '%q%' (pg_trgm); biểu thức phải khớp với list_news (admin)
+        sa.Index(
+            "posts_news_search_trgm_idx",
+            sa.text("(title || ' ' || slug) gin_trgm_ops"),
+            postgresql_using="gin",
             postgresql_where=text("type='news' AND deleted_at IS NULL"),
         ),
         sa.Index(
             "posts_list_announcement_idx",
-            "type",
             "block_id",
             "status",
             sa.text("published_at DESC"),
-            postgresql_where=text("type='announcement' AND deleted_at IS NULL"),
+            postgresql_include=["id", "slug", "cover_asset_id"],
+            postgresql_where=text("block_id IS NOT NULL AND deleted_at IS NULL"),
         ),
         sa.Index(
             "posts_search_tsv_gin",
             "search_tsv",
             postgresql_using="gin",
         ),
+        sa.Index(
+            "ix_posts_block_id_status",
+            "block_id",
+            "status",
+            sa.text("published_at DESC"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
@@ -180,7 +204,7 @@ class Post(Base):
         UUID(as_uuid=True),
         unique=True,
         nullable=False,
-        server_default=text("gen_random_uuid()"),
+        server_default=text("uuid_generate_v7()"),
     )
     post_type: Mapped[PostType] = mapped_column(
         "type",
@@ -195,10 +219,10 @@ class Post(Base):
     excerpt: Mapped[Optional[str]] = mapped_column(sa.Text)
     content_html: Mapped[str] = mapped_column(sa.Text, nullable=False)
     cover_asset_id: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="SET NULL"), index=True
     )
     og_image_asset_id: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="SET NULL"), index=True
     )
     block_id: Mapped[Optional[int]] = mapped_column(
         sa.BigInteger, sa.ForeignKey("blocks.id", ondelete="RESTRICT")
@@ -206,7 +230,7 @@ class Post(Base):
     meta_title: Mapped[Optional[str]] = mapped_column(sa.Text)
     meta_description: Mapped[Optional[str]] = mapped_column(sa.Text)
     author_id: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL"), index=True
     )
     published_at: Mapped[Optional[sa.DateTime]] = mapped_column(
         sa.TIMESTAMP(timezone=True)
@@ -220,7 +244,15 @@ class Post(Base):
     deleted_at: Mapped[Optional[sa.DateTime]] = mapped_column(
         sa.TIMESTAMP(timezone=True)
     )
-    search_tsv: Mapped[Optional[str]] = mapped_column(TSVECTOR)
+    search_tsv: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(excerpt, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(content_html, '')), 'C')",
+            persisted=True,
+        ),
+    )
 
 
 class PostRevision(Base):
@@ -238,13 +270,13 @@ class PostRevision(Base):
         sa.BigInteger, sa.ForeignKey("posts.id", ondelete="CASCADE"), nullable=False
     )
     editor_id: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL"), index=True
     )
     title: Mapped[str] = mapped_column(sa.Text, nullable=False)
     excerpt: Mapped[Optional[str]] = mapped_column(sa.Text)
     content_html: Mapped[str] = mapped_column(sa.Text, nullable=False)
     cover_asset_id: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="SET NULL"), index=True
     )
     created_at: Mapped[sa.DateTime] = mapped_column(
         sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
@@ -264,7 +296,10 @@ class PostAsset(Base):
         sa.BigInteger, sa.ForeignKey("posts.id", ondelete="CASCADE"), nullable=False
     )
     asset_id: Mapped[int] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="RESTRICT"), nullable=False
+        sa.BigInteger,
+        sa.ForeignKey("assets.id", ondelete="RESTRICT"),
+        nullable=False,
+        index=True,
     )
     position: Mapped[int] = mapped_column(
         sa.Integer, nullable=False, server_default=text("0")
@@ -290,6 +325,15 @@ class Album(Base):
             sa.text("created_at DESC"),
             postgresql_where=text("deleted_at IS NULL"),
         ),
+        # Tìm kiếm ILIKE '%q%' (pg_trgm); biểu thức phải khớp với list_albums
+        sa.Index(
+            "albums_search_trgm_idx",
+            sa.text(
+                "(title || ' ' || slug || ' ' || coalesce(description, '')) gin_trgm_ops"
+            ),
+            postgresql_using="gin",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
@@ -297,19 +341,19 @@ class Album(Base):
         UUID(as_uuid=True),
         unique=True,
         nullable=False,
-        server_default=text("gen_random_uuid()"),
+        server_default=text("uuid_generate_v7()"),
     )
     title: Mapped[str] = mapped_column(sa.Text, nullable=False)
     slug: Mapped[str] = mapped_column(sa.Text, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(sa.Text)
     cover_asset_id: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="SET NULL"), index=True
     )
     status: Mapped[ContentStatus] = mapped_column(
         content_status_enum, nullable=False, server_default=ContentStatus.PUBLISHED.value
     )
     created_by: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL"), index=True
     )
     created_at: Mapped[sa.DateTime] = mapped_column(
         sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
@@ -335,7 +379,10 @@ class AlbumItem(Base):
         sa.BigInteger, sa.ForeignKey("albums.id", ondelete="CASCADE"), nullable=False
     )
     asset_id: Mapped[int] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("assets.id", ondelete="RESTRICT"), nullable=False
+        sa.BigInteger,
+        sa.ForeignKey("assets.id", ondelete="RESTRICT"),
+        nullable=False,
+        index=True,
     )
     position: Mapped[int] = mapped_column(
         sa.Integer, nullable=False, server_default=text("0")
@@ -354,7 +401,7 @@ class VideoEmbed(Base):
         UUID(as_uuid=True),
         unique=True,
         nullable=False,
-        server_default=text("gen_random_uuid()"),
+        server_default=text("uuid_generate_v7()"),
     )
     provider: Mapped[EmbedProvider] = mapped_column(
         embed_provider_enum, nullable=False
@@ -363,7 +410,7 @@ class VideoEmbed(Base):
     title: Mapped[Optional[str]] = mapped_column(sa.Text)
     thumbnail_url: Mapped[Optional[str]] = mapped_column(sa.Text)
     created_by: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL"), index=True
     )
     created_at: Mapped[sa.DateTime] = mapped_column(
         sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
@@ -386,6 +433,7 @@ class AlbumVideo(Base):
         sa.BigInteger,
         sa.ForeignKey("video_embeds.id", ondelete="RESTRICT"),
         nullable=False,
+        index=True,
     )
     position: Mapped[int] = mapped_column(
         sa.Integer, nullable=False, server_default=text("0")
@@ -394,17 +442,14 @@ class AlbumVideo(Base):
 
 class JobOutbox(Base):
     __tablename__ = "jobs_outbox"
-    __table_args__ = (
-        sa.Index(
-            "jobs_outbox_pick_idx",
-            "status",
-            "run_after",
-            "id",
-            postgresql_where=text("status IN ('queued','failed')"),
-        ),
-    )
+    # LIST-partitioned on status: jobs_outbox_hot holds queued/failed jobs and
+    # carries jobs_outbox_pick_idx (run_after, id); everything else goes to
+    # jobs_outbox_cold. Partitions are managed by migration 0021.
+    __table_args__ = ({"postgresql_partition_by": "LIST (status)"},)
 
-    id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(
+        sa.BigInteger, primary_key=True, autoincrement=True
+    )
     job_type: Mapped[JobType] = mapped_column(
         "type",
         job_type_enum,
@@ -413,6 +458,7 @@ class JobOutbox(Base):
     )
     status: Mapped[JobStatus] = mapped_column(
         job_status_enum,
+        primary_key=True,
         nullable=False,
         server_default=JobStatus.QUEUED.value,
     )
@@ -431,7 +477,9 @@ class JobOutbox(Base):
     )
     last_error: Mapped[Optional[str]] = mapped_column(sa.Text)
     created_at: Mapped[sa.DateTime] = mapped_column(
-        sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+        sa.TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("clock_timestamp()"),
     )
     updated_at: Mapped[sa.DateTime] = mapped_column(
         sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
@@ -467,7 +515,9 @@ class FacebookPostLog(Base):
         sa.TIMESTAMP(timezone=True)
     )
     created_at: Mapped[sa.DateTime] = mapped_column(
-        sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+        sa.TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("clock_timestamp()"),
     )
     updated_at: Mapped[sa.DateTime] = mapped_column(
         sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
@@ -482,12 +532,26 @@ class ContactMessage(Base):
             "status",
             sa.text("created_at DESC"),
         ),
+        sa.Index(
+            "contact_messages_keyset_idx",
+            sa.text("created_at DESC"),
+            sa.text("id DESC"),
+        ),
+        # Tìm kiếm ILIKE '%q%' (pg_trgm); biểu thức phải khớp với list_contact_messages
+        sa.Index(
+            "contact_messages_search_trgm_idx",
+            sa.text(
+                "(full_name || ' ' || coalesce(email, '') || ' ' || coalesce(phone, '')"
+                " || ' ' || message) gin_trgm_ops"
+            ),
+            postgresql_using="gin",
+        ),
     )
 
     id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
     full_name: Mapped[str] = mapped_column(sa.Text, nullable=False)
     phone: Mapped[Optional[str]] = mapped_column(sa.Text)
-    email: Mapped[Optional[str]] = mapped_column(CITEXT())
+    email: Mapped[Optional[str]] = mapped_column(sa.Text)
     message: Mapped[str] = mapped_column(sa.Text, nullable=False)
     status: Mapped[ContactStatus] = mapped_column(
         contact_status_enum, nullable=False, server_default=ContactStatus.NEW.value
@@ -509,11 +573,15 @@ class AuditLog(Base):
             "entity_id",
             sa.text("created_at DESC"),
         ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
-    id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
+    # Partitioned by month, so the primary key has to include created_at
+    id: Mapped[int] = mapped_column(
+        sa.BigInteger, primary_key=True, autoincrement=True
+    )
     actor_id: Mapped[Optional[int]] = mapped_column(
-        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL")
+        sa.BigInteger, sa.ForeignKey("users.id", ondelete="SET NULL"), index=True
     )
     action: Mapped[str] = mapped_column(sa.Text, nullable=False)
     entity_type: Mapped[str] = mapped_column(sa.Text, nullable=False)
@@ -521,7 +589,10 @@ class AuditLog(Base):
     diff: Mapped[Optional[dict]] = mapped_column(JSONB)
     ip: Mapped[Optional[str]] = mapped_column(INET)
     created_at: Mapped[sa.DateTime] = mapped_column(
-        sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+        sa.TIMESTAMP(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=text("clock_timestamp()"),
     )
 
 
@@ -529,10 +600,21 @@ class PushSubscription(Base):
     __tablename__ = "push_subscriptions"
     __table_args__ = (
         sa.Index("push_subscriptions_created_at_idx", sa.text("created_at DESC")),
+        sa.Index(
+            "ix_push_subscriptions_user_id",
+            "user_id",
+            postgresql_where=text("user_id IS NOT NULL"),
+        ),
+        # Unique qua hash index: endpoint chỉ được so sánh bằng `=`
+        ExcludeConstraint(
+            ("endpoint", "="), name="uq_push_subscriptions_endpoint", using="hash"
+        ),
     )
 
-    id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
-    endpoint: Mapped[str] = mapped_column(sa.Text, nullable=False, unique=True)
+    id: Mapped[int] = mapped_column(
+        sa.BigInteger, sa.Identity(always=False), primary_key=True
+    )
+    endpoint: Mapped[str] = mapped_column(sa.Text, nullable=False)
     p256dh: Mapped[str] = mapped_column(sa.Text, nullable=False)
     auth: Mapped[str] = mapped_column(sa.Text, nullable=False)
     expiration_time: Mapped[Optional[int]] = mapped_column(sa.BigInteger)
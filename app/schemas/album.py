@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from app.models.enums import ContentStatus
 from app.schemas.asset import AssetOut, PublicAssetOut
@@ -51,6 +51,8 @@ class PublicAlbumVideoOut(BaseModel):
 class AlbumItemCreate(BaseModel):
     """Schema để thêm item vào album."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     asset_public_id: UUID = Field(..., description="Public ID của asset (ảnh).")
     position: int = Field(..., description="Thứ tự trong album.")
     caption: Optional[str] = Field(default=None, description="Chú thích ảnh.")
@@ -59,6 +61,8 @@ class AlbumItemCreate(BaseModel):
 class AlbumVideoCreate(BaseModel):
     """Schema để thêm video vào album."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     video_public_id: UUID = Field(..., description="Public ID của video embed.")
     position: int = Field(..., description="Thứ tự trong album.")
 
@@ -95,6 +99,39 @@ class AlbumCreate(AlbumBase):
     )
 
 
+class AlbumEntryIn(BaseModel):
+    """
+    Một phần tử của album trong metadata JSON, theo đúng thứ tự hiển thị.
+
+    Chỉ set đúng một trong: file_index / asset_public_id / video_public_id.
+    """
+
+    file_index: Optional[int] = Field(
+        default=None, ge=0, description="Vị trí của file upload mới trong `files`."
+    )
+    asset_public_id: Optional[UUID] = Field(default=None, description="Public ID của ảnh có sẵn.")
+    video_public_id: Optional[UUID] = Field(default=None, description="Public ID của video có sẵn.")
+    caption: Optional[str] = Field(default=None, description="Chú thích ảnh.")
+
+    @model_validator(mode="after")
+    def _check_single_source(self) -> "AlbumEntryIn":
+        sources = (self.file_index, self.asset_public_id, self.video_public_id)
+        if sum(source is not None for source in sources) != 1:
+            raise ValueError(
+                "Cần đúng một trong file_index, asset_public_id, video_public_id."
+            )
+        return self
+
+
+class AlbumCreateMetadata(AlbumBase):
+    """Metadata JSON (một form field) khi tạo album kèm files upload."""
+
+    entries: list[AlbumEntryIn] = Field(
+        default_factory=list,
+        description="Ảnh/video trong album; position = vị trí trong list.",
+    )
+
+
 class AlbumUpdate(BaseModel):
     """Schema để cập nhật album."""
 
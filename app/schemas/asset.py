@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class AssetOut(BaseModel):
@@ -33,6 +33,8 @@ class PostAssetOut(BaseModel):
 class PublicAssetOut(BaseModel):
     """Schema cho asset trong public API - chỉ trả về public_id."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     public_id: UUID
     url: str
     mime_type: str
@@ -40,6 +42,12 @@ class PublicAssetOut(BaseModel):
     width: Optional[int] = None
     height: Optional[int] = None
 
+    @field_validator("url", mode="before")
+    @classmethod
+    def _url_or_empty(cls, value: Optional[str]) -> str:
+        # Asset.url nullable (asset chưa có URL public) → trả chuỗi rỗng
+        return value or ""
+
 
 class PublicPostAssetOut(BaseModel):
     """Schema cho ảnh trong nội dung bài viết (public API)."""
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from typing import Optional
+from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -35,8 +36,10 @@ class GoogleLoginRequest(BaseModel):
 
 
 class GoogleUserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
-    public_id: str
+    public_id: UUID
     email: str
     google_sub: Optional[str] = None
 
@@ -122,4 +125,11 @@ class FacebookStatusResponse(BaseModel):
     page_id: Optional[str] = None
     page_name: Optional[str] = None
     expires_at: Optional[datetime] = None
-    message: Optional[str] = None
\ No newline at end of file
+    message: Optional[str] = None
+
+class CurrentUser(BaseModel):
+    """User hiện tại lấy từ claims của access token (không query DB)."""
+
+    id: int = Field(..., description="users.id (claim `uid`)")
+    public_id: Optional[str] = Field(None, description="users.public_id (claim `sub`)")
+    email: Optional[str] = Field(None, description="Email lúc cấp token (claim `email`)")
@@ -42,13 +42,16 @@ class ContactMessageAdminOut(BaseModel):
 class ContactMessageListMeta(BaseModel):
     page: int
     page_size: int
-    total_items: int
-    total_pages: int
+    has_next: bool
+    # Only filled in when the request sets include_total=true
+    total_items: Optional[int] = None
+    total_pages: Optional[int] = None
 
 
 class ContactMessageListOut(BaseModel):
     items: list[ContactMessageAdminOut]
     meta: ContactMessageListMeta
+    next_cursor: Optional[str] = None
 
 
 class ContactMessageStatusUpdate(BaseModel):
@@ -89,13 +89,19 @@ class NewsOut(BaseModel):
 class NewsListMeta(BaseModel):
     page: int
     page_size: int
-    total_items: int
-    total_pages: int
+    has_next: bool
+    # List admin chỉ đếm khi include_total=true
+    total_items: Optional[int] = None
+    total_pages: Optional[int] = None
 
 
 class NewsListOut(BaseModel):
     items: list[NewsOut]
     meta: NewsListMeta
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Truyền vào `cursor` để lấy trang tiếp theo (chỉ với sort mặc định); None nếu đã hết.",
+    )
 
 
 class SlugCheckOut(BaseModel):
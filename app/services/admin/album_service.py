@@ -4,16 +4,19 @@ Service xử lý Album cho admin API.
 from __future__ import annotations
 
 import logging
+import time
+from itertools import chain, repeat
 from datetime import datetime, timezone
-from typing import Optional
+from threading import Lock
+from typing import Iterable, Iterator, List, Optional, TypeVar
 from uuid import UUID
 
-from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import any_, bindparam, delete, exists, func, insert, literal_column, select
 from sqlalchemy.orm import Session
 
-from app.models.enums import ContentStatus
-from app.models.tables import Album, AlbumItem, AlbumVideo, Asset, User, VideoEmbed
+from app.models.enums import ContentStatus, EmbedProvider
+from app.models.tables import Album, AlbumItem, AlbumVideo, Asset, VideoEmbed
 from app.schemas.album import (
     AlbumCreate,
     AlbumItemOut,
@@ -25,10 +28,97 @@ from app.schemas.album import (
     SlugCheckOut,
 )
 from app.schemas.asset import AssetOut
+from app.schemas.auth import CurrentUser
+from app.services import asset_service, public_cache
+from app.services.asset_service import UUID_ARRAY
+from app.utils.pagination import fetch_page
 from app.utils.text import slugify
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Admin UI gọi /slug/check theo từng phím gõ → cache kết quả vài giây (in-memory,
+# theo process). Tạo/sửa/xoá album trong process xoá cache ngay.
+SLUG_CHECK_TTL_SECONDS = 5.0
+_SLUG_CHECK_MAX_ENTRIES = 1024
+_slug_taken_cache: dict[str, tuple[float, bool]] = {}
+_slug_cache_lock = Lock()
+
+
+def _invalidate_slug_cache() -> None:
+    with _slug_cache_lock:
+        _slug_taken_cache.clear()
+
+
+async def upload_album_files(
+    db: Session, files: List[UploadFile], user_id: int
+) -> list[tuple[bool, UUID]]:
+    """
+    Upload files (song song); mỗi video được tạo kèm VideoEmbed.
+
+    Returns:
+        Theo thứ tự của files: (is_video, public_id) — public_id của Asset nếu
+        là ảnh, của VideoEmbed nếu là video
+    """
+    assets = await asset_service.upload_assets(db, files, user_id)
+    video_rows = [
+        {
+            "provider": EmbedProvider.LOCAL,
+            "url": asset.url or "",
+            "title": file.filename or None,
+            "created_by": user_id,
+        }
+        for file, asset in zip(files, assets)
+        if asset.mime_type.startswith("video/")
+    ]
+
+    # public_id do DB sinh → một câu INSERT ... RETURNING cho mọi video
+    video_public_ids: Iterator[UUID] = iter(())
+    if video_rows:
+        stmt = insert(VideoEmbed).returning(VideoEmbed.public_id, sort_by_parameter_order=True)
+        video_public_ids = iter(db.scalars(stmt, video_rows).all())
+    return [
+        (True, next(video_public_ids)) if asset.mime_type.startswith("video/") else (False, asset.public_id)
+        for asset in assets
+    ]
+
+
+def with_captions(values: Iterable[T], captions: Optional[List[str]]) -> Iterator[tuple[T, Optional[str]]]:
+    """
+    Ghép từng phần tử với caption cùng vị trí; thiếu caption → None, caption thừa bị bỏ.
+
+    Không dùng zip_longest: nó pad cả hai phía, caption thừa sẽ thành phần tử None.
+    """
+    return zip(values, chain(captions or [], repeat(None)))
+
+
+async def upload_new_files(
+    db: Session,
+    new_files: Optional[List[UploadFile]],
+    new_captions: Optional[List[str]],
+    user_id: int,
+) -> tuple[list[tuple[UUID, Optional[str]]], list[UUID]]:
+    """
+    Upload new_files (song song) và phân biệt ảnh/video.
+
+    Returns:
+        (danh sách (asset_public_id, caption) của ảnh, danh sách public_id của VideoEmbed mới)
+    """
+    new_image_asset_public_ids: list[tuple[UUID, Optional[str]]] = []
+    new_video_public_ids: list[UUID] = []
+    if not new_files:
+        return new_image_asset_public_ids, new_video_public_ids
+
+    uploaded = await upload_album_files(db, new_files, user_id)
+    for (is_video, public_id), caption in with_captions(uploaded, new_captions):
+        if is_video:
+            new_video_public_ids.append(public_id)
+        else:
+            # Ảnh → thêm vào items
+            new_image_asset_public_ids.append((public_id, caption))
+    return new_image_asset_public_ids, new_video_public_ids
+
 
 def _get_album_or_404(db: Session, album_id: int) -> Album:
     """Lấy album theo ID, raise 404 nếu không tồn tại hoặc đã xóa."""
@@ -52,16 +142,10 @@ def _resolve_asset_ids(
     if not asset_public_ids:
         return {}
     
-    assets = db.scalars(
-        select(Asset).where(
-            Asset.public_id.in_(asset_public_ids),
-            Asset.deleted_at.is_(None),
-        )
-    ).all()
+    asset_map = asset_service.fetch_ids_by_public_ids(db, asset_public_ids)
     
     # Validate tất cả public_id đều tồn tại
-    found_public_ids = {asset.public_id for asset in assets}
-    missing = set(asset_public_ids) - found_public_ids
+    missing = set(asset_public_ids) - asset_map.keys()
     if missing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -71,7 +155,7 @@ def _resolve_asset_ids(
             },
         )
     
-    return {asset.public_id: asset.id for asset in assets}
+    return asset_map
 
 
 def _resolve_video_ids(
@@ -81,13 +165,15 @@ def _resolve_video_ids(
     if not video_public_ids:
         return {}
     
-    videos = db.scalars(
-        select(VideoEmbed).where(VideoEmbed.public_id.in_(video_public_ids))
+    rows = db.execute(
+        select(VideoEmbed.id, VideoEmbed.public_id).where(
+            VideoEmbed.public_id == any_(bindparam(None, list(video_public_ids), type_=UUID_ARRAY))
+        )
     ).all()
+    video_map = {public_id: video_id for video_id, public_id in rows}
     
     # Validate tất cả public_id đều tồn tại
-    found_public_ids = {video.public_id for video in videos}
-    missing = set(video_public_ids) - found_public_ids
+    missing = set(video_public_ids) - video_map.keys()
     if missing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -97,29 +183,39 @@ def _resolve_video_ids(
             },
         )
     
-    return {video.public_id: video.id for video in videos}
+    return video_map
 
 
-def _ensure_unique_slug(
+def _slug_taken(
     db: Session, slug: str, *, exclude_album_id: Optional[int] = None
-) -> None:
-    """Kiểm tra slug có unique không, raise 409 nếu conflict."""
-    stmt = select(Album.id).where(
+) -> bool:
+    """Slug đã được album khác (chưa xoá) dùng chưa (SELECT EXISTS, DB trả về bool)."""
+    condition = exists().where(
         Album.slug == slug,
         Album.deleted_at.is_(None),
     )
     if exclude_album_id is not None:
-        stmt = stmt.where(Album.id != exclude_album_id)
+        condition = condition.where(Album.id != exclude_album_id)
 
-    exists = db.scalar(stmt)
-    if exists:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={
-                "code": "slug_conflict",
-                "message": "Slug đã được sử dụng cho một album khác.",
-            },
-        )
+    return bool(db.scalar(select(condition)))
+
+
+def _slug_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "code": "slug_conflict",
+            "message": "Slug đã được sử dụng cho một album khác.",
+        },
+    )
+
+
+def _ensure_unique_slug(
+    db: Session, slug: str, *, exclude_album_id: Optional[int] = None
+) -> None:
+    """Kiểm tra slug có unique không, raise 409 nếu conflict."""
+    if _slug_taken(db, slug, exclude_album_id=exclude_album_id):
+        raise _slug_conflict()
 
 
 def _to_album_out(db: Session, album: Album) -> AlbumOut:
@@ -240,6 +336,20 @@ def _to_album_out(db: Session, album: Album) -> AlbumOut:
     )
 
 
+def _album_search_text():
+    """
+    title || ' ' || slug || ' ' || coalesce(description, '') — khớp đúng biểu
+    thức của index albums_search_trgm_idx để ILIKE dùng được GIN index.
+    """
+    space = literal_column("' '")
+    return (
+        Album.title.op("||")(space)
+        .op("||")(Album.slug)
+        .op("||")(space)
+        .op("||")(func.coalesce(Album.description, literal_column("''")))
+    )
+
+
 def list_albums(
     db: Session,
     *,
@@ -259,21 +369,11 @@ def list_albums(
     # Search
     if q:
         search_term = f"%{q}%"
-        stmt = stmt.where(
-            (Album.title.ilike(search_term))
-            | (Album.slug.ilike(search_term))
-            | (Album.description.ilike(search_term))
-        )
+        stmt = stmt.where(_album_search_text().ilike(search_term))
     
-    # Count total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_items = db.scalar(count_stmt)
-    
-    # Pagination
-    offset = (page - 1) * page_size
-    stmt = stmt.order_by(Album.created_at.desc()).offset(offset).limit(page_size)
-    
-    albums = db.scalars(stmt).all()
+    # Pagination (kèm tổng số dòng trong cùng query)
+    stmt = stmt.order_by(Album.created_at.desc())
+    albums, total_items = fetch_page(db, stmt, page=page, page_size=page_size)
     
     # Convert to output
     items = [_to_album_out(db, album) for album in albums]
@@ -298,7 +398,7 @@ def get_album_detail(db: Session, album_id: int) -> AlbumOut:
 
 
 def create_album(
-    db: Session, payload: AlbumCreate, user: Optional[User] = None
+    db: Session, payload: AlbumCreate, user: Optional[CurrentUser] = None
 ) -> AlbumOut:
     """Tạo album mới."""
     logger.info(
@@ -320,11 +420,11 @@ def create_album(
     
     _ensure_unique_slug(db, slug)
     
-    # Resolve assets và videos
-    asset_map = {}
-    if payload.items:
-        asset_public_ids = [item.asset_public_id for item in payload.items]
-        asset_map = _resolve_asset_ids(db, asset_public_ids)
+    # Resolve assets (kể cả cover) và videos, mỗi loại một query
+    asset_public_ids = [item.asset_public_id for item in payload.items or []]
+    if payload.cover_asset_public_id:
+        asset_public_ids.append(payload.cover_asset_public_id)
+    asset_map = _resolve_asset_ids(db, asset_public_ids)
     
     video_map = {}
     if payload.videos:
@@ -334,8 +434,7 @@ def create_album(
     # Resolve cover asset
     cover_asset_id = None
     if payload.cover_asset_public_id:
-        cover_map = _resolve_asset_ids(db, [payload.cover_asset_public_id])
-        cover_asset_id = cover_map.get(payload.cover_asset_public_id)
+        cover_asset_id = asset_map.get(payload.cover_asset_public_id)
     elif payload.items:
         # Auto set cover = ảnh đầu tiên
         first_item = payload.items[0]
@@ -353,32 +452,38 @@ def create_album(
     db.add(album)
     db.flush()
     
-    # Create items
+    # Create items (một câu INSERT cho cả album)
     if payload.items:
-        for item in payload.items:
-            asset_id = asset_map.get(item.asset_public_id)
-            if asset_id:
-                album_item = AlbumItem(
-                    album_id=album.id,
-                    asset_id=asset_id,
-                    position=item.position,
-                    caption=item.caption,
-                )
-                db.add(album_item)
+        item_rows = [
+            {
+                "album_id": album.id,
+                "asset_id": asset_map[item.asset_public_id],
+                "position": item.position,
+                "caption": item.caption,
+            }
+            for item in payload.items
+            if item.asset_public_id in asset_map
+        ]
+        if item_rows:
+            db.execute(insert(AlbumItem), item_rows)
     
     # Create videos
     if payload.videos:
-        for video in payload.videos:
-            video_id = video_map.get(video.video_public_id)
-            if video_id:
-                album_video = AlbumVideo(
-                    album_id=album.id,
-                    video_id=video_id,
-                    position=video.position,
-                )
-                db.add(album_video)
+        video_rows = [
+            {
+                "album_id": album.id,
+                "video_id": video_map[video.video_public_id],
+                "position": video.position,
+            }
+            for video in payload.videos
+            if video.video_public_id in video_map
+        ]
+        if video_rows:
+            db.execute(insert(AlbumVideo), video_rows)
     
     db.commit()
+    _invalidate_slug_cache()
+    public_cache.invalidate_albums()
     db.refresh(album)
     
     logger.info(
@@ -390,7 +495,7 @@ def create_album(
 
 
 def update_album(
-    db: Session, album_id: int, payload: AlbumUpdate, user: Optional[User] = None
+    db: Session, album_id: int, payload: AlbumUpdate, user: Optional[CurrentUser] = None
 ) -> AlbumOut:
     """Cập nhật album."""
     logger.info("Updating album", extra={"action": "update_album", "album_id": album_id})
@@ -425,14 +530,9 @@ def update_album(
     
     # Update items/videos
     if payload.items is not None:
-        # Xóa tất cả items cũ
-        existing_items = db.scalars(
-            select(AlbumItem).where(AlbumItem.album_id == album.id)
-        ).all()
-        for item in existing_items:
-            db.delete(item)
-        # Flush để đảm bảo xóa được commit trước khi insert mới (tránh unique constraint violation)
-        db.flush()
+        # Xóa tất cả items cũ (một câu DELETE, chạy ngay trước khi insert mới
+        # nên không vướng unique constraint)
+        db.execute(delete(AlbumItem).where(AlbumItem.album_id == album.id))
         # Thêm items mới
         if payload.items:
             asset_public_ids = [item.asset_public_id for item in payload.items]
@@ -441,6 +541,7 @@ def update_album(
             # Validate không có duplicate asset_id hoặc position
             seen_asset_ids = set()
             seen_positions = set()
+            item_rows = []
             for item in payload.items:
                 asset_id = asset_map.get(item.asset_public_id)
                 if asset_id:
@@ -463,42 +564,43 @@ def update_album(
                     seen_asset_ids.add(asset_id)
                     seen_positions.add(item.position)
                     
-                    album_item = AlbumItem(
-                        album_id=album.id,
-                        asset_id=asset_id,
-                        position=item.position,
-                        caption=item.caption,
+                    item_rows.append(
+                        {
+                            "album_id": album.id,
+                            "asset_id": asset_id,
+                            "position": item.position,
+                            "caption": item.caption,
+                        }
                     )
-                    db.add(album_item)
+            if item_rows:
+                db.execute(insert(AlbumItem), item_rows)
         # Nếu payload.items = [] thì chỉ xóa, không thêm gì
     
     if payload.videos is not None:
         # Xóa tất cả videos cũ
-        existing_videos = db.scalars(
-            select(AlbumVideo).where(AlbumVideo.album_id == album.id)
-        ).all()
-        for video in existing_videos:
-            db.delete(video)
-        # Flush để đảm bảo xóa được commit trước khi insert mới (tránh unique constraint violation)
-        db.flush()
+        db.execute(delete(AlbumVideo).where(AlbumVideo.album_id == album.id))
         # Thêm videos mới
         if payload.videos:
             video_public_ids = [video.video_public_id for video in payload.videos]
             video_map = _resolve_video_ids(db, video_public_ids)
-            for video in payload.videos:
-                video_id = video_map.get(video.video_public_id)
-                if video_id:
-                    album_video = AlbumVideo(
-                        album_id=album.id,
-                        video_id=video_id,
-                        position=video.position,
-                    )
-                    db.add(album_video)
+            video_rows = [
+                {
+                    "album_id": album.id,
+                    "video_id": video_map[video.video_public_id],
+                    "position": video.position,
+                }
+                for video in payload.videos
+                if video.video_public_id in video_map
+            ]
+            if video_rows:
+                db.execute(insert(AlbumVideo), video_rows)
         # Nếu payload.videos = [] thì chỉ xóa, không thêm gì
     
     album.updated_at = datetime.now(timezone.utc)
     
     db.commit()
+    _invalidate_slug_cache()
+    public_cache.invalidate_albums()
     db.refresh(album)
     
     logger.info(
@@ -509,14 +611,19 @@ def update_album(
     return _to_album_out(db, album)
 
 
-def delete_album(db: Session, album_id: int) -> None:
+def delete_album(db: Session, album_id: int, user: Optional[CurrentUser] = None) -> None:
     """Xóa album (soft delete)."""
-    logger.info("Deleting album", extra={"action": "delete_album", "album_id": album_id})
+    logger.info(
+        "Deleting album",
+        extra={"action": "delete_album", "album_id": album_id, "user_id": user.id if user else None},
+    )
     
     album = _get_album_or_404(db, album_id)
     album.deleted_at = datetime.now(timezone.utc)
     
     db.commit()
+    _invalidate_slug_cache()
+    public_cache.invalidate_albums()
     
     logger.info("Album deleted successfully", extra={"album_id": album_id})
 
@@ -527,6 +634,20 @@ def check_slug(db: Session, slug: str) -> SlugCheckOut:
     if not normalized_slug:
         return SlugCheckOut(is_unique=False, normalized_slug="")
     
-    _ensure_unique_slug(db, normalized_slug)
-    return SlugCheckOut(is_unique=True, normalized_slug=normalized_slug)
+    now = time.monotonic()
+    with _slug_cache_lock:
+        cached = _slug_taken_cache.get(normalized_slug)
+        if cached is None or cached[0] <= now:
+            cached = None
+    if cached is None:
+        slug_taken = _slug_taken(db, normalized_slug)
+        with _slug_cache_lock:
+            if len(_slug_taken_cache) >= _SLUG_CHECK_MAX_ENTRIES:
+                _slug_taken_cache.clear()
+            _slug_taken_cache[normalized_slug] = (now + SLUG_CHECK_TTL_SECONDS, slug_taken)
+    else:
+        slug_taken = cached[1]
 
+    if slug_taken:
+        raise _slug_conflict()
+    return SlugCheckOut(is_unique=True, normalized_slug=normalized_slug)
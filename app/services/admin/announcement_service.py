@@ -10,6 +10,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
 
+from app.core.database import SessionLocal
 from app.models.enums import ContentStatus, JobStatus, PostType
 from app.models.tables import (
     Asset,
@@ -28,13 +29,14 @@ from app.schemas.announcement import (
     AnnouncementUpdate,
 )
 from app.schemas.asset import AssetOut, PostAssetOut
-from app.services import facebook_service
+from app.services import facebook_service, public_cache
 from app.services.facebook_service import (
     delete_facebook_post,
     get_valid_facebook_token,
     upload_images_to_facebook,
     upload_video_to_facebook,
 )
+from app.utils.pagination import fetch_page
 from app.utils.text import slugify
 
 logger = logging.getLogger(__name__)
@@ -459,31 +461,18 @@ def list_announcements(
             Post.deleted_at.is_(None),
         )
     )
-    count_stmt = (
-        select(func.count(Post.id))
-        .join(Block, Post.block_id == Block.id)
-        .where(
-            Post.post_type == PostType.ANNOUNCEMENT,
-            Post.deleted_at.is_(None),
-        )
-    )
 
     if status_filter:
         base_stmt = base_stmt.where(Post.status == status_filter)
-        count_stmt = count_stmt.where(Post.status == status_filter)
 
     if grade:
         base_stmt = base_stmt.where(Block.code == grade)
-        count_stmt = count_stmt.where(Block.code == grade)
 
     if q:
         ilike = f"%{q}%"
         base_stmt = base_stmt.where(
             (Post.title.ilike(ilike)) | (Post.slug.ilike(ilike))
         )
-        count_stmt = count_stmt.where(
-            (Post.title.ilike(ilike)) | (Post.slug.ilike(ilike))
-        )
 
     # Xử lý sort
     valid_sort_fields = {
@@ -511,13 +500,9 @@ def list_announcements(
         else:
             base_stmt = base_stmt.order_by(sort_field.asc(), Post.id.asc())
 
-    total_items = db.scalar(count_stmt) or 0
+    rows, total_items = fetch_page(db, base_stmt, page=page, page_size=page_size)
     total_pages = (total_items + page_size - 1) // page_size if total_items else 0
 
-    rows = db.scalars(
-        base_stmt.offset((page - 1) * page_size).limit(page_size)
-    ).all()
-
     items = [_to_admin_announcement_out(db, row) for row in rows]
 
     meta = AdminAnnouncementListMeta(
@@ -611,6 +596,7 @@ def create_announcement(
         _publish_to_facebook(db, post, payload.content_asset_public_ids, user=user)
 
     db.commit()
+    public_cache.invalidate_announcements()
     db.refresh(post)
 
     return _to_admin_announcement_out(db, post)
@@ -749,12 +735,20 @@ def update_announcement(
     db.add(revision)
 
     db.commit()
+    public_cache.invalidate_announcements()
     db.refresh(post)
 
     return _to_admin_announcement_out(db, post)
 
 
-def delete_announcement(db: Session, announcement_id: int, user: Optional[User] = None, delete_on_facebook: bool = False) -> None:
+def delete_announcement(db: Session, announcement_id: int, delete_on_facebook: bool = False) -> bool:
+    """
+    Xoá mềm thông báo.
+
+    Returns:
+        True nếu còn phải xoá bài trên Facebook (delete_on_facebook và thông báo
+        đã đăng) → caller gọi delete_announcement_from_facebook sau khi trả response.
+    """
     logger.info(
         "Deleting announcement",
         extra={"action": "delete_announcement", "announcement_id": announcement_id, "delete_on_facebook": delete_on_facebook},
@@ -775,12 +769,27 @@ def delete_announcement(db: Session, announcement_id: int, user: Optional[User]
             },
         )
 
-    # Xóa trên Facebook nếu delete_on_facebook = True và đã đăng
-    if delete_on_facebook and post.status == ContentStatus.PUBLISHED:
-        _delete_from_facebook(db, post.id, user=user)
-
     post.deleted_at = datetime.now(timezone.utc)
     db.commit()
+    public_cache.invalidate_announcements()
+
+    # Xóa trên Facebook nếu delete_on_facebook = True và đã đăng
+    return delete_on_facebook and post.status == ContentStatus.PUBLISHED
+
+
+def delete_announcement_from_facebook(announcement_id: int, user_id: Optional[int] = None) -> None:
+    """
+    Xoá bài Facebook của thông báo đã xoá mềm (chạy qua BackgroundTasks).
+
+    Dùng session riêng vì session của request đã đóng khi background task chạy.
+    """
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id) if user_id is not None else None
+        _delete_from_facebook(db, announcement_id, user=user)
+        db.commit()
+    finally:
+        db.close()
 
 
 
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import bindparam, func, literal_column, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.enums import ContactStatus
@@ -13,12 +15,29 @@ from app.schemas.contact import (
     ContactMessageListMeta,
     ContactMessageListOut,
 )
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+# Must match the contact_messages_search_trgm_idx expression exactly so the
+# ILIKE search can use the GIN index
+_SPACE = literal_column("' '")
+_SEARCH_TEXT = (
+    ContactMessage.full_name.op("||")(_SPACE)
+    .op("||")(func.coalesce(ContactMessage.email, literal_column("''")))
+    .op("||")(_SPACE)
+    .op("||")(func.coalesce(ContactMessage.phone, literal_column("''")))
+    .op("||")(_SPACE)
+    .op("||")(ContactMessage.message)
+)
+
+# Built once with a bindparam so its cache key is memoized across requests
+_CONTACT_MESSAGE_BY_ID_STMT = select(ContactMessage).where(
+    ContactMessage.id == bindparam("message_id")
+)
 
 
 def _get_contact_message_or_404(db: Session, message_id: int) -> ContactMessage:
-    message = db.scalar(
-        select(ContactMessage).where(ContactMessage.id == message_id)
-    )
+    message = db.scalar(_CONTACT_MESSAGE_BY_ID_STMT, {"message_id": message_id})
     if not message:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -27,56 +46,70 @@ def _get_contact_message_or_404(db: Session, message_id: int) -> ContactMessage:
     return message
 
 
-def list_contact_messages(
-    db: Session,
+def _after_cursor(cursor: str):
+    """Điều kiện keyset: các dòng sau (created_at, id) của cursor."""
+    try:
+        created_at, last_id = decode_cursor(cursor)
+        after = (datetime.fromisoformat(created_at), int(last_id))
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "invalid_cursor", "message": "Invalid pagination cursor."},
+        ) from exc
+    return tuple_(ContactMessage.created_at, ContactMessage.id) < after
+
+
+async def list_contact_messages(
+    db: AsyncSession,
     *,
     page: int,
     page_size: int,
     status_filter: Optional[ContactStatus] = None,
     q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
 ) -> ContactMessageListOut:
-    base_stmt = select(ContactMessage)
-    count_stmt = select(func.count(ContactMessage.id))
-
+    filters = []
     if status_filter is not None:
-        base_stmt = base_stmt.where(ContactMessage.status == status_filter)
-        count_stmt = count_stmt.where(ContactMessage.status == status_filter)
+        filters.append(ContactMessage.status == status_filter)
 
     if q:
         ilike = f"%{q}%"
-        base_stmt = base_stmt.where(
-            (ContactMessage.full_name.ilike(ilike))
-            | (ContactMessage.email.ilike(ilike))
-            | (ContactMessage.phone.ilike(ilike))
-            | (ContactMessage.message.ilike(ilike))
-        )
-        count_stmt = count_stmt.where(
-            (ContactMessage.full_name.ilike(ilike))
-            | (ContactMessage.email.ilike(ilike))
-            | (ContactMessage.phone.ilike(ilike))
-            | (ContactMessage.message.ilike(ilike))
-        )
+        filters.append(_SEARCH_TEXT.ilike(ilike))
 
-    base_stmt = base_stmt.order_by(
+    base_stmt = select(ContactMessage).where(*filters).order_by(
         ContactMessage.created_at.desc(),
         ContactMessage.id.desc(),
     )
 
-    total_items = db.scalar(count_stmt) or 0
-    total_pages = (total_items + page_size - 1) // page_size if total_items else 0
-
-    rows = db.scalars(
-        base_stmt.offset((page - 1) * page_size).limit(page_size)
-    ).all()
+    # COUNT(*) with ILIKE filters is a full scan, so it only runs on request
+    total_items = total_pages = None
+    if include_total:
+        total_items = await db.scalar(select(func.count(ContactMessage.id)).where(*filters)) or 0
+        total_pages = (total_items + page_size - 1) // page_size if total_items else 0
+
+    # Có cursor → keyset (không OFFSET); lấy thừa một dòng để biết còn trang sau
+    if cursor:
+        base_stmt = base_stmt.where(_after_cursor(cursor))
+    else:
+        base_stmt = base_stmt.offset((page - 1) * page_size)
+    rows = (await db.scalars(base_stmt.limit(page_size + 1))).all()
+
+    next_cursor = None
+    has_next = len(rows) > page_size
+    if has_next:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
 
     items = [ContactMessageAdminOut.from_orm(row) for row in rows]
     meta = ContactMessageListMeta(
         page=page,
         page_size=page_size,
+        has_next=has_next,
         total_items=total_items,
         total_pages=total_pages,
     )
-    return ContactMessageListOut(items=items, meta=meta)
+    return ContactMessageListOut(items=items, meta=meta, next_cursor=next_cursor)
 
 
 def update_contact_message_status(
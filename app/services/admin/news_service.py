@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import logging
 import os
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import delete, func, select
+from sqlalchemy import bindparam, delete, func, literal_column, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.database import SessionLocal
 from app.models.enums import ContentStatus, JobStatus, PostType
 from app.models.tables import Asset, FacebookPostLog, Post, PostAsset, PostRevision, User
 from app.schemas.asset import AssetOut, PostAssetOut
@@ -21,28 +24,70 @@ from app.schemas.news import (
     NewsUpdate,
     SlugCheckOut,
 )
-from app.services import facebook_service
+from app.services import facebook_service, public_cache
 from app.services.facebook_service import (
     delete_facebook_post,
     get_valid_facebook_token,
     upload_images_to_facebook,
     upload_video_to_facebook,
 )
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.utils.text import slugify
 
 logger = logging.getLogger(__name__)
 
+# published_at DESC NULLS LAST viết thành một khoá không NULL (bài chưa publish
+# → -infinity) để keyset chỉ là một phép so sánh tuple, khớp posts_news_keyset_idx
+_NO_PUBLISHED_AT = literal_column("'-infinity'::timestamptz")
+_NEWS_PUBLISHED_KEY = func.coalesce(Post.published_at, _NO_PUBLISHED_AT)
+# title || ' ' || slug — khớp đúng biểu thức của posts_news_search_trgm_idx để
+# ILIKE dùng được GIN index
+_NEWS_SEARCH_TEXT = Post.title.op("||")(literal_column("' '")).op("||")(Post.slug)
+
+# ORDER BY dựng sẵn theo (sort_by, desc?); id làm tiebreaker để thứ tự xác định.
+# published_at có thể NULL → NULL xếp cuối khi desc (cùng key với keyset/index),
+# xếp đầu khi asc.
+_NEWS_SORT_FIELDS = {
+    "created_at": Post.created_at,
+    "updated_at": Post.updated_at,
+    "published_at": Post.published_at,
+    "title": Post.title,
+    "status": Post.status,
+    "content_html": Post.content_html,
+}
+_NEWS_ORDER_BY = {
+    (name, True): (column.desc(), Post.id.desc()) for name, column in _NEWS_SORT_FIELDS.items()
+} | {
+    (name, False): (column.asc(), Post.id.asc()) for name, column in _NEWS_SORT_FIELDS.items()
+}
+_NEWS_ORDER_BY[("published_at", True)] = (
+    _NEWS_PUBLISHED_KEY.desc(), Post.created_at.desc(), Post.id.desc()
+)
+_NEWS_ORDER_BY[("published_at", False)] = (
+    Post.published_at.asc().nullsfirst(), Post.created_at.asc(), Post.id.asc()
+)
 
-def _get_news_or_404(db: Session, news_id: int) -> Post:
-    stmt = (
-        select(Post)
-        .where(
-            Post.id == news_id,
-            Post.post_type == PostType.NEWS,
-            Post.deleted_at.is_(None),
-        )
+# Query cố định dựng sẵn một lần với bindparam: cache key được memoize trên object
+# nên mỗi lần execute chỉ tra compiled cache, không dựng lại select()
+_NEWS_BY_ID_STMT = select(Post).where(
+    Post.id == bindparam("news_id"),
+    Post.post_type == PostType.NEWS,
+    Post.deleted_at.is_(None),
+)
+# PostAsset JOIN Asset của nhiều post, theo post_id rồi position
+_CONTENT_ASSETS_STMT = (
+    select(PostAsset.post_id, PostAsset.position, PostAsset.caption, Asset)
+    .join(Asset, Asset.id == PostAsset.asset_id)
+    .where(
+        PostAsset.post_id.in_(bindparam("post_ids", expanding=True)),
+        Asset.deleted_at.is_(None),
     )
-    post = db.scalar(stmt)
+    .order_by(PostAsset.post_id, PostAsset.position)
+)
+
+
+def _get_news_or_404(db: Session, news_id: int) -> Post:
+    post = db.scalar(_NEWS_BY_ID_STMT, {"news_id": news_id})
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -104,34 +149,14 @@ def _ensure_unique_slug(
         )
 
 
-def _to_news_out(db: Session, post: Post) -> NewsOut:
-    """Convert Post → NewsOut, join Asset để lấy public_id và content_assets."""
-    # Load content_assets với join để tránh N+1 query
-    post_assets = db.scalars(
-        select(PostAsset)
-        .where(PostAsset.post_id == post.id)
-        .order_by(PostAsset.position)
-    ).all()
-    
-    if not post_assets:
-        content_assets = []
-    else:
-        # Query tất cả assets một lần để tránh N+1
-        asset_ids = [pa.asset_id for pa in post_assets]
-        assets = {
-            asset.id: asset
-            for asset in db.scalars(
-                select(Asset).where(
-                    Asset.id.in_(asset_ids),
-                    Asset.deleted_at.is_(None),
-                )
-            ).all()
-        }
-        
-        content_assets = [
+def _group_content_assets(post_ids: list[int], rows) -> dict[int, list[PostAssetOut]]:
+    """Gom kết quả của _CONTENT_ASSETS_STMT thành content_assets theo post_id."""
+    content_assets: dict[int, list[PostAssetOut]] = {post_id: [] for post_id in post_ids}
+    for post_id, position, caption, asset in rows:
+        content_assets[post_id].append(
             PostAssetOut(
-                position=pa.position,
-                caption=pa.caption,
+                position=position,
+                caption=caption,
                 asset=AssetOut(
                     id=asset.id,
                     public_id=asset.public_id,
@@ -142,10 +167,38 @@ def _to_news_out(db: Session, post: Post) -> NewsOut:
                     height=asset.height,
                 ),
             )
-            for pa in post_assets
-            if (asset := assets.get(pa.asset_id))
-        ]
-    
+        )
+    return content_assets
+
+
+def _load_content_assets(db: Session, post_ids: list[int]) -> dict[int, list[PostAssetOut]]:
+    """
+    Load content_assets của nhiều post trong một query (PostAsset JOIN Asset).
+
+    Models không khai báo relationship nên không có selectinload; list_news gom
+    cả trang vào một lần load thay vì 2 query cho mỗi bài (N+1).
+    """
+    if not post_ids:
+        return {}
+    return _group_content_assets(
+        post_ids, db.execute(_CONTENT_ASSETS_STMT, {"post_ids": post_ids})
+    )
+
+
+def _to_news_out(
+    db: Session, post: Post, content_assets: Optional[list[PostAssetOut]] = None
+) -> NewsOut:
+    """
+    Convert Post → NewsOut.
+
+    content_assets đã load sẵn (list_news) thì dùng luôn, không thì load riêng cho post.
+    """
+    if content_assets is None:
+        content_assets = _load_content_assets(db, [post.id])[post.id]
+    return _build_news_out(post, content_assets)
+
+
+def _build_news_out(post: Post, content_assets: list[PostAssetOut]) -> NewsOut:
     return NewsOut(
         id=post.id,
         public_id=post.public_id,
@@ -476,8 +529,29 @@ def _delete_from_facebook(
         return False
 
 
-def list_news(
-    db: Session,
+def _invalid_cursor(message: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={"code": "invalid_cursor", "message": message},
+    )
+
+
+def _news_after_cursor(cursor: str):
+    """Điều kiện keyset cho thứ tự mặc định (published_at desc): các dòng sau cursor."""
+    try:
+        published_at, created_at, last_id = decode_cursor(cursor)
+        after = tuple_(
+            datetime.fromisoformat(published_at) if published_at is not None else _NO_PUBLISHED_AT,
+            datetime.fromisoformat(created_at),
+            int(last_id),
+        )
+    except (ValueError, TypeError) as exc:
+        raise _invalid_cursor("Cursor phân trang không hợp lệ.") from exc
+    return tuple_(_NEWS_PUBLISHED_KEY, Post.created_at, Post.id) < after
+
+
+async def list_news(
+    db: AsyncSession,
     *,
     page: int,
     page_size: int,
@@ -485,74 +559,69 @@ def list_news(
     q: Optional[str],
     sort_by: str = "published_at",
     sort_order: str = "desc",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
 ) -> NewsListOut:
-    base_stmt = select(Post).where(
+    filters = [
         Post.post_type == PostType.NEWS,
         Post.deleted_at.is_(None),
-    )
-    count_stmt = select(func.count(Post.id)).where(
-        Post.post_type == PostType.NEWS,
-        Post.deleted_at.is_(None),
-    )
+    ]
 
     if status_filter is not None:
-        base_stmt = base_stmt.where(Post.status == status_filter)
-        count_stmt = count_stmt.where(Post.status == status_filter)
+        filters.append(Post.status == status_filter)
 
     if q:
         ilike = f"%{q}%"
-        base_stmt = base_stmt.where(
-            (Post.title.ilike(ilike)) | (Post.slug.ilike(ilike))
-        )
-        count_stmt = count_stmt.where(
-            (Post.title.ilike(ilike)) | (Post.slug.ilike(ilike))
-        )
+        filters.append(_NEWS_SEARCH_TEXT.ilike(ilike))
 
-    # Xử lý sort
-    valid_sort_fields = {
-        "created_at": Post.created_at,
-        "updated_at": Post.updated_at,
-        "published_at": Post.published_at,
-        "title": Post.title,
-        "status": Post.status,
-        "content_html": Post.content_html,
-    }
-    
-    sort_field = valid_sort_fields.get(sort_by, Post.published_at)
+    base_stmt = select(Post).where(*filters)
+
+    if sort_by not in _NEWS_SORT_FIELDS:
+        sort_by = "published_at"
     is_desc = sort_order.lower() == "desc"
-    
-    if sort_by == "published_at":
-        # published_at có thể NULL → dùng nullslast
-        if is_desc:
-            base_stmt = base_stmt.order_by(sort_field.desc().nullslast(), Post.created_at.desc())
-        else:
-            base_stmt = base_stmt.order_by(sort_field.asc().nullsfirst(), Post.created_at.asc())
+    base_stmt = base_stmt.order_by(*_NEWS_ORDER_BY[(sort_by, is_desc)])
+
+    # COUNT(*) với ILIKE phải quét cả bảng → chỉ đếm khi được yêu cầu
+    total_items = total_pages = None
+    if include_total:
+        total_items = await db.scalar(select(func.count(Post.id)).where(*filters)) or 0
+        total_pages = (total_items + page_size - 1) // page_size if total_items else 0
+
+    # Keyset chỉ cho thứ tự mặc định (published_at desc) - thứ tự có index
+    keyset = sort_by == "published_at" and is_desc
+    if cursor:
+        if not keyset:
+            raise _invalid_cursor("cursor chỉ dùng được với sort_by=published_at, sort_order=desc.")
+        base_stmt = base_stmt.where(_news_after_cursor(cursor))
     else:
-        # Các field khác không có NULL → sort bình thường
-        if is_desc:
-            base_stmt = base_stmt.order_by(sort_field.desc(), Post.id.desc())
-        else:
-            base_stmt = base_stmt.order_by(sort_field.asc(), Post.id.asc())
-
-    total_items = db.scalar(count_stmt) or 0
-    total_pages = (total_items + page_size - 1) // page_size if total_items else 0
-
-    rows = db.scalars(
-        base_stmt.offset((page - 1) * page_size).limit(page_size)
-    ).all()
-
-    items = [
-        _to_news_out(db, row)
-        for row in rows
-    ]
+        base_stmt = base_stmt.offset((page - 1) * page_size)
+    # Lấy thừa một dòng để biết còn trang sau
+    rows = (await db.scalars(base_stmt.limit(page_size + 1))).all()
+
+    next_cursor = None
+    has_next = len(rows) > page_size
+    if has_next:
+        rows = rows[:page_size]
+        if keyset:
+            last = rows[-1]
+            next_cursor = encode_cursor(last.published_at, last.created_at, last.id)
+
+    post_ids = [row.id for row in rows]
+    content_assets = {}
+    if post_ids:
+        content_assets = _group_content_assets(
+            post_ids, await db.execute(_CONTENT_ASSETS_STMT, {"post_ids": post_ids})
+        )
+    items = [_build_news_out(row, content_assets[row.id]) for row in rows]
 
     meta = NewsListMeta(
         page=page,
         page_size=page_size,
+        has_next=has_next,
         total_items=total_items,
         total_pages=total_pages,
     )
-    return NewsListOut(items=items, meta=meta)
+    return NewsListOut(items=items, meta=meta, next_cursor=next_cursor)
 
 
 def get_news_detail(db: Session, news_id: int) -> NewsOut:
@@ -560,8 +629,54 @@ def get_news_detail(db: Session, news_id: int) -> NewsOut:
     return _to_news_out(db, post)
 
 
-def create_news(db: Session, payload: NewsCreate, user: Optional[User] = None) -> NewsOut:
-    """Tạo bài viết mới."""
+@dataclass(frozen=True)
+class FacebookSync:
+    """Việc cần làm với bài Facebook của một tin sau khi đã commit."""
+
+    delete_existing: bool = False
+    publish: bool = False
+
+
+def sync_news_to_facebook(news_id: int, user_id: Optional[int], sync: FacebookSync) -> None:
+    """
+    Xoá/đăng bài Facebook của tin tức (chạy qua BackgroundTasks sau khi đã trả response).
+
+    Dùng session riêng vì session của request đã đóng khi background task chạy.
+    Lỗi Graph API đã được log trong _publish_to_facebook/_delete_from_facebook,
+    bài viết trên web không bị ảnh hưởng.
+    """
+    db = SessionLocal()
+    try:
+        post = db.scalar(_NEWS_BY_ID_STMT, {"news_id": news_id})
+        if post is None:
+            return
+        user = db.get(User, user_id) if user_id is not None else None
+
+        if sync.delete_existing:
+            _delete_from_facebook(db, post.id, user=user)
+            # Commit trước khi đăng: _publish_to_facebook rollback khi lỗi
+            db.commit()
+        # Bài có thể đã bị gỡ publish trong lúc chờ → không đăng nữa
+        if sync.publish and post.status == ContentStatus.PUBLISHED:
+            content_asset_public_ids = _get_post_content_asset_public_ids(db, post.id)
+            _publish_to_facebook(db, post, content_asset_public_ids, user=user)
+        db.commit()
+    except HTTPException:
+        db.rollback()
+    finally:
+        db.close()
+
+
+def create_news(
+    db: Session, payload: NewsCreate, user: Optional[User] = None
+) -> tuple[NewsOut, Optional[FacebookSync]]:
+    """
+    Tạo bài viết mới.
+
+    Returns:
+        (news, facebook_sync) - facebook_sync khác None thì caller chạy
+        sync_news_to_facebook sau khi trả response
+    """
     logger.info(
         "Creating new news post",
         extra={"action": "create_news", "title": payload.title, "status": payload.status.value}
@@ -622,15 +737,17 @@ def create_news(db: Session, payload: NewsCreate, user: Optional[User] = None) -
     )
     db.add(revision)
 
-    # Tự động đăng Facebook khi publish
+    # Tự động đăng Facebook khi publish (sau khi trả response)
     # LƯU Ý: 
     # - Chỉ đăng khi status = PUBLISHED VÀ publish_to_facebook = True
     # - DRAFT/ARCHIVED không đăng lên Facebook
     # - PUBLISHED nhưng publish_to_facebook = False → chỉ hiện trên web, không đăng Facebook
+    facebook_sync = None
     if payload.status == ContentStatus.PUBLISHED and payload.publish_to_facebook:
-        _publish_to_facebook(db, post, payload.content_asset_public_ids, user=user)
+        facebook_sync = FacebookSync(publish=True)
 
     db.commit()
+    public_cache.invalidate_news()
     db.refresh(post)
     
     logger.info(
@@ -638,11 +755,19 @@ def create_news(db: Session, payload: NewsCreate, user: Optional[User] = None) -
         extra={"post_id": post.id, "slug": post.slug, "status": post.status.value}
     )
     
-    return _to_news_out(db, post)
+    return _to_news_out(db, post), facebook_sync
 
 
-def update_news(db: Session, news_id: int, payload: NewsUpdate, user: Optional[User] = None) -> NewsOut:
-    """Cập nhật bài viết."""
+def update_news(
+    db: Session, news_id: int, payload: NewsUpdate, user: Optional[User] = None
+) -> tuple[NewsOut, Optional[FacebookSync]]:
+    """
+    Cập nhật bài viết.
+
+    Returns:
+        (news, facebook_sync) - facebook_sync khác None thì caller chạy
+        sync_news_to_facebook sau khi trả response
+    """
     logger.info("Updating news post", extra={"action": "update_news", "news_id": news_id})
     
     post = _get_news_or_404(db, news_id)
@@ -674,11 +799,9 @@ def update_news(db: Session, news_id: int, payload: NewsUpdate, user: Optional[U
         post.meta_description = payload.meta_description
 
     # Xử lý content_assets: xóa cũ, thêm mới
-    content_assets_changed = False
     if payload.content_asset_public_ids is not None:
         # Xóa tất cả post_assets cũ
         db.execute(delete(PostAsset).where(PostAsset.post_id == post.id))
-        content_assets_changed = True
         
         # Thêm mới theo thứ tự
         if payload.content_asset_public_ids:
@@ -698,6 +821,9 @@ def update_news(db: Session, news_id: int, payload: NewsUpdate, user: Optional[U
     # Nếu không set trong payload (None) → giữ nguyên trạng thái hiện tại
     # Nếu set → dùng giá trị đó
     publish_to_facebook = payload.publish_to_facebook
+    # Các thao tác Graph API gom lại, chạy sau khi commit và trả response
+    delete_on_facebook = False
+    publish_on_facebook = False
     
     if payload.status is not None:
         post.status = payload.status
@@ -714,15 +840,14 @@ def update_news(db: Session, news_id: int, payload: NewsUpdate, user: Optional[U
             # - Chỉ đăng khi publish_to_facebook = True (hoặc None - mặc định True)
             # - Nếu publish_to_facebook = False → chỉ publish trên web, không đăng Facebook
             if publish_to_facebook is None or publish_to_facebook:
-                content_asset_public_ids = _get_post_content_asset_public_ids(db, post.id)
-                _publish_to_facebook(db, post, content_asset_public_ids, user=user)
+                publish_on_facebook = True
         elif (
             previous_status == ContentStatus.PUBLISHED
             and payload.status != ContentStatus.PUBLISHED
         ):
             post.published_at = None
             # Xóa post trên Facebook khi unpublish
-            _delete_from_facebook(db, post.id, user=user)
+            delete_on_facebook = True
         elif (
             previous_status == ContentStatus.PUBLISHED
             and payload.status == ContentStatus.PUBLISHED
@@ -731,15 +856,14 @@ def update_news(db: Session, news_id: int, payload: NewsUpdate, user: Optional[U
             # Trường hợp: vẫn PUBLISHED nhưng thay đổi publish_to_facebook
             if not publish_to_facebook:
                 # Tắt đăng Facebook → xóa post trên Facebook (nếu có)
-                _delete_from_facebook(db, post.id, user=user)
+                delete_on_facebook = True
             else:
                 # Bật đăng Facebook → đăng lại (nếu chưa có thì đăng mới)
                 # Kiểm tra xem đã có trên Facebook chưa
                 fb_post_id = _get_facebook_post_id(db, post.id)
                 if not fb_post_id:
                     # Chưa có trên Facebook → đăng mới
-                    content_asset_public_ids = _get_post_content_asset_public_ids(db, post.id)
-                    _publish_to_facebook(db, post, content_asset_public_ids, user=user)
+                    publish_on_facebook = True
     
     # Nếu bài đã published và có thay đổi nội dung → xóa cũ và đăng lại
     # LƯU Ý: 
@@ -767,24 +891,12 @@ def update_news(db: Session, news_id: int, payload: NewsUpdate, user: Optional[U
         and previous_status == ContentStatus.PUBLISHED
         and has_content_changes
     ):
-        # Nếu publish_to_facebook = False → xóa post trên Facebook (nếu có)
-        if publish_to_facebook is False:
-            _delete_from_facebook(db, post.id, user=user)
-        else:
-            # publish_to_facebook = True hoặc None → xóa cũ và đăng lại với nội dung mới
-            # Xóa post cũ trên Facebook
-            _delete_from_facebook(db, post.id, user=user)
-            
-            # Đăng lại với nội dung mới
-            # Nếu content_assets đã thay đổi, đảm bảo đã flush trước khi lấy lại
-            if content_assets_changed:
-                db.flush()
-            
-            # Chỉ đăng Facebook nếu publish_to_facebook = True hoặc None (mặc định True)
-            # Nếu publish_to_facebook = None → coi như True (giữ nguyên behavior)
-            if publish_to_facebook is not False:
-                content_asset_public_ids = _get_post_content_asset_public_ids(db, post.id)
-                _publish_to_facebook(db, post, content_asset_public_ids, user=user)
+        # Xóa post cũ trên Facebook (nếu có)
+        delete_on_facebook = True
+        # publish_to_facebook = True hoặc None → đăng lại với nội dung mới
+        # Nếu publish_to_facebook = None → coi như True (giữ nguyên behavior)
+        if publish_to_facebook is not False:
+            publish_on_facebook = True
 
     post.updated_at = datetime.now(timezone.utc)
 
@@ -798,6 +910,7 @@ def update_news(db: Session, news_id: int, payload: NewsUpdate, user: Optional[U
     db.add(revision)
 
     db.commit()
+    public_cache.invalidate_news()
     db.refresh(post)
     
     logger.info(
@@ -805,7 +918,10 @@ def update_news(db: Session, news_id: int, payload: NewsUpdate, user: Optional[U
         extra={"post_id": post.id, "slug": post.slug, "status": post.status.value}
     )
     
-    return _to_news_out(db, post)
+    facebook_sync = None
+    if delete_on_facebook or publish_on_facebook:
+        facebook_sync = FacebookSync(delete_existing=delete_on_facebook, publish=publish_on_facebook)
+    return _to_news_out(db, post), facebook_sync
 
 
 def delete_news(db: Session, news_id: int, user: Optional[User] = None, delete_on_facebook: bool = False) -> None:
@@ -821,6 +937,7 @@ def delete_news(db: Session, news_id: int, user: Optional[User] = None, delete_o
     post.deleted_at = datetime.now(timezone.utc)
     db.add(post)
     db.commit()
+    public_cache.invalidate_news()
     
     logger.info("News post deleted successfully", extra={"post_id": post.id, "slug": post.slug})
 
@@ -6,18 +6,55 @@ Service xử lý upload assets (ảnh và video).
 """
 from __future__ import annotations
 
+import asyncio
 import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, UploadFile, status
-from sqlalchemy import func, select
+from sqlalchemy import any_, bindparam, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from PIL import Image
 
-from app.models.tables import Asset
-from app.schemas.asset import AssetListMeta, AssetListOut, AssetOut
+from app.models.tables import Asset, PostAsset
+from app.schemas.asset import (
+    AssetListMeta,
+    AssetListOut,
+    AssetOut,
+    PublicAssetOut,
+    PublicPostAssetOut,
+)
+from app.utils.pagination import fetch_page
+
+# Một tham số mảng duy nhất cho `= ANY(...)`, thay vì mỗi id một placeholder
+UUID_ARRAY = ARRAY(PG_UUID(as_uuid=True))
+
+# content_assets (public) của nhiều post trong một query, theo thứ tự position
+_PUBLIC_CONTENT_ASSETS_STMT = (
+    select(
+        PostAsset.post_id,
+        PostAsset.position,
+        PostAsset.caption,
+        Asset.public_id,
+        Asset.url,
+        Asset.mime_type,
+        Asset.byte_size,
+        Asset.width,
+        Asset.height,
+    )
+    .join(Asset, Asset.id == PostAsset.asset_id)
+    .where(
+        PostAsset.post_id.in_(bindparam("post_ids", expanding=True)),
+        Asset.deleted_at.is_(None),
+    )
+    .order_by(PostAsset.post_id, PostAsset.position)
+)
 
 # Cấu hình thư mục lưu trữ
 # Nếu có UPLOAD_DIR env thì dùng, không thì dùng relative path (cho local dev)
@@ -34,25 +71,87 @@ VIDEOS_DIR = UPLOAD_DIR / "videos"
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 VIDEOS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Ghi file theo chunk 1MB; tối đa UPLOAD_CONCURRENCY file được ghi cùng lúc
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "8"))
+_upload_slots = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+# sendfile giữa hai file thường (không phải socket) chỉ có trên Linux
+HAS_SENDFILE = sys.platform.startswith("linux")
 
-async def upload_asset(
-    db: Session,
-    file: UploadFile,
-    uploaded_by: Optional[int],
-) -> Asset:
+
+@dataclass(frozen=True)
+class StoredUpload:
+    """File đã lưu xuống storage, chưa có Asset record."""
+
+    object_key: str
+    mime_type: str
+    byte_size: int
+    width: Optional[int]
+    height: Optional[int]
+
+
+def _read_image_size(file_path: Path) -> tuple[Optional[int], Optional[int]]:
+    """Đọc kích thước ảnh (blocking I/O, chạy trong thread)."""
+    try:
+        with Image.open(file_path) as img:
+            return img.size
+    except Exception:
+        # Nếu không đọc được metadata, vẫn lưu file
+        return None, None
+
+
+def _sendfile_to_path(src_fd: int, file_path: Path, size: int) -> None:
+    """Copy `size` byte từ fd nguồn sang file_path bằng os.sendfile (blocking, chạy trong thread)."""
+    with open(file_path, "wb") as out:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(out.fileno(), src_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+
+async def _stream_to_file(file: UploadFile, file_path: Path, max_size: int) -> Optional[int]:
     """
-    Upload asset (ảnh hoặc video) và lưu vào thư mục phù hợp.
+    Copy upload xuống file theo từng chunk UPLOAD_CHUNK_SIZE.
+    
+    Nếu Starlette đã spool upload ra file tạm trên đĩa và biết size, copy
+    thẳng giữa hai fd trong kernel (os.sendfile), không đi qua bộ nhớ Python.
+    
+    Returns:
+        Số byte đã ghi, hoặc None nếu vượt max_size (file dở dang đã bị xoá)
+    """
+    spooled_to_disk = getattr(file.file, "_rolled", False)
+    if HAS_SENDFILE and spooled_to_disk and file.size is not None and file.size <= max_size:
+        await asyncio.to_thread(_sendfile_to_path, file.file.fileno(), file_path, file.size)
+        return file.size
+
+    file_size = 0
+    f = await asyncio.to_thread(open, file_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > max_size:
+                break
+            await asyncio.to_thread(f.write, chunk)
+    finally:
+        await asyncio.to_thread(f.close)
+
+    if file_size > max_size:
+        await asyncio.to_thread(file_path.unlink, missing_ok=True)
+        return None
+    return file_size
+
+
+async def store_upload(file: UploadFile) -> StoredUpload:
+    """
+    Validate và lưu file upload vào thư mục phù hợp, không đụng tới database.
     
     - Ảnh: lưu vào /uploads/images/YYYY/MM/
     - Video: lưu vào /uploads/videos/YYYY/MM/
     
-    Args:
-        db: Database session
-        file: File upload từ frontend
-        uploaded_by: ID user upload
-        
-    Returns:
-        Asset record đã tạo
+    Không dùng Session nên có thể chạy song song nhiều file (asyncio.gather).
+    File được ghi theo từng chunk nên bộ nhớ không phụ thuộc kích thước file.
     """
     # Validate file type
     mime_type = file.content_type or ""
@@ -65,72 +164,187 @@ async def upload_asset(
             detail={"code": "invalid_file_type", "message": "Chỉ chấp nhận file ảnh hoặc video."}
         )
     
-    # Đọc file content
-    file_content = await file.read()
-    file_size = len(file_content)
-    
     # Validate file size (tối đa 500MB cho video, 10MB cho ảnh)
     max_size = 500 * 1024 * 1024 if is_video else 10 * 1024 * 1024
-    if file_size > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "code": "file_too_large",
-                "message": f"File quá lớn. Tối đa {max_size // (1024*1024)}MB cho {'video' if is_video else 'ảnh'}."
-            }
-        )
+    file_too_large = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "code": "file_too_large",
+            "message": f"File quá lớn. Tối đa {max_size // (1024*1024)}MB cho {'video' if is_video else 'ảnh'}."
+        }
+    )
+    # Starlette biết size khi đã nhận xong body → từ chối sớm, khỏi copy
+    if file.size is not None and file.size > max_size:
+        raise file_too_large
     
     # Tạo tên file unique
     file_ext = Path(file.filename or "file").suffix
     file_name = f"{uuid4()}{file_ext}"
     
-    from datetime import datetime
     year_month = datetime.now().strftime("%Y/%m")
     
     if is_video:
         # Video: lưu vào videos/YYYY/MM/
         save_dir = VIDEOS_DIR / year_month
-        save_dir.mkdir(parents=True, exist_ok=True)
         object_key = f"videos/{year_month}/{file_name}"
     else:
         # Ảnh: lưu vào images/YYYY/MM/
         save_dir = IMAGES_DIR / year_month
-        save_dir.mkdir(parents=True, exist_ok=True)
         object_key = f"images/{year_month}/{file_name}"
+    # Mọi thao tác filesystem đều chạy trong thread, event loop chỉ điều phối
+    await asyncio.to_thread(save_dir.mkdir, parents=True, exist_ok=True)
     
-    # Lưu file
+    # Lưu file (giới hạn số upload ghi đồng thời trong process)
     file_path = save_dir / file_name
-    with open(file_path, "wb") as f:
-        f.write(file_content)
-    
-    # Get metadata (nếu là ảnh)
-    width, height = None, None
-    if is_image:
-        try:
-            with Image.open(file_path) as img:
-                width, height = img.size
-        except Exception:
-            # Nếu không đọc được metadata, vẫn lưu file
-            pass
-    
-    # Tạo Asset record
-    asset = Asset(
-        storage="local",
+    async with _upload_slots:
+        file_size = await _stream_to_file(file, file_path, max_size)
+        if file_size is None:
+            raise file_too_large
+        
+        # Get metadata (nếu là ảnh)
+        width, height = None, None
+        if is_image:
+            width, height = await asyncio.to_thread(_read_image_size, file_path)
+    
+    return StoredUpload(
         object_key=object_key,
-        url=f"/uploads/{object_key}",
         mime_type=mime_type,
         byte_size=file_size,
         width=width,
         height=height,
-        uploaded_by=uploaded_by,
     )
-    db.add(asset)
+
+
+def create_assets(
+    db: Session,
+    uploads: list[StoredUpload],
+    uploaded_by: Optional[int],
+) -> list[Asset]:
+    """
+    Tạo Asset records cho các file đã lưu bằng một câu INSERT (chưa commit).
+    
+    Returns:
+        Danh sách Asset theo đúng thứ tự của uploads
+    """
+    if not uploads:
+        return []
+
+    stmt = insert(Asset).returning(Asset, sort_by_parameter_order=True)
+    return list(
+        db.scalars(
+            stmt,
+            [
+                {
+                    "storage": "local",
+                    "object_key": upload.object_key,
+                    "url": f"/uploads/{upload.object_key}",
+                    "mime_type": upload.mime_type,
+                    "byte_size": upload.byte_size,
+                    "width": upload.width,
+                    "height": upload.height,
+                    "uploaded_by": uploaded_by,
+                }
+                for upload in uploads
+            ],
+        )
+    )
+
+
+async def upload_assets(
+    db: Session,
+    files: list[UploadFile],
+    uploaded_by: Optional[int],
+) -> list[Asset]:
+    """
+    Upload nhiều file: lưu file song song, sau đó insert Asset records một lần.
+    
+    Không commit: Asset được ghi cùng transaction với thao tác của caller
+    (vd. tạo album), nên lỗi phía sau không để lại Asset mồ côi.
+    
+    Returns:
+        Danh sách Asset theo đúng thứ tự của files
+    """
+    uploads = await asyncio.gather(*(store_upload(file) for file in files))
+    return create_assets(db, uploads, uploaded_by)
+
+
+async def upload_asset(
+    db: Session,
+    file: UploadFile,
+    uploaded_by: Optional[int],
+) -> Asset:
+    """
+    Upload asset (ảnh hoặc video) và lưu vào thư mục phù hợp.
+    
+    - Ảnh: lưu vào /uploads/images/YYYY/MM/
+    - Video: lưu vào /uploads/videos/YYYY/MM/
+    
+    Args:
+        db: Database session
+        file: File upload từ frontend
+        uploaded_by: ID user upload
+        
+    Returns:
+        Asset record đã tạo
+    """
+    (asset,) = await upload_assets(db, [file], uploaded_by)
     db.commit()
     db.refresh(asset)
-    
     return asset
 
 
+def fetch_ids_by_public_ids(db: Session, public_ids: list[UUID]) -> dict[UUID, int]:
+    """
+    Resolve public_id → id của assets chưa bị xoá bằng một query `= ANY(...)`.
+    
+    Chỉ lấy 2 cột (id, public_id) thay vì load cả Asset; public_id không tồn tại
+    sẽ không có trong kết quả.
+    """
+    if not public_ids:
+        return {}
+
+    rows = db.execute(
+        select(Asset.id, Asset.public_id).where(
+            Asset.public_id == any_(bindparam(None, list(public_ids), type_=UUID_ARRAY)),
+            Asset.deleted_at.is_(None),
+        )
+    ).all()
+    return {public_id: asset_id for asset_id, public_id in rows}
+
+
+
+async def load_public_content_assets(
+    db: AsyncSession, post_ids: list[int]
+) -> dict[int, list[PublicPostAssetOut]]:
+    """
+    Load content_assets (public) của nhiều post bằng một query PostAsset JOIN Asset.
+
+    Returns:
+        post_id → list PublicPostAssetOut theo position (list rỗng nếu không có)
+    """
+    content_assets: dict[int, list[PublicPostAssetOut]] = {post_id: [] for post_id in post_ids}
+    if not post_ids:
+        return content_assets
+
+    rows = await db.execute(_PUBLIC_CONTENT_ASSETS_STMT, {"post_ids": post_ids})
+    for post_id, position, caption, public_id, url, mime_type, byte_size, width, height in rows:
+        content_assets[post_id].append(
+            PublicPostAssetOut(
+                position=position,
+                caption=caption,
+                asset=PublicAssetOut(
+                    public_id=public_id,
+                    url=url or "",
+                    mime_type=mime_type,
+                    byte_size=byte_size,
+                    width=width,
+                    height=height,
+                ),
+            )
+        )
+    return content_assets
+
+
 def list_assets(
     db: Session,
     *,
@@ -167,15 +381,9 @@ def list_assets(
             | (Asset.object_key.ilike(search_term))
         )
     
-    # Count total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_items = db.scalar(count_stmt)
-    
-    # Pagination
-    offset = (page - 1) * page_size
-    stmt = stmt.order_by(Asset.created_at.desc()).offset(offset).limit(page_size)
-    
-    assets = db.scalars(stmt).all()
+    # Pagination (kèm tổng số dòng trong cùng query)
+    stmt = stmt.order_by(Asset.created_at.desc())
+    assets, total_items = fetch_page(db, stmt, page=page, page_size=page_size)
     
     # Convert to output
     items = [
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import os
+import time
 from datetime import datetime, timedelta, timezone
+from threading import Lock
 from typing import Dict, Optional, Tuple
 
 import requests
 from fastapi import HTTPException, Response, status
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
 from app.core.security import create_app_tokens, decode_refresh_token
@@ -19,9 +21,21 @@ GOOGLE_TOKENINFO_ACCESS_URL = "https://www.googleapis.com/oauth2/v1/tokeninfo"
 GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v3/userinfo"
 GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
 ALLOWED_GOOGLE_ACCOUNT = os.getenv("GOOGLE_ACCOUNT")
+# Parse allowlist một lần (lowercase); rỗng = cho phép mọi tài khoản
+_ALLOWED_GOOGLE_EMAILS = frozenset(
+    e.strip().lower() for e in (ALLOWED_GOOGLE_ACCOUNT or "").split(",") if e.strip()
+)
 ACCESS_COOKIE_NAME = "accessToken"
 REFRESH_COOKIE_NAME = "refreshToken"
 
+# Frontend poll /google/token-status vài giây một lần → cache hạn token theo email
+# (in-memory, theo process). is_valid vẫn tính lại theo giờ hiện tại mỗi lần gọi;
+# login_with_google ghi hạn mới thì xoá entry của email đó ngay.
+TOKEN_STATUS_TTL_SECONDS = 30.0
+_TOKEN_STATUS_MAX_ENTRIES = 10_000
+_token_status_cache: dict[str, tuple[float, Optional[datetime]]] = {}
+_token_status_lock = Lock()
+
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
@@ -232,7 +246,7 @@ def login_with_google(
 
     user = db.scalar(select(User).where(User.google_sub == sub))
     if not user:
-        user = db.scalar(select(User).where(User.email == email))
+        user = db.scalar(select(User).where(func.lower(User.email) == email.lower()))
 
     if not user:
         user = User(email=email, google_sub=sub)
@@ -264,12 +278,22 @@ def login_with_google(
     db.add(user)
     db.commit()
     db.refresh(user)
+    with _token_status_lock:
+        _token_status_cache.pop(user.email.lower(), None)
 
     return user, exp_dt, _is_token_valid(exp_dt)
 
 
 def token_status(db: Session, email: str) -> Tuple[Optional[datetime], bool]:
-    user = db.scalar(select(User).where(User.email == email))
+    key = email.lower()
+    now = time.monotonic()
+    with _token_status_lock:
+        cached = _token_status_cache.get(key)
+    if cached is not None and cached[0] > now:
+        exp_dt = cached[1]
+        return exp_dt, _is_token_valid(exp_dt)
+
+    user = db.scalar(select(User).where(func.lower(User.email) == key))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -277,6 +301,10 @@ def token_status(db: Session, email: str) -> Tuple[Optional[datetime], bool]:
         )
 
     exp_dt = user.google_id_token_expires_at
+    with _token_status_lock:
+        if len(_token_status_cache) >= _TOKEN_STATUS_MAX_ENTRIES:
+            _token_status_cache.clear()
+        _token_status_cache[key] = (now + TOKEN_STATUS_TTL_SECONDS, exp_dt)
     return exp_dt, _is_token_valid(exp_dt)
 
 
@@ -286,12 +314,9 @@ def is_allowed_google_account(email: str) -> bool:
     Supports comma-separated list; case-insensitive.
     If env not set, allow all.
     """
-    if not ALLOWED_GOOGLE_ACCOUNT:
-        return True
-    allowed = [e.strip().lower() for e in ALLOWED_GOOGLE_ACCOUNT.split(",") if e.strip()]
-    if not allowed:
+    if not _ALLOWED_GOOGLE_EMAILS:
         return True
-    return email.lower() in allowed
+    return email.lower() in _ALLOWED_GOOGLE_EMAILS
 
 
 def store_app_tokens(db: Session, user: User, tokens: Dict[str, object]) -> User:
@@ -307,23 +332,42 @@ def store_app_tokens(db: Session, user: User, tokens: Dict[str, object]) -> User
     return user
 
 
-def clear_app_tokens(db: Session, user: User) -> User:
+def logout_refresh_token(db: Session, refresh_token: str) -> Optional[str]:
     """
-    Clear stored app access/refresh tokens for logout.
+    Xoá access/refresh token đã lưu của user sở hữu refresh token (logout).
+
+    Một câu UPDATE ... RETURNING thay cho SELECT user + UPDATE + SELECT lại.
+
+    Returns:
+        Email của user, None nếu user không còn tồn tại
+
+    Raises:
+        HTTPException: Nếu refresh token không hợp lệ
     """
-    user.access_token = None
-    user.refresh_token = None
-    user.updated_at = _now()
-    db.add(user)
+    payload = decode_refresh_token(refresh_token)
+    user_id = payload.get("uid")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "code": "invalid_refresh_token",
+                "message": "Thiếu uid trong refresh token.",
+            },
+        )
+    email = db.scalar(
+        update(User)
+        .where(User.id == user_id)
+        .values(access_token=None, refresh_token=None, updated_at=_now())
+        .returning(User.email)
+    )
     db.commit()
-    db.refresh(user)
-    return user
+    return email
 
 
 def get_user_for_google(db: Session, email: Optional[str] = None) -> User:
     user = None
     if email:
-        user = db.scalar(select(User).where(User.email == email))
+        user = db.scalar(select(User).where(func.lower(User.email) == email.lower()))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -393,23 +437,3 @@ def refresh_app_tokens(db: Session, refresh_token: str) -> Tuple[User, Dict[str,
     tokens = issue_app_tokens(user)
     user = store_app_tokens(db, user, tokens)
     return user, tokens
-
-
-def get_user_from_refresh(db: Session, refresh_token: str) -> User:
-    payload = decode_refresh_token(refresh_token)
-    user_id = payload.get("uid")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "code": "invalid_refresh_token",
-                "message": "Thiếu uid trong refresh token.",
-            },
-        )
-    user = db.scalar(select(User).where(User.id == user_id))
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "user_not_found", "message": "User không tồn tại."},
-        )
-    return user
@@ -12,16 +12,21 @@ from __future__ import annotations
 import logging
 import os
 import json
+import re
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from app.models.tables import Asset, Post
 
 logger = logging.getLogger(__name__)
 
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 # Facebook API configuration
 FB_PAGE_ID = os.getenv("FB_PAGE_ID")
 FB_ACCESS_TOKEN = os.getenv("FB_ACCESS_TOKEN")
@@ -30,6 +35,15 @@ FB_APP_SECRET = os.getenv("FB_APP_SECRET")
 FB_API_VERSION = os.getenv("FB_API_VERSION", "v19.0")
 APP_BASE_URL = os.getenv("APP_BASE_URL", "https://your-site.com")
 
+# Session dùng chung cho mọi request tới Graph API: giữ kết nối keep-alive
+# (không bắt tay TCP/TLS lại mỗi lần gọi, vd. exchange token → lấy Page token
+# trong link_facebook_page). Pool connection của requests an toàn giữa các thread
+# của threadpool; pool_maxsize theo số worker mặc định của anyio (40).
+_graph_session = requests.Session()
+_graph_session.mount(
+    "https://", HTTPAdapter(pool_connections=4, pool_maxsize=40)
+)
+
 
 def _format_facebook_message(
     post: Post,
@@ -52,15 +66,13 @@ def _format_facebook_message(
     Returns:
         Formatted message string
     """
-    import re
-    
     # Chỉ dùng content_html (strip HTML tags)
     message = ""
     if post.content_html and post.content_html.strip():
         # Strip HTML tags
-        text_content = re.sub(r'<[^>]+>', '', post.content_html)
+        text_content = _HTML_TAG_RE.sub('', post.content_html)
         # Clean up whitespace (nhiều space → 1 space, newlines → space)
-        text_content = re.sub(r'\s+', ' ', text_content).strip()
+        text_content = _WHITESPACE_RE.sub(' ', text_content).strip()
         
         if text_content:
             message = text_content
@@ -113,7 +125,7 @@ def check_facebook_permissions(access_token: Optional[str] = None) -> dict:
         url = f"https://graph.facebook.com/{FB_API_VERSION}/me"
         params = {"access_token": token, "fields": "id,name"}
         
-        response = requests.get(url, params=params, timeout=10)
+        response = _graph_session.get(url, params=params, timeout=10)
         
         if response.status_code != 200:
             error_data = response.json().get("error", {})
@@ -129,7 +141,7 @@ def check_facebook_permissions(access_token: Optional[str] = None) -> dict:
         # Với User Access Token: /me/permissions trả về danh sách permissions
         required_permissions = ["pages_manage_posts", "pages_read_engagement"]
         perm_url = f"https://graph.facebook.com/{FB_API_VERSION}/me/permissions"
-        perm_response = requests.get(perm_url, params={"access_token": token}, timeout=10)
+        perm_response = _graph_session.get(perm_url, params={"access_token": token}, timeout=10)
         
         if perm_response.status_code != 200:
             # Nếu không check được permissions nhưng token hợp lệ → có thể là Page token
@@ -315,7 +327,7 @@ def upload_video_to_facebook(
                 'title': title,
             }
             
-            response = requests.post(
+            response = _graph_session.post(
                 f"https://graph-video.facebook.com/{FB_API_VERSION}/{fb_page_id}/videos",
                 files=files,
                 data=data,
@@ -510,7 +522,7 @@ def upload_images_to_facebook(
                         "access_token": fb_token,
                         "published": False,
                     }
-                    photo_response = requests.post(
+                    photo_response = _graph_session.post(
                         f"https://graph.facebook.com/{FB_API_VERSION}/{fb_page_id}/photos",
                         files=files,
                         data=data,
@@ -538,7 +550,7 @@ def upload_images_to_facebook(
                     logger.warning(f"Skipping localhost image {image_url} (file not found: {image_path})")
                     continue
                 
-                photo_response = requests.post(
+                photo_response = _graph_session.post(
                     f"https://graph.facebook.com/{FB_API_VERSION}/{fb_page_id}/photos",
                     params={
                         "access_token": fb_token,
@@ -632,7 +644,7 @@ def upload_images_to_facebook(
     
     logger.info("Publishing post to Facebook", extra=log_context)
     
-    response = requests.post(
+    response = _graph_session.post(
         f"https://graph.facebook.com/{FB_API_VERSION}/{fb_page_id}/feed",
         params=params,
         timeout=30,
@@ -715,7 +727,7 @@ def delete_facebook_post(
     
     try:
         # Facebook API: DELETE /{post-id}
-        response = requests.delete(
+        response = _graph_session.delete(
             f"https://graph.facebook.com/{FB_API_VERSION}/{fb_post_id}",
             params={
                 "access_token": fb_token,
@@ -806,7 +818,7 @@ def exchange_long_lived_token(short_lived_token: str) -> dict:
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = _graph_session.get(url, params=params, timeout=10)
         
         if response.status_code != 200:
             error_data = response.json().get("error", {})
@@ -885,7 +897,7 @@ def get_page_token_from_user_token(user_access_token: str) -> dict:
     log_context = {"action": "get_page_token"}
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = _graph_session.get(url, params=params, timeout=10)
         
         if response.status_code != 200:
             error_data = response.json().get("error", {})
@@ -1040,8 +1052,6 @@ def refresh_facebook_page_token(db, user) -> tuple[str, str]:
     Raises:
         ValueError: Nếu không thể refresh
     """
-    from sqlalchemy.orm import Session
-    
     now = datetime.now(timezone.utc)
     
     # Check Page Token còn hạn không?
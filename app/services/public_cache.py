@@ -0,0 +1,87 @@
+"""
+Cache kết quả các list public (in-memory, theo process).
+
+Trang đầu của list tin tức/thông báo/album/media được gọi liên tục nhưng chỉ đổi
+khi admin sửa nội dung → giữ kết quả PUBLIC_LIST_TTL_SECONDS giây. Admin tạo/sửa/
+xoá trong process này (kể cả sửa Asset/Block qua ORM) xoá cache tương ứng ngay;
+worker khác thấy thay đổi chậm nhất sau TTL.
+"""
+from __future__ import annotations
+
+from itertools import chain
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+
+from app.models.tables import Asset, Block
+from app.schemas.album import PublicAlbumListOut
+from app.schemas.announcement import PublicAnnouncementListOut
+from app.schemas.asset import PublicAssetListOut
+from app.schemas.news import PublicNewsListOut
+from app.utils.ttl_cache import TTLCache
+
+PUBLIC_LIST_TTL_SECONDS = 30.0
+
+news_lists: TTLCache[tuple, PublicNewsListOut] = TTLCache(PUBLIC_LIST_TTL_SECONDS)
+announcement_lists: TTLCache[tuple, PublicAnnouncementListOut] = TTLCache(PUBLIC_LIST_TTL_SECONDS)
+album_lists: TTLCache[tuple, PublicAlbumListOut] = TTLCache(PUBLIC_LIST_TTL_SECONDS)
+# Media public lấy từ item/video của album published → đổi theo album
+asset_lists: TTLCache[tuple, PublicAssetListOut] = TTLCache(PUBLIC_LIST_TTL_SECONDS)
+
+
+def invalidate_news() -> None:
+    news_lists.clear()
+
+
+def invalidate_announcements() -> None:
+    announcement_lists.clear()
+
+
+def invalidate_albums() -> None:
+    album_lists.clear()
+    asset_lists.clear()
+
+
+def invalidate_assets() -> None:
+    # Asset nằm trong media/cover/item album và content_assets của bài viết
+    invalidate_albums()
+    invalidate_news()
+    invalidate_announcements()
+
+
+# Asset (soft-delete) và Block (is_active) không đi qua service admin gọi
+# invalidate_* → bắt mọi thay đổi qua ORM và xoá cache khi transaction commit
+_INVALIDATORS = {Asset: invalidate_assets, Block: invalidate_announcements}
+_PENDING_KEY = "public_cache_invalidators"
+
+
+def _mark_pending(session: Session, model: type) -> None:
+    session.info.setdefault(_PENDING_KEY, set()).add(_INVALIDATORS[model])
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_changes(session: Session, flush_context: UOWTransaction) -> None:
+    for obj in chain(session.dirty, session.deleted):
+        model = type(obj)
+        if model in _INVALIDATORS and (obj in session.deleted or session.is_modified(obj)):
+            _mark_pending(session, model)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_changes(orm_execute_state: ORMExecuteState) -> None:
+    # update(Asset)/delete(Block)... chạy thẳng qua session.execute, không qua flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in _INVALIDATORS:
+            _mark_pending(orm_execute_state.session, mapper.class_)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for invalidate in session.info.pop(_PENDING_KEY, ()):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
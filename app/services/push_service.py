@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
 import os
+import time
 from typing import Optional
+from urllib.parse import urlparse
 
-from pywebpush import WebPushException, webpush
-from sqlalchemy import select
+import aiohttp
+from py_vapid import Vapid
+from pywebpush import WebPusher
+from sqlalchemy import Row, delete, func, select
 from sqlalchemy.orm import Session
 
+from app.core.database import AsyncSessionLocal
 from app.models import Post, PushSubscription
 from app.models.enums import ContentStatus, PostType
 
+logger = logging.getLogger(__name__)
+
+# Số push gửi đồng thời (cũng là số connection tối đa của client)
+PUSH_CONCURRENCY = 100
+PUSH_TIMEOUT_SECONDS = 10
+PUSH_TTL_SECONDS = 3600
+
 
 class PushError(Exception):
     pass
@@ -22,61 +37,129 @@ def _get_frontend_url() -> str:
     return os.getenv("FRONTEND_PUBLIC_URL", "http://localhost:3000")
 
 
-def send_push_for_announcement(db: Session, *, slug: str) -> dict:
-    """
-    Gửi Web Push cho tất cả subscription dựa trên thông báo (announcement) theo slug.
-    """
+def _audience(endpoint: str) -> str:
+    """Origin của push service (claim `aud` của VAPID JWT)."""
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+def _load_vapid() -> Vapid:
     vapid_public = os.getenv("VAPID_PUBLIC_KEY")
     vapid_private = os.getenv("VAPID_PRIVATE_KEY")
     if not vapid_public or not vapid_private:
         raise PushError("VAPID keys are not configured")
+    return Vapid.from_string(private_key=vapid_private)
+
+
+def count_subscriptions(db: Session) -> int:
+    return db.scalar(select(func.count()).select_from(PushSubscription)) or 0
+
+
+def get_announcement_push_payload(db: Session, *, slug: str) -> dict:
+    """
+    Dựng nội dung Web Push cho thông báo (announcement) đã publish theo slug.
+
+    Raises:
+        PushError: Chưa cấu hình VAPID hoặc không có thông báo đã publish
+    """
+    _load_vapid()
 
     announcement = db.scalar(
         select(Post).where(
             Post.slug == slug,
-            Post.type == PostType.ANNOUNCEMENT,
+            Post.post_type == PostType.ANNOUNCEMENT,
             Post.status == ContentStatus.PUBLISHED,
         )
     )
     if not announcement:
         raise PushError("Announcement not found or not published")
 
-    target_url = f"{_get_frontend_url().rstrip('/')}/notice/{announcement.slug}"
-    title = announcement.title or "Thông báo mới"
-    body = announcement.excerpt or "Có thông báo mới từ Trúc Xinh"
+    return {
+        "title": announcement.title or "Thông báo mới",
+        "body": announcement.excerpt or "Có thông báo mới từ Trúc Xinh",
+        "url": f"{_get_frontend_url().rstrip('/')}/notice/{announcement.slug}",
+        "tag": f"announcement-{announcement.public_id}",
+    }
 
-    subs = db.scalars(select(PushSubscription)).all()
+
+async def _send_one(
+    session: aiohttp.ClientSession,
+    sub: Row,
+    data: str,
+    vapid_headers: dict[str, str],
+) -> Optional[int]:
+    """Gửi một push; trả về HTTP status (None nếu lỗi mạng/mã hoá)."""
+    try:
+        pusher = WebPusher(
+            {"endpoint": sub.endpoint, "keys": {"p256dh": sub.p256dh, "auth": sub.auth}},
+            aiohttp_session=session,
+        )
+        response = await pusher.send_async(
+            data,
+            dict(vapid_headers),
+            ttl=PUSH_TTL_SECONDS,
+            timeout=aiohttp.ClientTimeout(total=PUSH_TIMEOUT_SECONDS),
+        )
+        return response.status
+    except Exception:
+        logger.warning("Web push failed", extra={"subscription_id": sub.id}, exc_info=True)
+        return None
+
+
+async def send_push_to_all(payload: dict) -> dict:
+    """
+    Gửi Web Push cho tất cả subscription (chạy qua BackgroundTasks).
+
+    Gửi song song tối đa PUSH_CONCURRENCY request trên một aiohttp session
+    (giữ kết nối tới push service); subscription hết hạn (404/410) bị xoá.
+    """
+    vapid = _load_vapid()
+    subject = os.getenv("VAPID_SUBJECT", "mailto:admin@localhost")
+    data = json.dumps(payload, ensure_ascii=False)
+
+    # Không giữ connection DB trong lúc gửi HTTP
+    async with AsyncSessionLocal() as db:
+        subs = (
+            await db.execute(
+                select(
+                    PushSubscription.id,
+                    PushSubscription.endpoint,
+                    PushSubscription.p256dh,
+                    PushSubscription.auth,
+                )
+            )
+        ).all()
     if not subs:
         return {"sent": 0, "failed": 0, "removed": 0}
 
-    sent = failed = removed = 0
-    for sub in subs:
-        payload = {
-            "title": title,
-            "body": body,
-            "url": target_url,
-            "tag": f"announcement-{announcement.public_id}",
-        }
-        try:
-            webpush(
-                subscription_info={
-                    "endpoint": sub.endpoint,
-                    "keys": {"p256dh": sub.p256dh, "auth": sub.auth},
-                },
-                data=str(payload),
-                vapid_private_key=vapid_private,
-                vapid_public_key=vapid_public,
-                ttl=3600,
+    # VAPID JWT chỉ phụ thuộc origin của push service → ký một lần mỗi origin
+    # (hạn 12 giờ như pywebpush.webpush; push service từ chối exp quá 24 giờ)
+    exp = int(time.time()) + 12 * 60 * 60
+    vapid_headers = {
+        aud: vapid.sign({"sub": subject, "aud": aud, "exp": exp})
+        for aud in {_audience(sub.endpoint) for sub in subs}
+    }
+
+    statuses: list[Optional[int]] = []
+    connector = aiohttp.TCPConnector(limit=PUSH_CONCURRENCY)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for start in range(0, len(subs), PUSH_CONCURRENCY):
+            chunk = subs[start:start + PUSH_CONCURRENCY]
+            statuses += await asyncio.gather(
+                *(
+                    _send_one(session, sub, data, vapid_headers[_audience(sub.endpoint)])
+                    for sub in chunk
+                )
             )
-            sent += 1
-        except WebPushException as exc:
-            failed += 1
-            status = getattr(exc.response, "status_code", None)
-            if status in (404, 410):
-                # subscription invalid, remove
-                db.delete(sub)
-                removed += 1
-        except Exception:
-            failed += 1
-    db.commit()
-    return {"sent": sent, "failed": failed, "removed": removed}
+
+    # Subscription không còn hợp lệ → xoá
+    stale_ids = [sub.id for sub, code in zip(subs, statuses) if code in (404, 410)]
+    if stale_ids:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(PushSubscription).where(PushSubscription.id.in_(stale_ids)))
+            await db.commit()
+
+    sent = sum(1 for code in statuses if code is not None and code <= 202)
+    result = {"sent": sent, "failed": len(statuses) - sent, "removed": len(stale_ids)}
+    logger.info("Web push fan-out finished", extra={**result, "tag": payload["tag"]})
+    return result
@@ -6,7 +6,7 @@ from __future__ import annotations
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.orm import Session
 
 from app.models.enums import ContentStatus
@@ -19,6 +19,8 @@ from app.schemas.album import (
     PublicAlbumVideoOut,
 )
 from app.schemas.asset import PublicAssetOut
+from app.services import public_cache
+from app.utils.pagination import fetch_page_lambda
 
 
 def _to_public_album_out(db: Session, album: Album) -> PublicAlbumOut:
@@ -70,14 +72,7 @@ def _to_public_album_out(db: Session, album: Album) -> PublicAlbumOut:
                 PublicAlbumItemOut(
                     position=item.position,
                     caption=item.caption,
-                    asset=PublicAssetOut(
-                        public_id=asset.public_id,
-                        url=asset.url or "",
-                        mime_type=asset.mime_type,
-                        byte_size=asset.byte_size,
-                        width=asset.width,
-                        height=asset.height,
-                    ),
+                    asset=PublicAssetOut.model_validate(asset),
                 )
             )
     
@@ -109,14 +104,7 @@ def _to_public_album_out(db: Session, album: Album) -> PublicAlbumOut:
             )
         )
         if cover_asset:
-            cover = PublicAssetOut(
-                public_id=cover_asset.public_id,
-                url=cover_asset.url or "",
-                mime_type=cover_asset.mime_type,
-                byte_size=cover_asset.byte_size,
-                width=cover_asset.width,
-                height=cover_asset.height,
-            )
+            cover = PublicAssetOut.model_validate(cover_asset)
     
     return PublicAlbumOut(
         public_id=album.public_id,
@@ -141,38 +129,38 @@ def list_albums(
     page_size: int = 20,
     q: Optional[str] = None,
 ) -> PublicAlbumListOut:
-    """Lấy danh sách albums công khai (chỉ published)."""
+    """Lấy danh sách albums công khai (chỉ published); kết quả được cache ngắn (public_cache)."""
+    cache_key = (page, page_size, q or "")
+    cached = public_cache.album_lists.get(cache_key)
+    if cached is not None:
+        return cached
+
     # Base query - chỉ lấy published
-    stmt = select(Album).where(
+    stmt = lambda_stmt(lambda: select(Album).where(
         Album.deleted_at.is_(None),
         Album.status == ContentStatus.PUBLISHED,
-    )
+    ))
     
     # Search
     if q:
         search_term = f"%{q}%"
-        stmt = stmt.where(
+        stmt += lambda s: s.where(
             (Album.title.ilike(search_term))
             | (Album.slug.ilike(search_term))
             | (Album.description.ilike(search_term))
         )
     
-    # Count total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_items = db.scalar(count_stmt)
-    
     # Pagination
-    offset = (page - 1) * page_size
-    stmt = stmt.order_by(Album.created_at.desc()).offset(offset).limit(page_size)
-    
-    albums = db.scalars(stmt).all()
+    stmt += lambda s: s.order_by(Album.created_at.desc())
+    rows, total_items = fetch_page_lambda(db, stmt, page=page, page_size=page_size)
+    albums = [album for (album,) in rows]
     
     # Convert to output
     items = [_to_public_album_out(db, album) for album in albums]
     
     total_pages = (total_items + page_size - 1) // page_size if total_items > 0 else 0
     
-    return PublicAlbumListOut(
+    result = PublicAlbumListOut(
         items=items,
         meta=AlbumListMeta(
             page=page,
@@ -181,6 +169,8 @@ def list_albums(
             total_pages=total_pages,
         ),
     )
+    public_cache.album_lists.set(cache_key, result)
+    return result
 
 
 def get_album_by_slug(db: Session, slug: str) -> PublicAlbumOut:
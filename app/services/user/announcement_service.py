@@ -4,71 +4,37 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.enums import ContentStatus, PostType
-from app.models.tables import Asset, Block, Post, PostAsset
+from app.models.tables import Block, Post
 from app.schemas.announcement import (
     AnnouncementListMeta,
     PublicAnnouncementListOut,
     PublicAnnouncementOut,
 )
-from app.schemas.asset import PublicAssetOut, PublicPostAssetOut
+from app.schemas.asset import PublicPostAssetOut
+from app.services import asset_service, public_cache
+from app.utils.pagination import fetch_page_lambda_async
+
+# Thông báo public luôn JOIN khối (đang active); code/name của khối lấy luôn
+# trong cùng query thay vì SELECT Block riêng cho từng thông báo
+_PUBLIC_ANNOUNCEMENT_FILTERS = (
+    Post.post_type == PostType.ANNOUNCEMENT,
+    Post.status == ContentStatus.PUBLISHED,
+    Post.deleted_at.is_(None),
+    Block.is_active.is_(True),
+)
 
 
-def _to_public_announcement_out(db: Session, post: Post) -> PublicAnnouncementOut:
+def _to_public_announcement_out(
+    post: Post,
+    block_code: str,
+    block_name: str,
+    content_assets: list[PublicPostAssetOut],
+) -> PublicAnnouncementOut:
     """Convert Post → PublicAnnouncementOut, chỉ trả về public_id, không có id và status."""
-    # Load block info
-    block = None
-    if post.block_id:
-        block = db.scalar(select(Block).where(Block.id == post.block_id))
-    
-    if not block:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"code": "missing_block", "message": "Thông báo không có khối."},
-        )
-    
-    # Load content_assets với join để tránh N+1 query
-    post_assets = db.scalars(
-        select(PostAsset)
-        .where(PostAsset.post_id == post.id)
-        .order_by(PostAsset.position)
-    ).all()
-    
-    if not post_assets:
-        content_assets = []
-    else:
-        # Query tất cả assets một lần để tránh N+1
-        asset_ids = [pa.asset_id for pa in post_assets]
-        assets = {
-            asset.id: asset
-            for asset in db.scalars(
-                select(Asset).where(
-                    Asset.id.in_(asset_ids),
-                    Asset.deleted_at.is_(None),
-                )
-            ).all()
-        }
-        
-        content_assets = [
-            PublicPostAssetOut(
-                position=pa.position,
-                caption=pa.caption,
-                asset=PublicAssetOut(
-                    public_id=asset.public_id,
-                    url=asset.url or "",
-                    mime_type=asset.mime_type,
-                    byte_size=asset.byte_size,
-                    width=asset.width,
-                    height=asset.height,
-                ),
-            )
-            for pa in post_assets
-            if (asset := assets.get(pa.asset_id))
-        ]
-    
     return PublicAnnouncementOut(
         public_id=post.public_id,
         title=post.title,
@@ -78,16 +44,16 @@ def _to_public_announcement_out(db: Session, post: Post) -> PublicAnnouncementOu
         meta_title=post.meta_title,
         meta_description=post.meta_description,
         content_assets=content_assets if content_assets else None,
-        block_code=block.code,
-        block_name=block.name,
+        block_code=block_code,
+        block_name=block_name,
         published_at=post.published_at,
         created_at=post.created_at,
         updated_at=post.updated_at,
     )
 
 
-def list_announcements(
-    db: Session,
+async def list_announcements(
+    db: AsyncSession,
     *,
     page: int,
     page_size: int,
@@ -95,48 +61,33 @@ def list_announcements(
 ) -> PublicAnnouncementListOut:
     """
     List thông báo công khai - chỉ trả về published posts.
-    Có thể filter theo grade (block code).
+    Có thể filter theo grade (block code); kết quả được cache ngắn (public_cache).
     """
-    base_stmt = (
-        select(Post)
-        .join(Block, Post.block_id == Block.id)
-        .where(
-            Post.post_type == PostType.ANNOUNCEMENT,
-            Post.status == ContentStatus.PUBLISHED,
-            Post.deleted_at.is_(None),
-            Block.is_active.is_(True),
-        )
-    )
-    count_stmt = (
-        select(func.count(Post.id))
-        .join(Block, Post.block_id == Block.id)
-        .where(
-            Post.post_type == PostType.ANNOUNCEMENT,
-            Post.status == ContentStatus.PUBLISHED,
-            Post.deleted_at.is_(None),
-            Block.is_active.is_(True),
-        )
-    )
+    cache_key = (page, page_size, grade or "")
+    cached = public_cache.announcement_lists.get(cache_key)
+    if cached is not None:
+        return cached
 
+    stmt = lambda_stmt(lambda: (
+        select(Post, Block.code, Block.name)
+        .join(Block, Post.block_id == Block.id)
+        .where(*_PUBLIC_ANNOUNCEMENT_FILTERS)
+    ))
     if grade:
-        base_stmt = base_stmt.where(Block.code == grade)
-        count_stmt = count_stmt.where(Block.code == grade)
+        stmt += lambda s: s.where(Block.code == grade)
 
     # Sắp xếp theo published_at (mới nhất trước)
-    base_stmt = base_stmt.order_by(
-        Post.published_at.desc().nullslast(), Post.created_at.desc()
-    )
-
-    total_items = db.scalar(count_stmt) or 0
+    stmt += lambda s: s.order_by(Post.published_at.desc().nullslast(), Post.created_at.desc())
+    rows, total_items = await fetch_page_lambda_async(db, stmt, page=page, page_size=page_size)
     total_pages = (total_items + page_size - 1) // page_size if total_items else 0
 
-    rows = db.scalars(
-        base_stmt.offset((page - 1) * page_size).limit(page_size)
-    ).all()
-
+    # content_assets của cả trang trong một query (không N+1)
+    content_assets = await asset_service.load_public_content_assets(
+        db, [post.id for post, _, _ in rows]
+    )
     items = [
-        _to_public_announcement_out(db, row)
-        for row in rows
+        _to_public_announcement_out(post, block_code, block_name, content_assets[post.id])
+        for post, block_code, block_name in rows
     ]
 
     meta = AnnouncementListMeta(
@@ -145,45 +96,31 @@ def list_announcements(
         total_items=total_items,
         total_pages=total_pages,
     )
-    return PublicAnnouncementListOut(items=items, meta=meta)
+    result = PublicAnnouncementListOut(items=items, meta=meta)
+    public_cache.announcement_lists.set(cache_key, result)
+    return result
 
 
-def get_announcement_by_slug_or_id(
-    db: Session, slug_or_id: str
+async def get_announcement_by_slug_or_id(
+    db: AsyncSession, slug_or_id: str
 ) -> PublicAnnouncementOut:
     """
     Lấy chi tiết thông báo công khai theo slug hoặc public_id - chỉ trả về published posts.
     """
     # Thử parse như UUID trước
     try:
-        public_id = UUID(slug_or_id)
-        stmt = (
-            select(Post)
-            .join(Block, Post.block_id == Block.id)
-            .where(
-                Post.post_type == PostType.ANNOUNCEMENT,
-                Post.status == ContentStatus.PUBLISHED,
-                Post.public_id == public_id,
-                Post.deleted_at.is_(None),
-                Block.is_active.is_(True),
-            )
-        )
+        lookup = Post.public_id == UUID(slug_or_id)
     except ValueError:
         # Không phải UUID, coi như slug
-        stmt = (
-            select(Post)
-            .join(Block, Post.block_id == Block.id)
-            .where(
-                Post.post_type == PostType.ANNOUNCEMENT,
-                Post.status == ContentStatus.PUBLISHED,
-                Post.slug == slug_or_id,
-                Post.deleted_at.is_(None),
-                Block.is_active.is_(True),
-            )
-        )
+        lookup = Post.slug == slug_or_id
 
-    post = db.scalar(stmt)
-    if not post:
+    stmt = (
+        select(Post, Block.code, Block.name)
+        .join(Block, Post.block_id == Block.id)
+        .where(*_PUBLIC_ANNOUNCEMENT_FILTERS, lookup)
+    )
+    row = (await db.execute(stmt)).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
@@ -191,5 +128,6 @@ def get_announcement_by_slug_or_id(
                 "message": "Thông báo không tồn tại hoặc chưa được xuất bản.",
             },
         )
-    return _to_public_announcement_out(db, post)
-
+    post, block_code, block_name = row
+    content_assets = await asset_service.load_public_content_assets(db, [post.id])
+    return _to_public_announcement_out(post, block_code, block_name, content_assets[post.id])
@@ -6,149 +6,78 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import func, select, distinct
+from pydantic import TypeAdapter
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
-from app.models.enums import ContentStatus
+from app.models.enums import ContentStatus, EmbedProvider
 from app.models.tables import Album, AlbumItem, AlbumVideo, Asset, VideoEmbed
 from app.schemas.asset import AssetListMeta, PublicAssetListOut, PublicAssetOut
+from app.services import public_cache
+from app.utils.pagination import fetch_page
 
+IMAGE_MIME_PREFIX = "image/"
+VIDEO_MIME_PREFIX = "video/"
+MEDIA_MIME_PREFIXES = (IMAGE_MIME_PREFIX, VIDEO_MIME_PREFIX)
 
-def list_images_from_albums(
-    db: Session,
-    *,
-    page: int = 1,
-    page_size: int = 20,
-    q: Optional[str] = None,
-) -> PublicAssetListOut:
-    """
-    Lấy danh sách ảnh từ các album published.
-    Chỉ lấy những ảnh được upload trong album (không lấy cover).
-    """
-    # Query để lấy asset_ids từ AlbumItem của các album published
-    subquery = (
-        select(AlbumItem.asset_id)
-        .join(Album, AlbumItem.album_id == Album.id)
-        .where(
-            Album.deleted_at.is_(None),
-            Album.status == ContentStatus.PUBLISHED,
-        )
-        .distinct()
-    )
-    
-    # Base query cho assets
-    stmt = (
-        select(Asset)
-        .where(
-            Asset.deleted_at.is_(None),
-            Asset.id.in_(subquery),
-            Asset.mime_type.startswith("image/"),
-        )
-    )
-    
-    # Search
-    if q:
-        search_term = f"%{q}%"
-        stmt = stmt.where(
-            (Asset.url.ilike(search_term))
-            | (Asset.object_key.ilike(search_term))
-        )
-    
-    # Count total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_items = db.scalar(count_stmt)
-    
-    # Pagination
-    offset = (page - 1) * page_size
-    stmt = stmt.order_by(Asset.created_at.desc()).offset(offset).limit(page_size)
-    
-    assets = db.scalars(stmt).all()
-    
-    # Convert to output
-    items = [
-        PublicAssetOut(
-            public_id=asset.public_id,
-            url=asset.url or "",
-            mime_type=asset.mime_type,
-            byte_size=asset.byte_size,
-            width=asset.width,
-            height=asset.height,
-        )
-        for asset in assets
-    ]
-    
-    total_pages = (total_items + page_size - 1) // page_size if total_items > 0 else 0
-    
-    return PublicAssetListOut(
-        items=items,
-        meta=AssetListMeta(
-            page=page,
-            page_size=page_size,
-            total_items=total_items,
-            total_pages=total_pages,
-        ),
-    )
+# Validate cả trang Asset (from_attributes) trong một lần gọi pydantic-core
+_ASSET_LIST_ADAPTER = TypeAdapter(list[PublicAssetOut])
 
+_PUBLISHED_ALBUM = (
+    Album.deleted_at.is_(None),
+    Album.status == ContentStatus.PUBLISHED,
+)
 
-def list_videos_from_albums(
+# Ảnh: asset nằm trong album_items của album published (không lấy cover)
+_ALBUM_IMAGES = Asset.mime_type.startswith(IMAGE_MIME_PREFIX) & Asset.id.in_(
+    select(AlbumItem.asset_id)
+    .join(Album, AlbumItem.album_id == Album.id)
+    .where(*_PUBLISHED_ALBUM)
+)
+
+# Video: chỉ local video (VideoEmbed provider=LOCAL trỏ tới Asset qua url),
+# không lấy external video (YouTube, Facebook)
+_ALBUM_LOCAL_VIDEOS = Asset.mime_type.startswith(VIDEO_MIME_PREFIX) & Asset.url.in_(
+    select(VideoEmbed.url)
+    .join(AlbumVideo, AlbumVideo.video_id == VideoEmbed.id)
+    .join(Album, AlbumVideo.album_id == Album.id)
+    .where(*_PUBLISHED_ALBUM, VideoEmbed.provider == EmbedProvider.LOCAL)
+)
+
+# mime_prefix → điều kiện nguồn; None = cả ảnh lẫn video
+_MEDIA_SOURCES = {
+    IMAGE_MIME_PREFIX: (_ALBUM_IMAGES,),
+    VIDEO_MIME_PREFIX: (_ALBUM_LOCAL_VIDEOS,),
+    None: (_ALBUM_IMAGES, _ALBUM_LOCAL_VIDEOS),
+}
+
+
+def list_assets_from_albums(
     db: Session,
     *,
     page: int = 1,
     page_size: int = 20,
     q: Optional[str] = None,
+    mime_prefix: Optional[str] = None,
 ) -> PublicAssetListOut:
     """
-    Lấy danh sách videos từ các album published.
-    Chỉ lấy local videos (từ Asset), không lấy external videos (YouTube, Facebook).
+    Lấy danh sách ảnh và/hoặc video từ các album published trong một query.
+
+    Args:
+        mime_prefix: IMAGE_MIME_PREFIX, VIDEO_MIME_PREFIX hoặc None (lấy cả hai)
+
+    Kết quả được cache ngắn (public_cache).
     """
-    # Lấy VideoEmbed IDs từ AlbumVideo của các album published
-    video_embed_subquery = (
-        select(AlbumVideo.video_id)
-        .join(Album, AlbumVideo.album_id == Album.id)
-        .where(
-            Album.deleted_at.is_(None),
-            Album.status == ContentStatus.PUBLISHED,
-        )
-        .distinct()
-    )
-    
-    # Lấy VideoEmbeds
-    video_embed_ids = db.scalars(video_embed_subquery).all()
-    video_embeds = []
-    if video_embed_ids:
-        video_embeds = db.scalars(
-            select(VideoEmbed).where(VideoEmbed.id.in_(video_embed_ids))
-        ).all()
-    
-    # Lọc local videos (provider=LOCAL)
-    from app.models.enums import EmbedProvider
-    local_video_embeds = [ve for ve in video_embeds if ve.provider == EmbedProvider.LOCAL]
-    
-    # Lấy URLs từ local VideoEmbeds
-    local_video_urls = [ve.url for ve in local_video_embeds if ve.url]
-    
-    if not local_video_urls:
-        # Không có local videos
-        return PublicAssetListOut(
-            items=[],
-            meta=AssetListMeta(
-                page=page,
-                page_size=page_size,
-                total_items=0,
-                total_pages=0,
-            ),
-        )
-    
-    # Query Assets cho local videos (match theo url)
-    stmt = (
-        select(Asset)
-        .where(
-            Asset.deleted_at.is_(None),
-            Asset.mime_type.startswith("video/"),
-            Asset.url.in_(local_video_urls),
-        )
+    cache_key = (page, page_size, q or "", mime_prefix)
+    cached = public_cache.asset_lists.get(cache_key)
+    if cached is not None:
+        return cached
+
+    stmt = select(Asset).where(
+        Asset.deleted_at.is_(None),
+        or_(*_MEDIA_SOURCES[mime_prefix]),
     )
-    
+
     # Search
     if q:
         search_term = f"%{q}%"
@@ -156,33 +85,16 @@ def list_videos_from_albums(
             (Asset.url.ilike(search_term))
             | (Asset.object_key.ilike(search_term))
         )
-    
-    # Count total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_items = db.scalar(count_stmt)
-    
-    # Pagination
-    offset = (page - 1) * page_size
-    stmt = stmt.order_by(Asset.created_at.desc()).offset(offset).limit(page_size)
-    
-    assets = db.scalars(stmt).all()
-    
+
+    stmt = stmt.order_by(Asset.created_at.desc(), Asset.id.desc())
+    assets, total_items = fetch_page(db, stmt, page=page, page_size=page_size)
+
     # Convert to output
-    items = [
-        PublicAssetOut(
-            public_id=asset.public_id,
-            url=asset.url or "",
-            mime_type=asset.mime_type,
-            byte_size=asset.byte_size,
-            width=asset.width,
-            height=asset.height,
-        )
-        for asset in assets
-    ]
-    
+    items = _ASSET_LIST_ADAPTER.validate_python(assets)
+
     total_pages = (total_items + page_size - 1) // page_size if total_items > 0 else 0
-    
-    return PublicAssetListOut(
+
+    result = PublicAssetListOut(
         items=items,
         meta=AssetListMeta(
             page=page,
@@ -191,4 +103,5 @@ def list_videos_from_albums(
             total_pages=total_pages,
         ),
     )
-
+    public_cache.asset_lists.set(cache_key, result)
+    return result
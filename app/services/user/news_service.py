@@ -3,56 +3,19 @@ from __future__ import annotations
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.enums import ContentStatus, PostType
-from app.models.tables import Asset, Post, PostAsset
-from app.schemas.asset import PublicAssetOut, PublicPostAssetOut
+from app.models.tables import Post
+from app.schemas.asset import PublicPostAssetOut
 from app.schemas.news import NewsListMeta, PublicNewsListOut, PublicNewsOut
+from app.services import asset_service, public_cache
+from app.utils.pagination import fetch_page_lambda_async
 
 
-def _to_public_news_out(db: Session, post: Post) -> PublicNewsOut:
+def _to_public_news_out(post: Post, content_assets: list[PublicPostAssetOut]) -> PublicNewsOut:
     """Convert Post → PublicNewsOut, chỉ trả về public_id, không có id và status."""
-    # Load content_assets với join để tránh N+1 query
-    post_assets = db.scalars(
-        select(PostAsset)
-        .where(PostAsset.post_id == post.id)
-        .order_by(PostAsset.position)
-    ).all()
-    
-    if not post_assets:
-        content_assets = []
-    else:
-        # Query tất cả assets một lần để tránh N+1
-        asset_ids = [pa.asset_id for pa in post_assets]
-        assets = {
-            asset.id: asset
-            for asset in db.scalars(
-                select(Asset).where(
-                    Asset.id.in_(asset_ids),
-                    Asset.deleted_at.is_(None),
-                )
-            ).all()
-        }
-        
-        content_assets = [
-            PublicPostAssetOut(
-                position=pa.position,
-                caption=pa.caption,
-                asset=PublicAssetOut(
-                    public_id=asset.public_id,
-                    url=asset.url or "",
-                    mime_type=asset.mime_type,
-                    byte_size=asset.byte_size,
-                    width=asset.width,
-                    height=asset.height,
-                ),
-            )
-            for pa in post_assets
-            if (asset := assets.get(pa.asset_id))
-        ]
-    
     return PublicNewsOut(
         public_id=post.public_id,
         title=post.title,
@@ -68,8 +31,8 @@ def _to_public_news_out(db: Session, post: Post) -> PublicNewsOut:
     )
 
 
-def list_news(
-    db: Session,
+async def list_news(
+    db: AsyncSession,
     *,
     page: int,
     page_size: int,
@@ -77,55 +40,48 @@ def list_news(
 ) -> PublicNewsListOut:
     """
     List tin tức công khai - chỉ trả về published posts.
-    Hỗ trợ search và pagination.
+    Hỗ trợ search và pagination; kết quả được cache ngắn (public_cache).
     """
-    base_stmt = select(Post).where(
-        Post.post_type == PostType.NEWS,
-        Post.status == ContentStatus.PUBLISHED,
-        Post.deleted_at.is_(None),
-    )
-    count_stmt = select(func.count(Post.id)).where(
+    cache_key = (page, page_size, q or "")
+    cached = public_cache.news_lists.get(cache_key)
+    if cached is not None:
+        return cached
+
+    stmt = lambda_stmt(lambda: select(Post).where(
         Post.post_type == PostType.NEWS,
         Post.status == ContentStatus.PUBLISHED,
         Post.deleted_at.is_(None),
-    )
+    ))
 
     if q:
         ilike = f"%{q}%"
-        base_stmt = base_stmt.where(
-            (Post.title.ilike(ilike)) | (Post.slug.ilike(ilike)) | (Post.excerpt.ilike(ilike))
-        )
-        count_stmt = count_stmt.where(
+        stmt += lambda s: s.where(
             (Post.title.ilike(ilike)) | (Post.slug.ilike(ilike)) | (Post.excerpt.ilike(ilike))
         )
 
     # Sắp xếp theo published_at (mới nhất trước)
-    base_stmt = base_stmt.order_by(
-        Post.published_at.desc().nullslast(), Post.created_at.desc()
-    )
-
-    total_items = db.scalar(count_stmt) or 0
+    stmt += lambda s: s.order_by(Post.published_at.desc().nullslast(), Post.created_at.desc())
+    rows, total_items = await fetch_page_lambda_async(db, stmt, page=page, page_size=page_size)
     total_pages = (total_items + page_size - 1) // page_size if total_items else 0
+    posts = [post for (post,) in rows]
 
-    rows = db.scalars(
-        base_stmt.offset((page - 1) * page_size).limit(page_size)
-    ).all()
-
-    items = [
-        _to_public_news_out(db, row)
-        for row in rows
-    ]
+    # content_assets của cả trang trong một query (không N+1)
+    content_assets = await asset_service.load_public_content_assets(db, [post.id for post in posts])
+    items = [_to_public_news_out(post, content_assets[post.id]) for post in posts]
 
     meta = NewsListMeta(
         page=page,
         page_size=page_size,
+        has_next=page < total_pages,
         total_items=total_items,
         total_pages=total_pages,
     )
-    return PublicNewsListOut(items=items, meta=meta)
+    result = PublicNewsListOut(items=items, meta=meta)
+    public_cache.news_lists.set(cache_key, result)
+    return result
 
 
-def get_news_by_slug(db: Session, slug: str) -> PublicNewsOut:
+async def get_news_by_slug(db: AsyncSession, slug: str) -> PublicNewsOut:
     """
     Lấy chi tiết tin tức công khai theo slug - chỉ trả về published posts.
     """
@@ -138,11 +94,11 @@ def get_news_by_slug(db: Session, slug: str) -> PublicNewsOut:
             Post.deleted_at.is_(None),
         )
     )
-    post = db.scalar(stmt)
+    post = await db.scalar(stmt)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"code": "news_not_found", "message": "Tin tức không tồn tại hoặc chưa được xuất bản."},
         )
-    return _to_public_news_out(db, post)
-
+    content_assets = await asset_service.load_public_content_assets(db, [post.id])
+    return _to_public_news_out(post, content_assets[post.id])
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, TypeVar
+
+from sqlalchemy import Row, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+T = TypeVar("T")
+
+
+def fetch_page(
+    db: Session, stmt: Select[tuple[T]], *, page: int, page_size: int
+) -> tuple[list[T], int]:
+    """
+    Lấy một trang kết quả kèm tổng số dòng trong một câu query.
+
+    `COUNT(*) OVER ()` được tính trước LIMIT/OFFSET nên mỗi dòng trả về đều
+    mang tổng số dòng khớp filter, không cần câu `SELECT COUNT(*)` riêng.
+
+    Args:
+        db: Database session
+        stmt: select một entity, đã có where/order_by
+        page: Số trang (bắt đầu từ 1)
+        page_size: Số items mỗi trang
+
+    Returns:
+        (items, total_items)
+    """
+    total_col = func.count().over().label("total_items")
+    rows = db.execute(
+        stmt.add_columns(total_col).offset((page - 1) * page_size).limit(page_size)
+    ).all()
+    if rows:
+        return [row[0] for row in rows], rows[0].total_items
+
+    # Trang vượt quá trang cuối → không còn dòng nào mang tổng, đếm riêng
+    total_items: Any = 0
+    if page > 1:
+        total_items = db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+    return [], total_items or 0
+
+
+def _lambda_page_statements(
+    stmt: StatementLambdaElement, *, page: int, page_size: int
+) -> tuple[StatementLambdaElement, StatementLambdaElement]:
+    """
+    Câu query một trang (kèm `COUNT(*) OVER ()` như fetch_page) và câu đếm
+    riêng, cùng dẫn xuất từ `stmt` nên không phải lặp lại WHERE/JOIN.
+
+    Dùng lambda_stmt: select() chỉ dựng một lần, các lần sau chỉ lấy lại tham số
+    từ closure (offset, page_size, filter của caller) rồi tra compiled cache.
+    """
+    offset = (page - 1) * page_size
+    page_stmt = stmt + (
+        lambda s: s.add_columns(func.count().over().label("total_items"))
+        .offset(offset)
+        .limit(page_size)
+    )
+    count_stmt = stmt + (
+        lambda s: s.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+    )
+    return page_stmt, count_stmt
+
+
+def _page_rows(rows: list[Row]) -> tuple[list[tuple], int]:
+    return [tuple(row[:-1]) for row in rows], rows[0].total_items
+
+
+def fetch_page_lambda(
+    db: Session, stmt: StatementLambdaElement, *, page: int, page_size: int
+) -> tuple[list[tuple], int]:
+    """
+    fetch_page cho lambda_stmt (query public chạy thường xuyên).
+
+    Args:
+        db: Database session
+        stmt: lambda_stmt đã có where/order_by, chưa có offset/limit
+        page: Số trang (bắt đầu từ 1)
+        page_size: Số items mỗi trang
+
+    Returns:
+        (rows, total_items) - mỗi row là tuple các cột đã select trong `stmt`
+    """
+    page_stmt, count_stmt = _lambda_page_statements(stmt, page=page, page_size=page_size)
+    rows = db.execute(page_stmt).all()
+    if rows:
+        return _page_rows(rows)
+
+    # Trang vượt quá trang cuối → không còn dòng nào mang tổng, đếm riêng
+    total_items = db.scalar(count_stmt) if page > 1 else 0
+    return [], total_items or 0
+
+
+async def fetch_page_lambda_async(
+    db: AsyncSession, stmt: StatementLambdaElement, *, page: int, page_size: int
+) -> tuple[list[tuple], int]:
+    """Như fetch_page_lambda, cho AsyncSession."""
+    page_stmt, count_stmt = _lambda_page_statements(stmt, page=page, page_size=page_size)
+    rows = (await db.execute(page_stmt)).all()
+    if rows:
+        return _page_rows(rows)
+
+    # Trang vượt quá trang cuối → không còn dòng nào mang tổng, đếm riêng
+    total_items = await db.scalar(count_stmt) if page > 1 else 0
+    return [], total_items or 0
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Cursor opaque cho keyset pagination: base64url(JSON) các giá trị sort của
+    dòng cuối trang (datetime → ISO 8601).
+    """
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """
+    Giải mã cursor của encode_cursor.
+
+    Raises:
+        ValueError: Nếu cursor không hợp lệ
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
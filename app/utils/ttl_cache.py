@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Cache in-memory theo process: mỗi entry hết hạn sau `ttl_seconds`.
+
+    Đầy `max_entries` thì xoá toàn bộ (giống các cache dict + Lock khác của app);
+    an toàn khi gọi từ threadpool lẫn event loop (không await trong lock).
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 512) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[K, tuple[float, V]] = {}
+        self._lock = Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is None or cached[0] <= time.monotonic():
+            return None
+        return cached[1]
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()